@@ -6,11 +6,32 @@ import numpy as np
 import json
 import os
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
-from src.models.equipment_model import EQUIPMENT_CATEGORIES, create_equipment_defaults, EquipmentModel
+from src.models.equipment_model import EQUIPMENT_CATEGORIES, FUEL_TYPES, create_equipment_defaults, EquipmentModel
 from src.models.placed_equipment import PlacedEquipment, CanvasManager
-from src.models.draggable_canvas import DraggableCanvasManager, create_enhanced_canvas_interface, display_selected_equipment_info
+from src.models.facility_metrics import period_multiplier, power_for_period
+from src.models.scene_geometry import grid_line_segments, polyline_coordinates
+from src.models.equipment_meshes import (
+    DETAIL_FULL, DETAIL_CLUSTERS, LevelOfDetailConfig, build_canvas_equipment_traces
+)
+from src.models.figure_cache import FigureCache, estimate_figure_bytes, layout_fingerprint
+from src.models.config_preview import render_configuration_preview
+from src.models.bulk_placement import (
+    array_positions, clone_equipment, copy_group, default_pattern_spacing, grid_spacing,
+    parse_coordinate_list, paste_group, place_pattern
+)
+from src.models.canvas_store import apply_unit_changes, ensure_canvas_store, reset_canvas_store
+from src.models.canvas_history import CanvasHistory
+from src.models.project_store import RevisionConflict, history_file, project_file, results_file, revision_base
+from src.models.results_store import facility_results
+from src.models.autosave import DEFAULT_IDLE_SECONDS, AutosaveWorker, project_document, project_fields
+from src.models.project_journal import diff_project, get_project_journal
+from src.models.group_operations import (
+    ALIGN_MODES, DISTRIBUTE_AXES, align_group, bulk_edit_group, delete_group, distribute_group,
+    rotate_group, select_in_region, select_matching, translate_group
+)
+from src.models.draggable_canvas import create_enhanced_canvas_interface, display_selected_equipment_info
 
 def builder_page():
     """Professional facility builder with organized UI hierarchy"""
@@ -249,6 +270,7 @@ def builder_page():
     
     # Initialize builder session
     initialize_builder_session()
+    autosave_current_project()
     
     # PROJECT HEADER SECTION
     project = st.session_state.current_project
@@ -307,6 +329,7 @@ def builder_page():
         render_facility_canvas()
         if st.session_state.get('show_config_panel', False):
             render_equipment_configuration_panel()
+        render_group_operations_panel()
     
     # Handle conditional popups/dialogs only when triggered
     handle_popup_dialogs()
@@ -439,14 +462,19 @@ def production_config_dialog():
                 # Update saved project file
                 project_name = st.session_state.current_project["name"]
                 try:
-                    filename = f"projects/{project_name.replace(' ', '_').lower()}.json"
-                    if os.path.exists(filename):
-                        with open(filename, 'r') as f:
-                            project_data = json.load(f)
-                        project_data["production_config"] = production_config
-                        project_data["last_modified"] = datetime.now().isoformat()
-                        with open(filename, 'w') as f:
-                            json.dump(project_data, f, indent=2)
+                    # Journal just these fields instead of rewriting the whole project file
+                    fields = {
+                        "production_config": production_config,
+                        "last_modified": datetime.now().isoformat()
+                    }
+                    base = current_project_base()
+                    revision = get_project_journal(project_file(project_name)).update_fields(fields, base=base)
+                    # Advance the base only if no other session saved in between (their edits are not in it)
+                    if base is not None and revision == base.get('revision', 0) + 1:
+                        set_project_base(dict(base, **fields, revision=revision))
+                except RevisionConflict as e:
+                    st.error(f"Production configuration not saved. {e}.")
+                    return
                 except Exception as e:
                     st.error(f"Error saving production configuration: {e}")
                     return
@@ -457,71 +485,23 @@ def production_config_dialog():
     
 def initialize_builder_session():
     
-    # Force recreation of canvas managers to apply grid fixes (version 2.0)
+    # Force recreation of the canvas store to apply grid fixes (version 2.0)
     if st.session_state.get('canvas_manager_version', 1.0) < 2.0:
-        if 'canvas_manager' in st.session_state:
-            del st.session_state.canvas_manager
-        if 'enhanced_canvas_manager' in st.session_state:
-            del st.session_state.enhanced_canvas_manager
+        reset_canvas_store()
         st.session_state.canvas_manager_version = 2.0
     
-    # Check if we need to reset canvas managers for a different project
+    # Check if we need to reset the canvas store for a different project
     current_project_id = st.session_state.current_project.get('name', '') if st.session_state.current_project else ''
     last_loaded_project = st.session_state.get('last_loaded_project_id', '')
     
     if current_project_id != last_loaded_project:
-        # Different project loaded, reset canvas managers
-        if 'canvas_manager' in st.session_state:
-            del st.session_state.canvas_manager
-        if 'enhanced_canvas_manager' in st.session_state:
-            del st.session_state.enhanced_canvas_manager
+        # Different project loaded, rebuild the store from it
+        reset_canvas_store()
         # Update the last loaded project ID
         st.session_state.last_loaded_project_id = current_project_id
     
-    if 'enhanced_canvas_manager' not in st.session_state:
-        if st.session_state.current_project:
-            # Get exact dimensions from project
-            width = st.session_state.current_project.get('canvas_width_m', 200)
-            height = st.session_state.current_project.get('canvas_height_m', 200)
-            
-            # Create temporary canvas manager to get rounded bounds
-            temp_manager = DraggableCanvasManager(width, height)
-            rounded_bounds = temp_manager.get_canvas_bounds()
-            
-            # Initialize with rounded bounds for clean grid
-            st.session_state.enhanced_canvas_manager = DraggableCanvasManager(rounded_bounds[0], rounded_bounds[1])
-        else:
-            st.session_state.enhanced_canvas_manager = DraggableCanvasManager(200, 200)
-    
-    # Keep the legacy canvas manager for compatibility
-    if 'canvas_manager' not in st.session_state:
-        if st.session_state.current_project:
-            # Get exact dimensions from project
-            width = st.session_state.current_project.get('canvas_width_m', 200)
-            height = st.session_state.current_project.get('canvas_height_m', 200)
-            
-            # Create temporary canvas manager to get rounded bounds
-            temp_manager = CanvasManager(width, height)
-            rounded_bounds = temp_manager.get_canvas_bounds()
-            
-            # Initialize with rounded bounds for clean grid
-            st.session_state.canvas_manager = CanvasManager(rounded_bounds[0], rounded_bounds[1])
-            
-            # Load existing equipment from project
-            project_equipment = st.session_state.current_project.get('equipment', [])
-            if project_equipment:
-                from src.models.placed_equipment import PlacedEquipment
-                for eq_data in project_equipment:
-                    # Recreate equipment from saved data
-                    equipment = EquipmentModel.from_dict(eq_data['equipment'])
-                    placed_eq = PlacedEquipment(
-                        equipment=equipment,
-                        x_position=eq_data['x_position'],
-                        y_position=eq_data['y_position']
-                    )
-                    st.session_state.canvas_manager.placed_equipment.append(placed_eq)
-        else:
-            st.session_state.canvas_manager = CanvasManager(200, 200)
+    # One authoritative layout store shared by the 3D canvas, 2D views and reports
+    ensure_canvas_store(st.session_state.current_project)
     
     if 'equipment_library_open' not in st.session_state:
         st.session_state.equipment_library_open = False
@@ -536,12 +516,41 @@ def initialize_builder_session():
     if 'show_config_panel' not in st.session_state:
         st.session_state.show_config_panel = False
     
-    # Initialize undo/redo history
-    if 'canvas_history' not in st.session_state:
-        st.session_state.canvas_history = []
+    # Equipment ids selected for group operations
+    if 'group_selection' not in st.session_state:
+        st.session_state.group_selection = []
+    
+    # Level-of-detail thresholds for the 3D canvas
+    if 'canvas_lod_config' not in st.session_state:
+        st.session_state.canvas_lod_config = LevelOfDetailConfig()
     
-    if 'canvas_history_index' not in st.session_state:
-        st.session_state.canvas_history_index = -1
+    # Background autosave (writes once the session has been idle for the configured interval)
+    if 'autosave_enabled' not in st.session_state:
+        st.session_state.autosave_enabled = True
+    if 'autosave_idle_seconds' not in st.session_state:
+        st.session_state.autosave_idle_seconds = DEFAULT_IDLE_SECONDS
+    if not isinstance(st.session_state.get('autosave_worker'), AutosaveWorker):
+        st.session_state.autosave_worker = AutosaveWorker(st.session_state.autosave_idle_seconds)
+    
+    # Initialize undo/redo history for the current store (resumed from the project's sidecar if present)
+    canvas_manager = st.session_state.canvas_manager
+    if (not isinstance(st.session_state.get('canvas_history'), CanvasHistory) or
+            st.session_state.get('canvas_history_store') is not canvas_manager):
+        history = CanvasHistory()
+        if st.session_state.current_project:
+            history.load(history_file(st.session_state.current_project['name']), canvas_manager)
+        else:
+            history.attach(canvas_manager)
+        st.session_state.canvas_history = history
+        st.session_state.canvas_history_store = canvas_manager
+        if st.session_state.current_project:
+            st.session_state.autosave_worker.attach(project_file(st.session_state.current_project['name']),
+                                                    project_fields(st.session_state.current_project),
+                                                    canvas_manager.snapshot(),
+                                                    base=st.session_state.get('project_base'))
+    
+    if 'persist_canvas_history' not in st.session_state:
+        st.session_state.persist_canvas_history = True
 
 def production_target_popup():
     """Professional production target configuration popup for refinery facilities - LEGACY REDIRECT"""
@@ -595,11 +604,9 @@ def render_facility_statistics():
         return
     
     canvas_manager = st.session_state.canvas_manager
-    equipment_count = len(canvas_manager.placed_equipment)
-    
-    # Calculate basic statistics
-    total_co2_daily = sum(eq.equipment.calculate_co2_emission() for eq in canvas_manager.placed_equipment)  # Already daily values
-    combustion_equipment = sum(1 for eq in canvas_manager.placed_equipment if eq.equipment.has_combustion)
+    metrics = canvas_manager.get_facility_metrics()
+    equipment_count = metrics.equipment_count
+    combustion_equipment = metrics.combustion_count
     
     # CO₂ time period selection
     if 'co2_time_period' not in st.session_state:
@@ -614,19 +621,10 @@ def render_facility_statistics():
     )
     st.session_state.co2_time_period = time_period
     
-    # Convert CO₂ based on selected period (scale UP from daily values)
-    if time_period == "Day":
-        total_co2 = total_co2_daily  # Already daily
-        co2_label = "CO₂ (kg/day)"
-        avg_co2 = total_co2 / equipment_count if equipment_count > 0 else 0
-    elif time_period == "Month":
-        total_co2 = total_co2_daily * 30.44  # Scale daily to monthly
-        co2_label = "CO₂ (kg/month)"
-        avg_co2 = total_co2 / equipment_count if equipment_count > 0 else 0
-    else:  # Year
-        total_co2 = total_co2_daily * 365.25  # Scale daily to annual
-        co2_label = "CO₂ (kg/yr)"
-        avg_co2 = total_co2 / equipment_count if equipment_count > 0 else 0
+    # Scale the cached daily CO₂ up to the selected period
+    total_co2 = metrics.co2_for_period(time_period)
+    co2_label = {"Day": "CO₂ (kg/day)", "Month": "CO₂ (kg/month)", "Year": "CO₂ (kg/yr)"}[time_period]
+    avg_co2 = total_co2 / equipment_count if equipment_count > 0 else 0
     
     # Minimal statistics display
     st.markdown("""
@@ -659,14 +657,9 @@ def render_facility_canvas():
     
     # Calculate real-time production from placed equipment
     canvas_manager = st.session_state.get('canvas_manager')
-    actual_power_production = 0.0
-    actual_crude_processing = 0.0
-    
-    if canvas_manager and canvas_manager.placed_equipment:
-        # Calculate total power production from all equipment
-        actual_power_production = sum(eq.equipment.calculate_power_production() for eq in canvas_manager.placed_equipment)
-        # Calculate total crude processing capacity from all equipment
-        actual_crude_processing = sum(eq.equipment.calculate_crude_processing_capacity() for eq in canvas_manager.placed_equipment)
+    metrics = canvas_manager.get_facility_metrics() if canvas_manager else None
+    actual_power_production = metrics.total_power_kw if metrics else 0.0
+    actual_crude_processing = metrics.total_crude_bbl_day if metrics else 0.0
     
     if has_production_config:
         target_crude_throughput = production_config.get("crude_throughput_bbl_day", 0)
@@ -680,20 +673,9 @@ def render_facility_canvas():
         crude_color = "#10b981" if crude_progress >= 100 else "#f59e0b" if crude_progress >= 50 else "#ef4444"
         power_color = "#10b981" if power_progress >= 100 else "#f59e0b" if power_progress >= 50 else "#ef4444"
         
-        # Generate detailed breakdown for tooltips
-        crude_breakdown = []
-        power_breakdown = []
-        
-        if canvas_manager and canvas_manager.placed_equipment:
-            for eq in canvas_manager.placed_equipment:
-                crude_contribution = eq.equipment.calculate_crude_processing_capacity()
-                power_contribution = eq.equipment.calculate_power_production()
-                
-                if crude_contribution > 0:
-                    crude_breakdown.append(f"• {eq.equipment.name}: {crude_contribution:,.0f} bbl/day")
-                
-                if power_contribution > 0:
-                    power_breakdown.append(f"• {eq.equipment.name}: {power_contribution:,.0f} kW")
+        # Detailed breakdown for tooltips (contributing units are precomputed in the snapshot)
+        crude_breakdown = [f"• {name}: {value:,.0f} bbl/day" for name, value in metrics.crude_breakdown] if metrics else []
+        power_breakdown = [f"• {name}: {value:,.0f} kW" for name, value in metrics.power_breakdown] if metrics else []
         
         # Create tooltip content as HTML lists
         crude_tooltip_html = "<br>".join(crude_breakdown) if crude_breakdown else "No equipment contributing to crude processing"
@@ -800,23 +782,22 @@ def render_facility_canvas():
             if st.session_state.get('canvas_manager'):
                 # Save current state before reset
                 save_canvas_state("Reset Canvas")
-                st.session_state.canvas_manager.placed_equipment = []
-                if st.session_state.get('enhanced_canvas_manager'):
-                    st.session_state.enhanced_canvas_manager.placed_equipment = []
+                st.session_state.canvas_manager.clear_all_equipment()
                 st.session_state.project_saved = False
                 st.success("Reset complete")
                 st.rerun()
     
     with canvas_col2:
-        can_undo = len(st.session_state.canvas_history) > 0 and st.session_state.canvas_history_index >= 0
+        # Fold edits made since the last rerun into the history before offering undo
+        st.session_state.canvas_history.sync(st.session_state.canvas_manager)
+        can_undo = st.session_state.canvas_history.can_undo
         if st.button("Undo", help="Undo last action", use_container_width=True, disabled=not can_undo):
             if undo_canvas_action():
                 st.success("Undone")
                 st.rerun()
     
     with canvas_col3:
-        can_redo = (len(st.session_state.canvas_history) > 0 and 
-                   st.session_state.canvas_history_index < len(st.session_state.canvas_history) - 1)
+        can_redo = st.session_state.canvas_history.can_redo
         if st.button("Redo", help="Redo last undone action", use_container_width=True, disabled=not can_redo):
             if redo_canvas_action():
                 st.success("Redone")
@@ -835,6 +816,9 @@ def render_facility_canvas():
     canvas_manager = st.session_state.canvas_manager
     canvas_bounds = canvas_manager.get_canvas_bounds()
     
+    if st.session_state.get('placement_notice'):
+        st.warning(st.session_state.pop('placement_notice'))
+    
     if len(canvas_manager.placed_equipment) == 0:
         st.info("No equipment placed. Use equipment library to add.")
     else:
@@ -935,46 +919,38 @@ def render_equipment_configuration_panel():
     
     st.markdown("---")
         
+    # Live configuration preview (computed in the browser; only a save reaches the server)
+    if equipment.requires_power_config:
+        canvas_manager = st.session_state.canvas_manager
+        committed = render_configuration_preview(
+            equipment,
+            canvas_manager.get_facility_metrics(),
+            canvas_manager.get_running_totals().unit(equipment.id),
+            st.session_state.get('co2_time_period', "Year")
+        )
+        if committed:
+            equipment.power_rate_kw = committed['power_rate_kw']
+            equipment.operation_time_hours = committed['operation_time_hours']
+            equipment.fuel_type = committed['fuel_type']
+            canvas_manager.refresh_equipment(equipment)
+            st.session_state.project_saved = False  # Mark as unsaved
+            st.rerun()
+    
     # Configuration form
     with st.form("equipment_config", clear_on_submit=False):
         config_form_col1, config_form_col2 = st.columns([3, 2])
         
         with config_form_col1:
-            if equipment.requires_power_config:
-                power_rate = st.number_input(
-                    "Power Rate (kW)",
-                    min_value=0.0,
-                    value=equipment.power_rate_kw,
-                    step=10.0,
-                    help="Operating power consumption in kilowatts"
-                )
-                
-                operation_time = st.number_input(
-                    "Operation Time (hours/year)",
-                    min_value=0.0,
-                    max_value=8760.0,
-                    value=equipment.operation_time_hours,
-                    step=100.0,
-                    help="Annual operating hours (max 8760)"
-                )
-                
-                fuel_type = st.selectbox(
-                    "Fuel Type",
-                    options=["LPG", "Diesel", "Gasoline", "Natural Gas", "None", "Gas", "Electric"],
-                    index=["LPG", "Diesel", "Gasoline", "Natural Gas", "None", "Gas", "Electric"].index(equipment.fuel_type),
-                    help="Primary fuel or energy source"
-                )
-            else:
+            if not equipment.requires_power_config:
                 st.info("ℹ️ This equipment type doesn't require power or fuel configuration.")
-                power_rate = 0.0
-                operation_time = 0.0
-                fuel_type = "None"
             
             # Action buttons
             button_col1, button_col2, button_col3 = st.columns(3)
             
             with button_col1:
-                save_clicked = st.form_submit_button("Save Changes", use_container_width=True, type="primary")
+                save_clicked = False
+                if not equipment.requires_power_config:
+                    save_clicked = st.form_submit_button("Save Changes", use_container_width=True, type="primary")
             
             with button_col2:
                 delete_clicked = st.form_submit_button("Delete Equipment", use_container_width=True)
@@ -984,9 +960,10 @@ def render_equipment_configuration_panel():
             
             if save_clicked:
                 # Update equipment
-                equipment.power_rate_kw = power_rate
-                equipment.operation_time_hours = operation_time
-                equipment.fuel_type = fuel_type
+                equipment.power_rate_kw = 0.0
+                equipment.operation_time_hours = 0.0
+                equipment.fuel_type = "None"
+                st.session_state.canvas_manager.refresh_equipment(equipment)
                 st.success("✅ Equipment configuration updated successfully!")
                 st.session_state.project_saved = False  # Mark as unsaved
                 st.rerun()
@@ -1035,6 +1012,178 @@ def render_equipment_configuration_panel():
         st.write(f"• **X:** {selected.x_position:.1f} m")
         st.write(f"• **Y:** {selected.y_position:.1f} m")
 
+def _select_group_in_box():
+    """Replace (or extend) the group selection with units inside the box inputs"""
+    region = (st.session_state.group_box_x0, st.session_state.group_box_y0,
+              st.session_state.group_box_x1, st.session_state.group_box_y1)
+    region = (min(region[0], region[2]), min(region[1], region[3]), max(region[0], region[2]), max(region[1], region[3]))
+    found = select_in_region(st.session_state.canvas_manager, region)
+    base = st.session_state.group_selection if st.session_state.group_extend_selection else []
+    st.session_state.group_selection = list(dict.fromkeys(base + found))
+
+def _select_group_matching():
+    """Replace (or extend) the group selection with units of the chosen categories and fuels"""
+    found = select_matching(st.session_state.canvas_manager,
+                            st.session_state.group_match_categories, st.session_state.group_match_fuels)
+    base = st.session_state.group_selection if st.session_state.group_extend_selection else []
+    st.session_state.group_selection = list(dict.fromkeys(base + found))
+
+def _clear_group_selection():
+    st.session_state.group_selection = []
+
+def apply_group_operation(description: str, operation, *args, **kwargs) -> int:
+    """Run a group operation over the current selection as a single history entry"""
+    canvas_manager = st.session_state.canvas_manager
+    selection = st.session_state.group_selection
+    if not selection:
+        return 0
+    try:
+        save_canvas_state(description)
+        count = operation(canvas_manager, selection, *args, **kwargs)
+        if count:
+            st.session_state.project_saved = False
+        return count
+    except Exception as e:
+        st.error(f"Error applying group operation: {str(e)}")
+        return 0
+
+def render_group_operations_panel():
+    """Select several units and move, arrange, edit or delete them together"""
+    canvas_manager = st.session_state.get('canvas_manager')
+    if not canvas_manager or not canvas_manager.placed_equipment:
+        return
+    
+    # Drop units removed since the selection was made (before the selection widget is created)
+    st.session_state.group_selection = [equipment_id for equipment_id in st.session_state.group_selection
+                                        if canvas_manager.get_equipment(equipment_id) is not None]
+    selection = st.session_state.group_selection
+    canvas_bounds = canvas_manager.get_canvas_bounds()
+    
+    with st.expander(f"Group Operations ({len(selection)} selected)", expanded=bool(selection)):
+        select_tab, arrange_tab, edit_tab = st.tabs(["Select", "Move & Arrange", "Edit & Delete"])
+        
+        with select_tab:
+            st.checkbox("Add to current selection", key="group_extend_selection")
+            
+            st.markdown("**Box select (m)**")
+            box_col1, box_col2, box_col3, box_col4 = st.columns(4)
+            with box_col1:
+                st.number_input("X from", 0.0, float(canvas_bounds[0]), 0.0, key="group_box_x0")
+            with box_col2:
+                st.number_input("Y from", 0.0, float(canvas_bounds[1]), 0.0, key="group_box_y0")
+            with box_col3:
+                st.number_input("X to", 0.0, float(canvas_bounds[0]), float(canvas_bounds[0]), key="group_box_x1")
+            with box_col4:
+                st.number_input("Y to", 0.0, float(canvas_bounds[1]), float(canvas_bounds[1]), key="group_box_y1")
+            st.button("Select in Box", key="group_select_box", on_click=_select_group_in_box, use_container_width=True)
+            
+            st.markdown("**Select by type**")
+            match_col1, match_col2 = st.columns(2)
+            with match_col1:
+                st.multiselect("Categories", list(EQUIPMENT_CATEGORIES.keys()), key="group_match_categories")
+            with match_col2:
+                st.multiselect("Fuel types", FUEL_TYPES, key="group_match_fuels")
+            st.button("Select Matching", key="group_select_matching", on_click=_select_group_matching,
+                      use_container_width=True)
+            
+            labels = {placed.equipment.id: f"{placed.equipment.name} ({placed.x_position:.0f}, {placed.y_position:.0f})"
+                      for placed in canvas_manager.placed_equipment}
+            st.multiselect("Selected units", list(labels.keys()), format_func=labels.get, key="group_selection")
+            st.button("Clear Selection", key="group_clear", on_click=_clear_group_selection, use_container_width=True)
+        
+        with arrange_tab:
+            move_col1, move_col2, move_col3 = st.columns([1, 1, 1])
+            with move_col1:
+                dx = st.number_input("ΔX (m)", value=0.0, step=1.0, key="group_dx")
+            with move_col2:
+                dy = st.number_input("ΔY (m)", value=0.0, step=1.0, key="group_dy")
+            with move_col3:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("Move", key="group_move", use_container_width=True, disabled=not selection):
+                    if apply_group_operation(f"Move {len(selection)} units", translate_group, dx, dy):
+                        st.rerun()
+            
+            rotate_col1, rotate_col2 = st.columns([2, 1])
+            with rotate_col1:
+                angle = st.number_input("Rotate about selection centre (°)", value=90.0, step=15.0, key="group_angle")
+            with rotate_col2:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("Rotate", key="group_rotate", use_container_width=True, disabled=not selection):
+                    if apply_group_operation(f"Rotate {len(selection)} units", rotate_group, angle):
+                        st.rerun()
+            
+            align_col1, align_col2 = st.columns([2, 1])
+            with align_col1:
+                align_mode = st.selectbox("Align", list(ALIGN_MODES.keys()), format_func=ALIGN_MODES.get,
+                                          key="group_align_mode")
+            with align_col2:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("Align", key="group_align", use_container_width=True, disabled=len(selection) < 2):
+                    if apply_group_operation(f"Align {len(selection)} units", align_group, align_mode):
+                        st.rerun()
+            
+            distribute_col1, distribute_col2 = st.columns([2, 1])
+            with distribute_col1:
+                axis = st.selectbox("Distribute", list(DISTRIBUTE_AXES.keys()), format_func=DISTRIBUTE_AXES.get,
+                                    key="group_distribute_axis")
+            with distribute_col2:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("Distribute", key="group_distribute", use_container_width=True,
+                             disabled=len(selection) < 3):
+                    if apply_group_operation(f"Distribute {len(selection)} units", distribute_group, axis):
+                        st.rerun()
+            
+            # Copy the selection and paste it elsewhere in one batch
+            st.markdown("**Copy & paste**")
+            clipboard = st.session_state.get('group_clipboard', [])
+            paste_col1, paste_col2, paste_col3, paste_col4 = st.columns(4)
+            with paste_col1:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button("Copy", key="group_copy", use_container_width=True, disabled=not selection):
+                    st.session_state.group_clipboard = copy_group(canvas_manager, selection)
+                    st.rerun()
+            with paste_col2:
+                paste_x = st.number_input("Paste at X", 0.0, float(canvas_bounds[0]), 0.0, step=5.0, key="group_paste_x")
+            with paste_col3:
+                paste_y = st.number_input("Paste at Y", 0.0, float(canvas_bounds[1]), 0.0, step=5.0, key="group_paste_y")
+            with paste_col4:
+                st.markdown("<div style='height: 1.8rem'></div>", unsafe_allow_html=True)
+                if st.button(f"Paste {len(clipboard)}", key="group_paste", use_container_width=True,
+                             disabled=not clipboard):
+                    place_equipment_batch(
+                        f"Paste {len(clipboard)} units",
+                        lambda manager: paste_group(manager, clipboard, paste_x, paste_y)
+                    )
+        
+        with edit_tab:
+            with st.form("group_bulk_edit", clear_on_submit=False):
+                st.caption("Only checked fields are changed; units without power configuration are skipped.")
+                edit_col1, edit_col2 = st.columns([1, 2])
+                with edit_col1:
+                    set_power = st.checkbox("Power rate", key="group_set_power")
+                    set_hours = st.checkbox("Operation time", key="group_set_hours")
+                    set_fuel = st.checkbox("Fuel type", key="group_set_fuel")
+                with edit_col2:
+                    power_rate = st.number_input("Power Rate (kW)", min_value=0.0, value=100.0, step=10.0)
+                    operation_time = st.number_input("Operation Time (hours/year)", min_value=0.0, max_value=8760.0,
+                                                     value=8000.0, step=100.0)
+                    fuel_type = st.selectbox("Fuel Type", FUEL_TYPES, index=FUEL_TYPES.index("Natural Gas"))
+                
+                if st.form_submit_button("Apply to Selection", use_container_width=True, type="primary"):
+                    edited = apply_group_operation(
+                        f"Edit {len(selection)} units", bulk_edit_group,
+                        power_rate_kw=power_rate if set_power else None,
+                        operation_time_hours=operation_time if set_hours else None,
+                        fuel_type=fuel_type if set_fuel else None
+                    )
+                    if edited:
+                        st.rerun()
+            
+            if st.button("Delete Selected", key="group_delete", use_container_width=True, disabled=not selection):
+                if apply_group_operation(f"Delete {len(selection)} units", delete_group):
+                    st.session_state.show_config_panel = False
+                    st.rerun()
+
 def add_equipment_to_canvas(equipment_template: EquipmentModel):
     """Show position picker for adding equipment to canvas"""
     # Set up the equipment to be placed
@@ -1522,20 +1671,76 @@ def render_position_picker():
                 </div>
                 """, unsafe_allow_html=True)
         
+        # Bulk placement: an array starting at the coordinates above, or an explicit list
+        st.markdown("### Placement Pattern")
+        placement_mode = st.radio(
+            "Placement Pattern",
+            ["Single unit", "Array (rows × columns)", "Coordinate list"],
+            horizontal=True,
+            key="placement_mode",
+            label_visibility="collapsed"
+        )
+        
+        pattern_positions = None
+        if placement_mode == "Array (rows × columns)":
+            default_spacing_x, default_spacing_y = default_pattern_spacing(equipment)
+            array_col1, array_col2, array_col3, array_col4 = st.columns(4)
+            with array_col1:
+                array_rows = st.number_input("Rows", min_value=1, max_value=100, value=2, step=1, key="array_rows")
+            with array_col2:
+                array_columns = st.number_input("Columns", min_value=1, max_value=100, value=3, step=1, key="array_columns")
+            with array_col3:
+                spacing_x = st.number_input("X spacing (m)", min_value=1.0, value=float(default_spacing_x), step=1.0,
+                                            key="array_spacing_x")
+            with array_col4:
+                spacing_y = st.number_input("Y spacing (m)", min_value=1.0, value=float(default_spacing_y), step=1.0,
+                                            key="array_spacing_y")
+            grid_size = st.session_state.canvas_manager.grid_size
+            pattern_positions = array_positions(x_pos, y_pos, int(array_rows), int(array_columns), spacing_x, spacing_y,
+                                                grid_size=grid_size)
+            placed_spacing = (grid_spacing(spacing_x, grid_size), grid_spacing(spacing_y, grid_size))
+            spacing_note = ""
+            if placed_spacing != (spacing_x, spacing_y):
+                spacing_note = f", spaced {placed_spacing[0]:g} × {placed_spacing[1]:g}m on the {grid_size:g}m grid"
+            st.caption(f"{int(array_rows) * int(array_columns)} units starting at ({x_pos:.0f}, {y_pos:.0f}){spacing_note}")
+        elif placement_mode == "Coordinate list":
+            coordinate_text = st.text_area("One 'x, y' per line (meters)", key="placement_coordinates",
+                                           placeholder="20, 40\n40, 40\n60, 40")
+            try:
+                coordinates = parse_coordinate_list(coordinate_text)
+                pattern_positions = ([x for x, _ in coordinates], [y for _, y in coordinates])
+                st.caption(f"{len(coordinates)} units")
+            except ValueError as e:
+                st.error(str(e))
+                pattern_positions = ([], [])
+        
         # Confirm Placement and Cancel in one row
         st.markdown("### Confirm Placement")
         
         action_col1, action_col2 = st.columns(2)
         
         with action_col1:
-            if st.button(
-                "Place Equipment", 
-                use_container_width=True, 
-                type="primary", 
-                key="place_equipment_confirm",
-                help=f"Place {equipment.name} at coordinates ({x_pos:.0f}, {y_pos:.0f})"
+            if pattern_positions is None:
+                if st.button(
+                    "Place Equipment", 
+                    use_container_width=True, 
+                    type="primary", 
+                    key="place_equipment_confirm",
+                    help=f"Place {equipment.name} at coordinates ({x_pos:.0f}, {y_pos:.0f})"
+                ):
+                    place_equipment_at_position(equipment, x_pos, y_pos)
+            elif st.button(
+                f"Place {len(pattern_positions[0])} Units",
+                use_container_width=True,
+                type="primary",
+                key="place_pattern_confirm",
+                disabled=len(pattern_positions[0]) == 0
             ):
-                place_equipment_at_position(equipment, x_pos, y_pos)
+                xs, ys = pattern_positions
+                place_equipment_batch(
+                    f"Add {len(xs)} × {equipment.name}",
+                    lambda manager: place_pattern(manager, equipment, xs, ys)
+                )
         
         with action_col2:
             if st.button("Cancel", use_container_width=True, key="cancel_placement", help="Cancel equipment placement"):
@@ -1552,45 +1757,9 @@ def place_equipment_at_position(equipment_template: EquipmentModel, x_pos: float
     # Save current state before making changes
     save_canvas_state(f"Add {equipment_template.name}")
     
-    # Add to enhanced canvas manager
-    if 'enhanced_canvas_manager' in st.session_state:
-        canvas_manager = st.session_state.enhanced_canvas_manager
-        
-        # Create new equipment instance with unique ID
-        new_equipment = EquipmentModel(
-            id="",  # Will generate new ID
-            name=equipment_template.name,
-            category=equipment_template.category,
-            power_rate_kw=equipment_template.power_rate_kw,
-            operation_time_hours=equipment_template.operation_time_hours,
-            fuel_type=equipment_template.fuel_type,
-            fuel_consumption_rate=equipment_template.fuel_consumption_rate,
-            description=equipment_template.description,
-            icon=equipment_template.icon
-        )
-        
-        # Add equipment to enhanced canvas
-        placed_equipment = canvas_manager.add_equipment(new_equipment, x_pos, y_pos)
-    
-    # Add to legacy canvas manager for compatibility
+    # Add a fresh instance (new id) of the template to the layout store
     if 'canvas_manager' in st.session_state:
-        legacy_canvas = st.session_state.canvas_manager
-        
-        # Create new equipment instance for legacy canvas
-        legacy_equipment = EquipmentModel(
-            id="",  # Will generate new ID
-            name=equipment_template.name,
-            category=equipment_template.category,
-            power_rate_kw=equipment_template.power_rate_kw,
-            operation_time_hours=equipment_template.operation_time_hours,
-            fuel_type=equipment_template.fuel_type,
-            fuel_consumption_rate=equipment_template.fuel_consumption_rate,
-            description=equipment_template.description,
-            icon=equipment_template.icon
-        )
-        
-        # Use the specified positioning
-        legacy_canvas.add_equipment(legacy_equipment, x_pos, y_pos)
+        st.session_state.canvas_manager.add_equipment(clone_equipment(equipment_template), x_pos, y_pos)
     
     # Mark project as unsaved
     st.session_state.project_saved = False
@@ -1602,35 +1771,45 @@ def place_equipment_at_position(equipment_template: EquipmentModel, x_pos: float
     st.success(f"✅ {equipment_template.name} placed at ({x_pos:.1f}, {y_pos:.1f})")
     st.rerun()
 
-def render_canvas():
-    """Render the facility canvas in 3D"""
+def place_equipment_batch(description: str, place):
+    """Run a bulk placement as one history entry and one rerun.
+    
+    `place` receives the canvas store and returns a PlacementResult. The history
+    entry is recorded only if at least one unit was placed.
+    """
     if 'canvas_manager' not in st.session_state:
-        st.error("Canvas not initialized properly.")
         return
-    
     canvas_manager = st.session_state.canvas_manager
+    try:
+        # Edits made before the placement stay their own history entry
+        st.session_state.canvas_history.sync(canvas_manager)
+        result = place(canvas_manager)
+        if result.placed:
+            st.session_state.canvas_history.commit(description, canvas_manager)
+    except Exception as e:
+        st.error(f"Error placing equipment: {str(e)}")
+        return
+    
+    if result.placed:
+        st.session_state.project_saved = False
+    if result.skipped:
+        st.session_state.placement_notice = (
+            f"Placed {len(result.placed)} units; skipped {len(result.skipped)} overlapping position(s)"
+        )
     
+    # Close position picker
+    st.session_state.show_position_picker = False
+    st.session_state.equipment_to_place = None
+    st.rerun()
+
+def build_canvas_figure(canvas_manager: CanvasManager, facility_acres: float,
+                        lod_config: Optional[LevelOfDetailConfig]) -> Tuple[go.Figure, str]:
+    """Build the 3D facility figure; returns (figure, level of detail used)"""
     # Create 3D plotly figure
     fig = go.Figure()
     
-    # Get canvas bounds and facility area
+    # Get canvas bounds
     canvas_bounds = canvas_manager.get_canvas_bounds()
-    project = st.session_state.current_project
-    facility_acres = project.get('facility_size_acres', 1.0)
-    
-    # Add 3D ground plane with grid based on actual facility size
-    ground_x = [0, canvas_bounds[0], canvas_bounds[0], 0, 0]
-    ground_y = [0, 0, canvas_bounds[1], canvas_bounds[1], 0]
-    ground_z = [0, 0, 0, 0, 0]
-    
-    fig.add_trace(go.Scatter3d(
-        x=ground_x, y=ground_y, z=ground_z,
-        mode='lines',
-        line=dict(color='#e2e8f0', width=2),
-        name='Facility Boundary',
-        hovertemplate=f"Facility Area: {facility_acres} acres ({canvas_bounds[0]}m × {canvas_bounds[1]}m)<extra></extra>",
-        showlegend=False
-    ))
     
     # Add grid lines for scale reference - using adaptive spacing
     max_dimension = max(canvas_bounds[0], canvas_bounds[1])
@@ -1645,53 +1824,48 @@ def render_canvas():
     else:                         # Very large facilities (>500m) - 50m grid
         grid_spacing = 50
     
-    # Vertical grid lines
-    for x in range(0, int(canvas_bounds[0]) + 1, int(grid_spacing)):
-        fig.add_trace(go.Scatter3d(
-            x=[x, x], y=[0, canvas_bounds[1]], z=[0, 0],
-            mode='lines',
-            line=dict(color='#000000', width=1),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-    
-    # Horizontal grid lines  
-    for y in range(0, int(canvas_bounds[1]) + 1, int(grid_spacing)):
-        fig.add_trace(go.Scatter3d(
-            x=[0, canvas_bounds[0]], y=[y, y], z=[0, 0],
-            mode='lines',
-            line=dict(color='#000000', width=1),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-    
-    # Add directional arrows and labels to mark X and Y axes
-    arrow_length = min(canvas_bounds[0], canvas_bounds[1]) * 0.15
+    # Facility boundary, with the facility area on hover
+    fig.add_trace(go.Scatter3d(
+        x=[0, canvas_bounds[0], canvas_bounds[0], 0, 0],
+        y=[0, 0, canvas_bounds[1], canvas_bounds[1], 0],
+        z=[0, 0, 0, 0, 0],
+        mode='lines',
+        line=dict(color='#e2e8f0', width=2),
+        name='Facility Boundary',
+        hovertemplate=f"Facility Area: {facility_acres} acres ({canvas_bounds[0]}m × {canvas_bounds[1]}m)<extra></extra>",
+        showlegend=False
+    ))
     
-    # X-axis arrow (red) - pointing right
+    # Ground grid as one polyline trace (None-separated segments); no hover, so equipment hover stays visible
+    grid_segments = grid_line_segments(canvas_bounds[0], canvas_bounds[1], grid_spacing, z=0)
+    grid_x, grid_y, grid_z = polyline_coordinates(grid_segments)
     fig.add_trace(go.Scatter3d(
-        x=[0, arrow_length], y=[0, 0], z=[0, 0],
-        mode='lines+text',
-        line=dict(color='#e53e3e', width=6),
-        text=['', 'X'],
-        textposition='middle right',
-        textfont=dict(size=16, color='#e53e3e'),
-        name='X-Axis',
+        x=grid_x, y=grid_y, z=grid_z,
+        mode='lines',
+        line=dict(color='#000000', width=1),
         showlegend=False,
-        hovertemplate="X-Axis Direction<extra></extra>"
+        hoverinfo='skip'
     ))
     
-    # Y-axis arrow (green) - pointing forward
+    # Add directional arrows and labels to mark X and Y axes (one trace)
+    arrow_length = min(canvas_bounds[0], canvas_bounds[1]) * 0.15
+    arrow_x, arrow_y, arrow_z = polyline_coordinates([
+        [(0, 0, 0), (arrow_length, 0, 0)],  # X-axis (red) - pointing right
+        [(0, 0, 0), (0, arrow_length, 0)]   # Y-axis (green) - pointing forward
+    ])
+    arrow_colors = ['#e53e3e', '#e53e3e', '#38a169', '#38a169', '#38a169']
+    
     fig.add_trace(go.Scatter3d(
-        x=[0, 0], y=[0, arrow_length], z=[0, 0],
+        x=arrow_x, y=arrow_y, z=arrow_z,
         mode='lines+text',
-        line=dict(color='#38a169', width=6),
-        text=['', 'Y'],
+        line=dict(color=arrow_colors, width=6),
+        text=['', 'X', '', '', 'Y'],
         textposition='middle right',
-        textfont=dict(size=16, color='#38a169'),
-        name='Y-Axis',
-        showlegend=False,
-        hovertemplate="Y-Axis Direction<extra></extra>"
+        textfont=dict(size=16, color=arrow_colors),
+        hovertext=['X-Axis Direction', 'X-Axis Direction', '', 'Y-Axis Direction', 'Y-Axis Direction'],
+        hovertemplate="%{hovertext}<extra></extra>",
+        name='Axes',
+        showlegend=False
     ))
     
     # Add origin marker
@@ -1711,18 +1885,16 @@ def render_canvas():
         hovertemplate="Origin Point (0,0)<extra></extra>"
     ))
     
-    # Add 3D equipment to canvas
+    # Add 3D equipment to canvas (one merged mesh per equipment type, customdata = equipment id),
+    # at a level of detail chosen from the unit count and facility extent
+    detail_level = DETAIL_FULL
     if canvas_manager.placed_equipment:
-        for placed_eq in canvas_manager.placed_equipment:
-            equipment = placed_eq.equipment
-            
-            # Get 3D equipment representation
-            equipment_3d = get_equipment_3d_model(equipment, placed_eq.x_position, placed_eq.y_position)
-            
-            # Add equipment to figure
-            for trace in equipment_3d:
-                trace.update(customdata=[equipment.id])
-                fig.add_trace(trace)
+        equipment_traces, detail_level = build_canvas_equipment_traces(
+            canvas_manager.placed_equipment,
+            max(canvas_bounds[0], canvas_bounds[1]),
+            lod_config
+        )
+        fig.add_traces(equipment_traces)
     
     # Configure 3D layout with turntable rotation
     fig.update_layout(
@@ -1777,9 +1949,38 @@ def render_canvas():
         scene_dragmode='turntable'  # Ensure turntable mode is default
     )
     
+    return fig, detail_level
+
+def render_canvas():
+    """Render the facility canvas in 3D"""
+    if 'canvas_manager' not in st.session_state:
+        st.error("Canvas not initialized properly.")
+        return
+    
+    canvas_manager = st.session_state.canvas_manager
+    project = st.session_state.current_project
+    facility_acres = project.get('facility_size_acres', 1.0)
+    lod_config = st.session_state.get('canvas_lod_config')
+    
+    # Reuse the already-built figure when the layout and render options are unchanged
+    if 'canvas_figure_cache' not in st.session_state:
+        st.session_state.canvas_figure_cache = FigureCache()
+    figure_cache = st.session_state.canvas_figure_cache
+    
+    layout_key = layout_fingerprint(
+        canvas_manager.placed_equipment,
+        canvas_manager.get_canvas_bounds(),
+        (facility_acres, lod_config)
+    )
+    cached_figure = figure_cache.get(layout_key)
+    if cached_figure is None:
+        cached_figure = build_canvas_figure(canvas_manager, facility_acres, lod_config)
+        figure_cache.put(layout_key, cached_figure, estimate_figure_bytes(cached_figure[0]))
+    fig, detail_level = cached_figure
+    
     # Display the 3D canvas with turntable rotation and border
-    # Add dynamic key to force refresh when equipment moves
-    canvas_key = f"facility_canvas_3d_{len(canvas_manager.placed_equipment)}_{sum([eq.x_position + eq.y_position for eq in canvas_manager.placed_equipment]) if canvas_manager.placed_equipment else 0}"
+    # Key derives from the layout content: stable while unchanged, refreshed when equipment moves
+    canvas_key = f"facility_canvas_3d_{layout_key[:20]}"
     
     # Add border around canvas area
     st.markdown("""
@@ -1801,6 +2002,12 @@ def render_canvas():
     </style>
     """, unsafe_allow_html=True)
     
+    # Let users know when a large layout is drawn with simplified geometry
+    if detail_level == DETAIL_CLUSTERS:
+        st.caption(f"Showing {len(canvas_manager.placed_equipment):,} units as clustered markers for performance.")
+    elif detail_level != DETAIL_FULL:
+        st.caption(f"Showing {len(canvas_manager.placed_equipment):,} units with simplified geometry ({detail_level}) for performance.")
+    
     # Create container with border class
     with st.container():
         st.markdown('<div class="canvas-container">', unsafe_allow_html=True)
@@ -1830,11 +2037,12 @@ def render_canvas():
             equipment_id = point.customdata
             
             # Find selected equipment
-            for placed_eq in canvas_manager.placed_equipment:
-                if placed_eq.equipment.id == equipment_id:
-                    st.session_state.selected_equipment_for_config = placed_eq
-                    st.session_state.show_config_panel = True
-                    st.rerun()
+            placed_eq = canvas_manager.get_equipment(equipment_id)
+            if placed_eq is not None:
+                canvas_manager.select_equipment(equipment_id)
+                st.session_state.selected_equipment_for_config = placed_eq
+                st.session_state.show_config_panel = True
+                st.rerun()
     
     # Add debug information when equipment is selected
     if st.session_state.get('selected_equipment_for_config'):
@@ -1863,589 +2071,80 @@ def render_canvas():
     else:
         st.sidebar.info("ℹ️ Click on equipment to select and remove it")
 
-def get_equipment_3d_model(equipment, x_pos, y_pos):
-    """Generate 3D model traces for equipment based on type"""
-    traces = []
-    
-    # Base height and scaling factors
-    base_height = 2.0
-    
-    if equipment.category == "Power Generation":
-        if "Turbine" in equipment.name:
-            # Gas Turbine - cylindrical with exhaust stack
-            traces.extend(create_turbine_3d(x_pos, y_pos, equipment))
-        elif "Diesel" in equipment.name:
-            # Diesel Generator - rectangular housing
-            traces.extend(create_generator_3d(x_pos, y_pos, equipment, "diesel"))
-        else:
-            # Gas Engine Generator
-            traces.extend(create_generator_3d(x_pos, y_pos, equipment, "gas"))
-            
-    elif equipment.category == "Process Heating & Steam":
-        if "Boiler" in equipment.name:
-            # Boiler - vertical cylindrical
-            traces.extend(create_boiler_3d(x_pos, y_pos, equipment))
-        elif "Furnace" in equipment.name:
-            # Furnace - box-shaped with stack
-            traces.extend(create_furnace_3d(x_pos, y_pos, equipment))
-        else:
-            # Process Heater
-            traces.extend(create_heater_3d(x_pos, y_pos, equipment))
-            
-    elif equipment.category == "Flaring & Destructor":
-        if "Flare" in equipment.name:
-            # Flare Stack - tall vertical tower
-            traces.extend(create_flare_stack_3d(x_pos, y_pos, equipment))
-        else:
-            # Thermal Oxidizer/Incinerator
-            traces.extend(create_oxidizer_3d(x_pos, y_pos, equipment))
-            
-    elif equipment.category == "Utility":
-        if "Chiller" in equipment.name:
-            # Chiller - horizontal rectangular
-            traces.extend(create_chiller_3d(x_pos, y_pos, equipment))
-        else:
-            # Heater/Reboiler
-            traces.extend(create_utility_3d(x_pos, y_pos, equipment))
-            
-    elif equipment.category == "Drivers & Machinery":
-        if "Compressor" in equipment.name:
-            # Compressor - cylindrical horizontal
-            traces.extend(create_compressor_3d(x_pos, y_pos, equipment))
-        else:
-            # Pump - smaller cylindrical
-            traces.extend(create_pump_3d(x_pos, y_pos, equipment))
-            
-    elif equipment.category == "Non-Combustion":
-        if "Tank" in equipment.name:
-            # Storage tanks - large cylinders
-            traces.extend(create_tank_3d(x_pos, y_pos, equipment))
-        elif "Pipeline" in equipment.name:
-            # Pipeline - horizontal cylinder
-            traces.extend(create_pipeline_3d(x_pos, y_pos, equipment))
-        elif "Building" in equipment.name:
-            # Control building - rectangular structure
-            traces.extend(create_building_3d(x_pos, y_pos, equipment))
-        elif "Fence" in equipment.name:
-            # Fence - linear structure
-            traces.extend(create_fence_3d(x_pos, y_pos, equipment))
-        else:
-            # Entrance - gate structure
-            traces.extend(create_entrance_3d(x_pos, y_pos, equipment))
-    
-    return traces
-
-def create_turbine_3d(x, y, equipment):
-    """Create 3D gas turbine model"""
-    traces = []
-    
-    # Scale based on power rating
-    scale = min(3.0, max(1.0, equipment.power_rate_kw / 2000))
-    width = 8 * scale
-    length = 12 * scale
-    height = 6 * scale
-    
-    # Main turbine housing (cylinder)
-    theta = np.linspace(0, 2*np.pi, 20)
-    z_cyl = np.linspace(2, 2 + height, 10)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_cyl)
-    x_cyl = x + (width/2) * np.cos(theta_mesh)
-    y_cyl = y + (width/2) * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_cyl, y=y_cyl, z=z_mesh,
-        colorscale=[[0, '#4a5568'], [1, '#2d3748']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    # Exhaust stack
-    stack_height = height + 15
-    z_stack = np.linspace(2 + height, 2 + stack_height, 15)
-    theta_stack, z_stack_mesh = np.meshgrid(theta, z_stack)
-    x_stack = x + 2 + (width/6) * np.cos(theta_stack)
-    y_stack = y + 2 + (width/6) * np.sin(theta_stack)
-    
-    traces.append(go.Surface(
-        x=x_stack, y=y_stack, z=z_stack_mesh,
-        colorscale=[[0, '#e2e8f0'], [1, '#cbd5e0']],
-        showscale=False,
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    return traces
-
-def create_generator_3d(x, y, equipment, gen_type):
-    """Create 3D generator model"""
-    traces = []
-    
-    # Scale based on power rating
-    scale = min(2.5, max(0.8, equipment.power_rate_kw / 1500))
-    width = 6 * scale
-    length = 8 * scale
-    height = 4 * scale
-    
-    # Generator housing (rectangular)
-    x_box = [x, x+length, x+length, x, x, x, x+length, x+length, x, x, x, x+length, x+length, x+length, x+length, x]
-    y_box = [y, y, y+width, y+width, y, y, y, y+width, y+width, y+width, y, y, y+width, y+width, y, y]
-    z_box = [0, 0, 0, 0, 0, height, height, height, height, 0, height, height, height, 0, 0, height]
-    
-    traces.append(go.Scatter3d(
-        x=x_box, y=y_box, z=z_box,
-        mode='lines',
-        line=dict(color='#2d3748', width=3),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Type: {gen_type.title()}<br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    # Add exhaust pipe for diesel
-    if gen_type == "diesel":
-        pipe_x = [x + length/2, x + length/2]
-        pipe_y = [y + width/2, y + width/2]
-        pipe_z = [height, height + 8]
-        
-        traces.append(go.Scatter3d(
-            x=pipe_x, y=pipe_y, z=pipe_z,
-            mode='lines',
-            line=dict(color='#4a5568', width=5),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-    
-    return traces
-
-def create_boiler_3d(x, y, equipment):
-    """Create 3D boiler model"""
-    traces = []
-    
-    scale = min(2.0, max(1.0, equipment.power_rate_kw / 2000))
-    radius = 4 * scale
-    height = 12 * scale
-    
-    # Vertical cylindrical boiler
-    theta = np.linspace(0, 2*np.pi, 20)
-    z_cyl = np.linspace(0, height, 15)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_cyl)
-    x_cyl = x + radius * np.cos(theta_mesh)
-    y_cyl = y + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_cyl, y=y_cyl, z=z_mesh,
-        colorscale=[[0, '#4a5568'], [1, '#2d3748']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
-
-def create_furnace_3d(x, y, equipment):
-    """Create 3D furnace model"""
-    traces = []
-    
-    scale = min(2.0, max(1.0, equipment.power_rate_kw / 2500))
-    width = 8 * scale
-    length = 10 * scale
-    height = 8 * scale
-    
-    # Furnace body
-    x_box = [x, x+length, x+length, x, x, x, x+length, x+length, x, x, x, x+length, x+length, x+length, x+length, x]
-    y_box = [y, y, y+width, y+width, y, y, y, y+width, y+width, y+width, y, y, y+width, y+width, y, y]
-    z_box = [0, 0, 0, 0, 0, height, height, height, height, 0, height, height, height, 0, 0, height]
-    
-    traces.append(go.Scatter3d(
-        x=x_box, y=y_box, z=z_box,
-        mode='lines',
-        line=dict(color='#744210', width=3),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    # Stack
-    stack_x = [x + length/2, x + length/2]
-    stack_y = [y + width/2, y + width/2]
-    stack_z = [height, height + 15]
-    
-    traces.append(go.Scatter3d(
-        x=stack_x, y=stack_y, z=stack_z,
-        mode='lines',
-        line=dict(color='#4a5568', width=6),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    return traces
-
-def create_heater_3d(x, y, equipment):
-    """Create 3D heater model"""
-    traces = []
-    
-    scale = min(1.5, max(0.8, equipment.power_rate_kw / 1000))
-    radius = 3 * scale
-    length = 8 * scale
-    
-    # Horizontal cylindrical heater
-    theta = np.linspace(0, 2*np.pi, 16)
-    x_cyl = np.linspace(x, x + length, 10)
-    theta_mesh, x_mesh = np.meshgrid(theta, x_cyl)
-    y_cyl = y + radius * np.cos(theta_mesh)
-    z_cyl = 2 + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_mesh, y=y_cyl, z=z_cyl,
-        colorscale=[[0, '#e53e3e'], [1, '#c53030']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
-
-def create_flare_stack_3d(x, y, equipment):
-    """Create 3D flare stack model"""
-    traces = []
-    
-    # Tall vertical structure
-    height = 35
-    radius = 0.8
-    
-    # Stack tower
-    theta = np.linspace(0, 2*np.pi, 12)
-    z_stack = np.linspace(0, height, 20)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_stack)
-    x_stack = x + radius * np.cos(theta_mesh)
-    y_stack = y + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_stack, y=y_stack, z=z_mesh,
-        colorscale=[[0, '#4a5568'], [1, '#2d3748']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Height: {height}m<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    # Flare tip (flame effect)
-    flame_x = [x, x]
-    flame_y = [y, y]
-    flame_z = [height, height + 5]
-    
-    traces.append(go.Scatter3d(
-        x=flame_x, y=flame_y, z=flame_z,
-        mode='markers',
-        marker=dict(size=8, color='#ff6b35'),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    return traces
+def current_project_base() -> Optional[Dict]:
+    """Saved document the session's next save is merged against"""
+    worker = st.session_state.get('autosave_worker')
+    if worker is not None and worker.base is not None:
+        return worker.base
+    return st.session_state.get('project_base')
 
-def create_oxidizer_3d(x, y, equipment):
-    """Create 3D thermal oxidizer model"""
-    traces = []
-    
-    scale = min(2.0, max(1.0, equipment.power_rate_kw / 1500))
-    width = 6 * scale
-    height = 8 * scale
-    
-    # Cylindrical oxidizer
-    theta = np.linspace(0, 2*np.pi, 16)
-    z_cyl = np.linspace(0, height, 10)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_cyl)
-    x_cyl = x + width/2 * np.cos(theta_mesh)
-    y_cyl = y + width/2 * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_cyl, y=y_cyl, z=z_mesh,
-        colorscale=[[0, '#e53e3e'], [1, '#c53030']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
+def set_project_base(base: Optional[Dict]):
+    st.session_state.project_base = base
+    worker = st.session_state.get('autosave_worker')
+    if worker is not None:
+        worker.set_base(base)
 
-def create_chiller_3d(x, y, equipment):
-    """Create 3D chiller model"""
-    traces = []
-    
-    scale = min(2.0, max(1.0, equipment.power_rate_kw / 1000))
-    width = 8 * scale
-    length = 12 * scale
-    height = 6 * scale
-    
-    # Chiller unit (rectangular)
-    x_box = [x, x+length, x+length, x, x, x, x+length, x+length, x, x, x, x+length, x+length, x+length, x+length, x]
-    y_box = [y, y, y+width, y+width, y, y, y, y+width, y+width, y+width, y, y, y+width, y+width, y, y]
-    z_box = [0, 0, 0, 0, 0, height, height, height, height, 0, height, height, height, 0, 0, height]
-    
-    traces.append(go.Scatter3d(
-        x=x_box, y=y_box, z=z_box,
-        mode='lines',
-        line=dict(color='#3182ce', width=3),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Type: Cooling System<extra></extra>"
-    ))
-    
-    return traces
-
-def create_utility_3d(x, y, equipment):
-    """Create 3D utility equipment model"""
-    traces = []
-    
-    scale = min(1.5, max(0.8, equipment.power_rate_kw / 800))
-    width = 4 * scale
-    length = 6 * scale
-    height = 4 * scale
-    
-    # Utility box
-    x_box = [x, x+length, x+length, x, x, x, x+length, x+length, x, x, x, x+length, x+length, x+length, x+length, x]
-    y_box = [y, y, y+width, y+width, y, y, y, y+width, y+width, y+width, y, y, y+width, y+width, y, y]
-    z_box = [0, 0, 0, 0, 0, height, height, height, height, 0, height, height, height, 0, 0, height]
-    
-    traces.append(go.Scatter3d(
-        x=x_box, y=y_box, z=z_box,
-        mode='lines',
-        line=dict(color='#38a169', width=3),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
-
-def create_compressor_3d(x, y, equipment):
-    """Create 3D compressor model"""
-    traces = []
-    
-    scale = min(2.0, max(1.0, equipment.power_rate_kw / 2000))
-    radius = 3 * scale
-    length = 10 * scale
-    
-    # Horizontal cylindrical compressor
-    theta = np.linspace(0, 2*np.pi, 16)
-    x_cyl = np.linspace(x, x + length, 10)
-    theta_mesh, x_mesh = np.meshgrid(theta, x_cyl)
-    y_cyl = y + radius * np.cos(theta_mesh)
-    z_cyl = 2 + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_mesh, y=y_cyl, z=z_cyl,
-        colorscale=[[0, '#805ad5'], [1, '#6b46c1']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
-
-def create_pump_3d(x, y, equipment):
-    """Create 3D pump model"""
-    traces = []
-    
-    scale = min(1.5, max(0.6, equipment.power_rate_kw / 500))
-    radius = 2 * scale
-    height = 3 * scale
-    
-    # Pump housing (small cylinder)
-    theta = np.linspace(0, 2*np.pi, 12)
-    z_cyl = np.linspace(0, height, 8)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_cyl)
-    x_cyl = x + radius * np.cos(theta_mesh)
-    y_cyl = y + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_cyl, y=y_cyl, z=z_mesh,
-        colorscale=[[0, '#3182ce'], [1, '#2c5aa0']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}<extra></extra>"
-    ))
-    
-    return traces
-
-def create_tank_3d(x, y, equipment):
-    """Create 3D storage tank model"""
-    traces = []
-    
-    # Large cylindrical tank
-    radius = 8
-    height = 15
-    
-    if "Crude" in equipment.name:
-        radius = 12
-        height = 10
-    
-    theta = np.linspace(0, 2*np.pi, 20)
-    z_cyl = np.linspace(0, height, 15)
-    theta_mesh, z_mesh = np.meshgrid(theta, z_cyl)
-    x_cyl = x + radius * np.cos(theta_mesh)
-    y_cyl = y + radius * np.sin(theta_mesh)
-    
-    color = '#e2e8f0' if "Storage" in equipment.name else '#805ad5'
-    
-    traces.append(go.Surface(
-        x=x_cyl, y=y_cyl, z=z_mesh,
-        colorscale=[[0, color], [1, '#a0aec0']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Radius: {radius}m<br>Height: {height}m<extra></extra>"
-    ))
-    
-    return traces
-
-def create_pipeline_3d(x, y, equipment):
-    """Create 3D pipeline model - centered at coordinates (x,y)"""
-    traces = []
-    
-    # Horizontal pipe centered at the given coordinates
-    length = 20
-    radius = 0.5
-    
-    # Create pipeline running along X-axis, centered at (x,y)
-    # X coordinates: from (x-10) to (x+10)
-    x_start = x - length/2
-    x_end = x + length/2
-    x_pipe = np.linspace(x_start, x_end, 15)
-    
-    # Create circular cross-section at each point
-    theta = np.linspace(0, 2*np.pi, 16)
-    
-    # Create meshgrid for surface
-    x_mesh = np.repeat(x_pipe[:, np.newaxis], len(theta), axis=1)
-    theta_mesh = np.repeat(theta[np.newaxis, :], len(x_pipe), axis=0)
-    
-    # Pipeline centered at Y coordinate
-    y_mesh = y + radius * np.cos(theta_mesh)
-    z_mesh = 1 + radius * np.sin(theta_mesh)
-    
-    traces.append(go.Surface(
-        x=x_mesh, y=y_mesh, z=z_mesh,
-        colorscale=[[0, '#4a5568'], [1, '#2d3748']],
-        showscale=False,
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Length: {length}m<br>Center: ({x:.1f}m, {y:.1f}m)<br>X Range: {x_start:.1f} to {x_end:.1f}<extra></extra>"
-    ))
-    
-    # Add center marker for debugging
-    traces.append(go.Scatter3d(
-        x=[x], y=[y], z=[2],
-        mode='markers',
-        marker=dict(size=8, color='red', symbol='cross'),
-        name=f"{equipment.name} Center",
-        hovertemplate=f"<b>Pipeline Center</b><br>X: {x:.1f}m<br>Y: {y:.1f}m<extra></extra>",
-        showlegend=False
-    ))
-    
-    return traces
+def apply_project_changes(changes: Dict):
+    """Bring edits merged in from another session into this session, keeping its own unsaved edits"""
+    project = st.session_state.current_project
+    project.update(changes.get('set', {}))
+    for key in changes.get('unset', []):
+        project.pop(key, None)
+    if changes.get('units') and 'canvas_manager' in st.session_state:
+        save_canvas_state("Merge Changes From Another Session")
+        apply_unit_changes(st.session_state.canvas_manager, changes['units'])
 
-def create_building_3d(x, y, equipment):
-    """Create 3D control building model"""
-    traces = []
-    
-    width = 8
-    length = 12
-    height = 6
-    
-    # Building structure - centered at given coordinates
-    x_offset = length / 2
-    y_offset = width / 2
-    x_box = [x-x_offset, x+x_offset, x+x_offset, x-x_offset, x-x_offset, x-x_offset, x+x_offset, x+x_offset, x-x_offset, x-x_offset, x-x_offset, x+x_offset, x+x_offset, x+x_offset, x+x_offset, x-x_offset]
-    y_box = [y-y_offset, y-y_offset, y+y_offset, y+y_offset, y-y_offset, y-y_offset, y-y_offset, y+y_offset, y+y_offset, y+y_offset, y-y_offset, y-y_offset, y+y_offset, y+y_offset, y-y_offset, y-y_offset]
-    z_box = [0, 0, 0, 0, 0, height, height, height, height, 0, height, height, height, 0, 0, height]
-    
-    traces.append(go.Scatter3d(
-        x=x_box, y=y_box, z=z_box,
-        mode='lines',
-        line=dict(color='#4a5568', width=3),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Size: {length}m × {width}m × {height}m<extra></extra>"
-    ))
-    
-    return traces
+def reload_current_project():
+    """Discard this session's unsaved edits and load the project as last saved"""
+    try:
+        project = get_project_journal(project_file(st.session_state.current_project['name'])).load()
+    except Exception as e:
+        st.error(f"Error reloading project: {str(e)}")
+        return False
+    st.session_state.current_project = project
+    set_project_base(revision_base(project))
+    st.session_state.pop('project_conflict', None)
+    reset_canvas_store()
+    st.session_state.project_saved = True
+    return True
 
-def create_fence_3d(x, y, equipment):
-    """Create 3D fence model"""
-    traces = []
-    
-    length = 15
-    height = 3
-    
-    # Fence line - centered at given coordinates
-    fence_x = [x - length/2, x + length/2]
-    fence_y = [y, y]
-    fence_z = [0, 0]
-    
-    traces.append(go.Scatter3d(
-        x=fence_x, y=fence_y, z=fence_z,
-        mode='lines',
-        line=dict(color='#4a5568', width=4),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Length: {length}m<br>Height: {height}m<extra></extra>"
-    ))
-    
-    # Fence posts - centered along the fence
-    for i in range(0, length + 1, 3):
-        post_x = [x - length/2 + i, x - length/2 + i]
-        post_y = [y, y]
-        post_z = [0, height]
+def autosave_current_project():
+    """Hand unsaved changes to the background autosave and pick up writes it has finished"""
+    try:
+        worker = st.session_state.get('autosave_worker')
+        if worker is None or not st.session_state.current_project or 'canvas_manager' not in st.session_state:
+            return
         
-        traces.append(go.Scatter3d(
-            x=post_x, y=post_y, z=post_z,
-            mode='lines',
-            line=dict(color='#4a5568', width=3),
-            showlegend=False,
-            hoverinfo='skip'
-        ))
-    
-    return traces
-
-def create_entrance_3d(x, y, equipment):
-    """Create 3D entrance gate model"""
-    traces = []
-    
-    width = 8
-    height = 4
-    
-    # Gate posts - centered at given coordinates
-    post1_x = [x - width/2, x - width/2]
-    post1_y = [y, y]
-    post1_z = [0, height]
-    
-    post2_x = [x + width/2, x + width/2]
-    post2_y = [y, y]
-    post2_z = [0, height]
-    
-    traces.append(go.Scatter3d(
-        x=post1_x, y=post1_y, z=post1_z,
-        mode='lines',
-        line=dict(color='#4a5568', width=5),
-        name=equipment.name,
-        hovertemplate=f"<b>{equipment.name}</b><br>Width: {width}m<br>Height: {height}m<extra></extra>"
-    ))
-    
-    traces.append(go.Scatter3d(
-        x=post2_x, y=post2_y, z=post2_z,
-        mode='lines',
-        line=dict(color='#4a5568', width=5),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
-    
-    # Gate bar - centered between posts
-    gate_x = [x - width/2, x + width/2]
-    gate_y = [y, y]
-    gate_z = [height/2, height/2]
-    
-    traces.append(go.Scatter3d(
-        x=gate_x, y=gate_y, z=gate_z,
-        mode='lines',
-        line=dict(color='#e2e8f0', width=3),
-        showlegend=False,
-        hoverinfo='skip'
-    ))
+        conflict = st.session_state.get('project_conflict') or (str(worker.conflict) if worker.conflict else None)
+        if conflict:
+            st.error(f"Your changes were not saved. {conflict}.")
+            if st.button("Discard my changes and reload", key="reload_after_conflict"):
+                if reload_current_project():
+                    st.rerun()
+        if worker.last_error:
+            st.error(f"Autosave failed: {worker.last_error}")
+        
+        # Edits another session saved meanwhile were merged into the last autosave; show them here too
+        changes = worker.take_merged_changes()
+        if changes is not None:
+            apply_project_changes(changes)
+            st.session_state.project_base = worker.base
+            st.info("Merged changes saved by another session.")
+        
+        if not st.session_state.autosave_enabled:
+            return
+        
+        worker.idle_seconds = st.session_state.autosave_idle_seconds
+        if not st.session_state.get('project_saved', True) or changes is not None:
+            # Schedule before polling so a write of an older state never marks newer edits as saved
+            worker.schedule(project_file(st.session_state.current_project['name']),
+                            project_fields(st.session_state.current_project),
+                            st.session_state.canvas_manager.snapshot())
+            if worker.poll():
+                st.session_state.project_saved = True
     
-    return traces
+    except Exception as e:
+        st.error(f"Error scheduling autosave: {str(e)}")
 
 def save_current_project():
     """Save the current project state"""
@@ -2454,31 +2153,53 @@ def save_current_project():
             return False
         
         project_name = st.session_state.current_project['name']
-        project_file = f"projects/{project_name.lower().replace(' ', '_')}.json"
+        filename = project_file(project_name)
+        
+        # A queued autosave would only repeat (or, finishing late, undo) this write
+        worker = st.session_state.get('autosave_worker')
+        if worker is not None:
+            worker.cancel()
+            changes = worker.take_merged_changes()
+            if changes is not None:
+                apply_project_changes(changes)
+        base = current_project_base()
         
         # Update project with current canvas state
         if 'canvas_manager' in st.session_state:
             canvas_manager = st.session_state.canvas_manager
             
-            # Save equipment data
-            equipment_data = []
-            for placed_eq in canvas_manager.placed_equipment:
-                equipment_data.append({
-                    'equipment': placed_eq.equipment.to_dict(),
-                    'x_position': placed_eq.x_position,
-                    'y_position': placed_eq.y_position
-                })
-            
-            # Calculate and save summary data including facilities efficiency
-            summary = canvas_manager.get_equipment_summary()
-            
-            st.session_state.current_project['equipment'] = equipment_data
-            st.session_state.current_project['summary'] = summary  # Save the calculated summary
-            st.session_state.current_project['last_modified'] = datetime.now().isoformat()
-        
-        # Save to file
-        with open(project_file, 'w') as f:
-            json.dump(st.session_state.current_project, f, indent=2)
+            # Equipment entries and summary (including facilities efficiency) for the current layout
+            snapshot = canvas_manager.snapshot()
+            document = project_document(project_fields(st.session_state.current_project), snapshot,
+                                        canvas_manager.get_equipment_summary())
+            st.session_state.current_project.update(document)
+        
+        # Append only what changed to the project's journal (compacted into the file periodically);
+        # edits saved by other sessions since `base` are merged, conflicting ones refuse the save
+        try:
+            committed = get_project_journal(filename).save(st.session_state.current_project, base=base)
+        except RevisionConflict as e:
+            st.session_state.project_conflict = str(e)
+            st.error(f"Your changes were not saved. {e}.")
+            return False
+        st.session_state.pop('project_conflict', None)
+        if committed is not st.session_state.current_project:
+            apply_project_changes(diff_project(st.session_state.current_project, committed))
+            st.session_state.current_project = revision_base(committed)
+            st.info("Merged changes saved by another session.")
+        set_project_base(revision_base(committed))
+        
+        if worker is not None and 'canvas_manager' in st.session_state:
+            worker.attach(filename, project_fields(st.session_state.current_project),
+                          st.session_state.canvas_manager.snapshot(), base=current_project_base())
+        
+        # Keep undo history alongside the project so it survives a reload
+        if st.session_state.get('persist_canvas_history', True) and 'canvas_manager' in st.session_state:
+            st.session_state.canvas_history.save(history_file(project_name), st.session_state.canvas_manager)
+        
+        # Derived results for the reporting page (written only if the sidecar is out of date)
+        if 'canvas_manager' in st.session_state:
+            facility_results(st.session_state.canvas_manager, results_file(project_name))
         
         st.session_state.project_saved = True
         return True
@@ -2519,8 +2240,7 @@ def auto_arrange_equipment():
             new_x = x_spacing * (col + 1)
             new_y = y_spacing * (row + 1)
             
-            placed_eq.x_position = new_x
-            placed_eq.y_position = new_y
+            canvas_manager.update_equipment_position(placed_eq, new_x, new_y)
         
         st.session_state.project_saved = False
         return True
@@ -2530,104 +2250,25 @@ def auto_arrange_equipment():
         return False
 
 def save_canvas_state(action_description: str = "Canvas Action"):
-    """Save current canvas state to history for undo/redo functionality"""
+    """Label the upcoming canvas change for undo/redo (only the changed fields are stored)"""
     try:
         if 'canvas_manager' not in st.session_state:
             return
         
-        canvas_manager = st.session_state.canvas_manager
-        
-        # Create a deep copy of current equipment state
-        current_state = {
-            "action": action_description,
-            "timestamp": datetime.now().isoformat(),
-            "equipment": []
-        }
-        
-        for placed_eq in canvas_manager.placed_equipment:
-            equipment_state = {
-                "equipment_dict": placed_eq.equipment.to_dict(),
-                "x_position": placed_eq.x_position,
-                "y_position": placed_eq.y_position
-            }
-            current_state["equipment"].append(equipment_state)
-        
-        # Add to history
-        history = st.session_state.canvas_history
-        current_index = st.session_state.canvas_history_index
-        
-        # Remove any redo history if we're not at the end
-        if current_index < len(history) - 1:
-            st.session_state.canvas_history = history[:current_index + 1]
-        
-        # Add new state
-        st.session_state.canvas_history.append(current_state)
-        st.session_state.canvas_history_index = len(st.session_state.canvas_history) - 1
-        
-        # Limit history size to prevent memory issues
-        max_history = 20
-        if len(st.session_state.canvas_history) > max_history:
-            st.session_state.canvas_history = st.session_state.canvas_history[-max_history:]
-            st.session_state.canvas_history_index = len(st.session_state.canvas_history) - 1
+        st.session_state.canvas_history.record(action_description, st.session_state.canvas_manager)
             
     except Exception as e:
         st.error(f"Error saving canvas state: {str(e)}")
 
-def restore_canvas_state(state_data: Dict):
-    """Restore canvas to a specific state"""
-    try:
-        if 'canvas_manager' not in st.session_state:
-            return False
-        
-        canvas_manager = st.session_state.canvas_manager
-        
-        # Clear current equipment
-        canvas_manager.placed_equipment = []
-        
-        # Restore equipment from state
-        for eq_state in state_data["equipment"]:
-            # Recreate equipment from dictionary
-            equipment = EquipmentModel.from_dict(eq_state["equipment_dict"])
-            
-            # Create placed equipment
-            from src.models.placed_equipment import PlacedEquipment
-            placed_eq = PlacedEquipment(
-                equipment=equipment,
-                x_position=eq_state["x_position"],
-                y_position=eq_state["y_position"]
-            )
-            
-            canvas_manager.placed_equipment.append(placed_eq)
-        
-        return True
-        
-    except Exception as e:
-        st.error(f"Error restoring canvas state: {str(e)}")
-        return False
-
 def undo_canvas_action():
     """Undo the last canvas action"""
     try:
-        history = st.session_state.canvas_history
-        current_index = st.session_state.canvas_history_index
-        
-        if current_index < 0 or len(history) == 0:
+        if 'canvas_manager' not in st.session_state:
             return False
         
-        # Move to previous state
-        if current_index > 0:
-            previous_state = history[current_index - 1]
-            if restore_canvas_state(previous_state):
-                st.session_state.canvas_history_index = current_index - 1
-                st.session_state.project_saved = False
-                return True
-        else:
-            # If we're at the first state, clear everything
-            if 'canvas_manager' in st.session_state:
-                st.session_state.canvas_manager.placed_equipment = []
-                st.session_state.canvas_history_index = -1
-                st.session_state.project_saved = False
-                return True
+        if st.session_state.canvas_history.undo(st.session_state.canvas_manager):
+            st.session_state.project_saved = False
+            return True
         
         return False
         
@@ -2638,16 +2279,10 @@ def undo_canvas_action():
 def redo_canvas_action():
     """Redo the last undone canvas action"""
     try:
-        history = st.session_state.canvas_history
-        current_index = st.session_state.canvas_history_index
-        
-        if current_index >= len(history) - 1:
+        if 'canvas_manager' not in st.session_state:
             return False
         
-        # Move to next state
-        next_state = history[current_index + 1]
-        if restore_canvas_state(next_state):
-            st.session_state.canvas_history_index = current_index + 1
+        if st.session_state.canvas_history.redo(st.session_state.canvas_manager):
             st.session_state.project_saved = False
             return True
         
@@ -2670,46 +2305,31 @@ def render_equipment_summary_table():
             key="equipment_table_period"
         )
     
-    # Calculate time multiplier
-    time_multipliers = {
-        "Day": 1,
-        "Month": 30.44,  # Average days per month
-        "Year": 365.25   # Accounting for leap years
-    }
-    multiplier = time_multipliers[time_period]
+    # Time multiplier (days in the selected period)
+    multiplier = period_multiplier(time_period)
     
     # Check if we have equipment
     has_equipment = canvas_manager and canvas_manager.placed_equipment
     
     if has_equipment:
+        # Cached snapshot; a period change only rescales these numbers
+        metrics = canvas_manager.get_facility_metrics()
+        
         # Prepare table data
         table_data = []
         
-        for placed_eq in canvas_manager.placed_equipment:
-            equipment = placed_eq.equipment
-            
-            # Calculate production metrics
-            crude_processing = equipment.calculate_crude_processing_capacity()
-            power_generation = equipment.calculate_power_production()
-            co2_emission_daily = equipment.calculate_co2_emission()  # Already daily kg CO2
+        for unit in metrics.units:
+            crude_processing = unit.crude_bbl_day
+            power_generation = unit.power_kw
+            co2_emission_daily = unit.co2_kg  # Already daily kg CO2
             
             # Apply time period multiplier and determine units
             crude_processing_period = crude_processing * multiplier if crude_processing > 0 else None
             
-            # Power generation: kW for Day, kWh for Month/Year
-            if time_period == "Day":
-                power_generation_period = power_generation if power_generation > 0 else None  # kW instantaneous
-                power_unit = "kW"
-            else:
-                # For month/year, convert to energy (kWh) = power (kW) × hours in period × capacity factor
-                if power_generation > 0:
-                    hours_in_period = 24 * multiplier  # 24 hours/day × days in period
-                    capacity_factor = 0.85  # Typical capacity factor for continuous operation
-                    power_generation_period = power_generation * hours_in_period * capacity_factor
-                    power_unit = "kWh"
-                else:
-                    power_generation_period = None
-                    power_unit = "kWh"
+            # Power generation: kW for Day, kWh (at the typical capacity factor) for Month/Year
+            power_generation_period, power_unit = power_for_period(power_generation, time_period)
+            if power_generation <= 0:
+                power_generation_period = None
             
             co2_emission_period = co2_emission_daily * multiplier if co2_emission_daily > 0 else None  # Scale daily CO2 to period
             
@@ -2722,9 +2342,9 @@ def render_equipment_summary_table():
             co2_display = f"{co2_emission_period:,.0f}" if co2_emission_period else "N/A"
             
             table_data.append({
-                "Equipment": equipment.name,
-                "Category": equipment.category,
-                "Fuel": equipment.fuel_type if equipment.fuel_type != "None" else "N/A",
+                "Equipment": unit.name,
+                "Category": unit.category,
+                "Fuel": unit.fuel_type if unit.fuel_type != "None" else "N/A",
                 f"Crude (bbl/{period_abbrev})": crude_display,
                 f"Power ({power_unit})": power_display,
                 f"CO2 (kg/{period_abbrev})": co2_display
@@ -2791,28 +2411,16 @@ def render_equipment_summary_table():
     
     if has_equipment:
         with col1:
-            total_crude = sum(equipment.calculate_crude_processing_capacity() for equipment in 
-                            [eq.equipment for eq in canvas_manager.placed_equipment]) * multiplier
+            total_crude = metrics.crude_for_period(time_period)
             st.metric(
                 f"Total Crude Processing ({time_period.lower()})",
                 f"{total_crude:,.0f} bbl" if total_crude > 0 else "0 bbl"
             )
         
         with col2:
-            total_power_kw = sum(equipment.calculate_power_production() for equipment in 
-                               [eq.equipment for eq in canvas_manager.placed_equipment])
-            
-            if time_period == "Day":
-                power_metric = total_power_kw
-                power_label = "Total Power Generation"
-                power_unit_summary = "kW"
-            else:
-                # For month/year, convert to energy (kWh)
-                hours_in_period = 24 * multiplier
-                capacity_factor = 0.85
-                power_metric = total_power_kw * hours_in_period * capacity_factor
-                power_label = "Total Energy Generation"
-                power_unit_summary = "kWh"
+            # kW for a day, energy (kWh) for month/year
+            power_metric, power_unit_summary = metrics.power_for_period(time_period)
+            power_label = "Total Power Generation" if time_period == "Day" else "Total Energy Generation"
                 
             st.metric(
                 power_label,
@@ -2820,9 +2428,7 @@ def render_equipment_summary_table():
             )
         
         with col3:
-            total_co2_daily = sum(equipment.calculate_co2_emission() for equipment in 
-                                [eq.equipment for eq in canvas_manager.placed_equipment])
-            total_co2_period = total_co2_daily * multiplier  # Scale daily CO2 to selected period
+            total_co2_period = metrics.co2_for_period(time_period)  # Scale daily CO2 to selected period
             st.metric(
                 f"Total CO2 Emissions ({time_period.lower()})",
                 f"{total_co2_period:,.0f} kg" if total_co2_period > 0 else "0 kg"
@@ -2852,20 +2458,9 @@ def render_equipment_summary_table():
     
     if has_equipment:
         with eff_col1:
-            # Calculate annual values for efficiency metrics
-            total_crude_annual = sum(equipment.calculate_crude_processing_capacity() for equipment in 
-                                   [eq.equipment for eq in canvas_manager.placed_equipment]) * 365.25  # Annual crude processing
-            total_co2_daily = sum(equipment.calculate_co2_emission() for equipment in 
-                                [eq.equipment for eq in canvas_manager.placed_equipment])
-            total_co2_annual = total_co2_daily * 365.25  # Annual CO2 emissions
-            
-            # CO2 intensity per crude oil processed (t CO₂/tonne crude)
-            if total_crude_annual > 0:
-                # Convert: bbl to tonnes (1 bbl crude ≈ 0.136 tonnes), kg CO2 to tonnes CO2
-                crude_annual_tonnes = total_crude_annual * 0.136  # Convert bbl to tonnes
-                co2_annual_tonnes = total_co2_annual / 1000  # Convert kg to tonnes
-                co2_per_crude = co2_annual_tonnes / crude_annual_tonnes  # t CO₂/tonne crude
-                co2_crude_display = f"{co2_per_crude:.3f}"
+            # CO2 intensity per crude oil processed (t CO₂/tonne crude, annual basis)
+            if metrics.crude_tonnes_year > 0:
+                co2_crude_display = f"{metrics.co2_per_crude_tonne:.3f}"
             else:
                 co2_crude_display = "N/A"
             
@@ -2875,21 +2470,9 @@ def render_equipment_summary_table():
             )
         
         with eff_col2:
-            # Calculate annual energy generation for efficiency metric
-            total_energy_annual_kwh = 0
-            for equipment in [eq.equipment for eq in canvas_manager.placed_equipment]:
-                power_kw = equipment.calculate_power_production()
-                if power_kw > 0:
-                    # Use actual operation hours from equipment configuration
-                    annual_operation_hours = equipment.operation_time_hours
-                    capacity_factor = 0.85  # Typical capacity factor
-                    energy_kwh = power_kw * annual_operation_hours * capacity_factor
-                    total_energy_annual_kwh += energy_kwh
-            
-            # CO2 intensity per energy generated (kg CO₂/kWh)
-            if total_energy_annual_kwh > 0:
-                co2_per_kwh = total_co2_annual / total_energy_annual_kwh  # kg CO₂/kWh
-                co2_energy_display = f"{co2_per_kwh:.3f}"
+            # CO2 intensity per energy generated (kg CO₂/kWh, annual basis)
+            if metrics.generation_kwh_year > 0:
+                co2_energy_display = f"{metrics.co2_per_kwh:.3f}"
             else:
                 co2_energy_display = "N/A"
             
@@ -1,29 +1,25 @@
 import streamlit as st
 import os
-import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-def load_existing_projects() -> List[Dict]:
-    """Load existing projects from the projects directory"""
-    projects = []
-    projects_dir = "projects"
-    
-    if os.path.exists(projects_dir):
-        for filename in os.listdir(projects_dir):
-            if filename.endswith('.json') and not filename.endswith('_report.json'):
-                try:
-                    with open(os.path.join(projects_dir, filename), 'r') as f:
-                        project_data = json.load(f)
-                        # Validate that required fields exist
-                        if isinstance(project_data, dict) and 'name' in project_data:
-                            projects.append(project_data)
-                        else:
-                            st.warning(f"⚠️ Skipping invalid project file: {filename}")
-                except Exception as e:
-                    st.error(f"Error loading project {filename}: {e}")
+from src.models.project_store import (
+    ProjectSummary, RevisionConflict, create_project, delete_project_files, get_project_index, history_file,
+    project_file, results_file, revision_base
+)
+from src.models.project_binary import binary_file, current_binary_project, json_to_binary
+from src.models.canvas_store import PRELOADED_FLEET_KEY
+
+def load_existing_projects(search_term: str = "") -> List[ProjectSummary]:
+    """List projects from the metadata index (only changed files are re-read)"""
+    index = get_project_index()
+    for summary in index.invalid_files():
+        if summary.error.startswith("Skipping"):
+            st.warning(f"⚠️ {summary.error}")
+        else:
+            st.error(summary.error)
     
-    return sorted(projects, key=lambda x: x.get('last_modified', ''), reverse=True)
+    return index.list_projects(search=search_term)
 
 def save_project(project_name: str, facility_acres: float, facility_area_m2: float, facility_width_m: float, facility_height_m: float, description: str = "") -> bool:
     """Save a new project with flexible facility size options"""
@@ -45,28 +41,76 @@ def save_project(project_name: str, facility_acres: float, facility_area_m2: flo
         # Ensure projects directory exists
         os.makedirs("projects", exist_ok=True)
         
-        # Save project file
-        filename = f"projects/{project_name.replace(' ', '_').lower()}.json"
-        with open(filename, 'w') as f:
-            json.dump(project_data, f, indent=2)
+        # Save project file (fails if another session created the same project meanwhile)
+        project_data = create_project(project_file(project_name), project_data)
+        st.session_state.project_base = revision_base(project_data)
         
         return True
+    except FileExistsError:
+        st.error("A project with this name already exists. Please choose a different name.")
+        return False
     except Exception as e:
         st.error(f"Error saving project: {e}")
         return False
 
-def delete_project(project_name: str) -> bool:
-    """Delete a project"""
+def delete_project(project_name: str, expected_revision: Optional[int] = None) -> bool:
+    """Delete a project (refused if it was saved again since `expected_revision` was listed)"""
     try:
-        filename = f"projects/{project_name.replace(' ', '_').lower()}.json"
-        if os.path.exists(filename):
-            os.remove(filename)
-            return True
+        # Journal, undo history, results and binary copy saved alongside the project go with it
+        return delete_project_files(project_file(project_name), expected_revision,
+                                    sidecars=(history_file(project_name), results_file(project_name),
+                                              binary_file(project_name)))
+    except RevisionConflict as e:
+        st.error(f"{e}. Review the latest version before deleting it.")
         return False
     except Exception as e:
         st.error(f"Error deleting project: {e}")
         return False
 
+def export_binary_project(project_name: str) -> bool:
+    """Write a project's binary copy; opening the project reads it until the project is saved again"""
+    try:
+        json_to_binary(project_file(project_name))
+        return True
+    except Exception as e:
+        st.error(f"Error exporting project: {e}")
+        return False
+
+def open_project(summary: ProjectSummary) -> bool:
+    """Load a listed project into the session (the full document is only read here)"""
+    index = get_project_index()
+    try:
+        binary = current_binary_project(os.path.join(index.directory, summary.filename))
+        if binary is not None:
+            # Up-to-date binary copy: its columns become the layout store's fleet without a per-unit pass
+            project = binary.to_document()
+            st.session_state[PRELOADED_FLEET_KEY] = binary.exact_fleet()
+        else:
+            project = index.load_project(summary)
+            st.session_state.pop(PRELOADED_FLEET_KEY, None)
+    except Exception as e:
+        st.error(f"Error loading project {summary.filename}: {e}")
+        return False
+    
+    st.session_state.current_project = project
+    st.session_state.project_base = revision_base(project)  # What later saves are merged against
+    st.session_state.pop('project_conflict', None)
+    st.session_state.canvas_equipment = project.get('equipment', [])
+    
+    # Fix: Use canvas_config dimensions instead of facility_size_meters
+    canvas_config = project.get('canvas_config', {})
+    canvas_width = canvas_config.get('width_m', (project.get('facility_size_acres', 1.0) * 4047) ** 0.5)
+    canvas_height = canvas_config.get('height_m', (project.get('facility_size_acres', 1.0) * 4047) ** 0.5)
+    
+    st.session_state.facility_scale = {
+        "acres": project.get('facility_size_acres', 1.0),
+        "meters": project.get('facility_size_meters', 4047),
+        "canvas_width_m": canvas_width,
+        "canvas_height_m": canvas_height
+    }
+    st.session_state.current_page = 'builder'
+    return True
+
 def main_page():
     """Main page for project management"""
     
@@ -420,8 +464,7 @@ def main_page():
             if create_button:
                 if project_name.strip():
                     # Check if project already exists
-                    existing_projects = load_existing_projects()
-                    if any(p.get('name', '').lower() == project_name.lower() for p in existing_projects if 'name' in p):
+                    if get_project_index().find(project_name.strip()) is not None:
                         st.error("A project with this name already exists. Please choose a different name.")
                     else:
                         if save_project(project_name.strip(), facility_acres, facility_area_m2, facility_width_m, facility_height_m, project_description.strip()):
@@ -470,17 +513,15 @@ def main_page():
             
             filtered_projects = existing_projects
             if search_term:
-                filtered_projects = [p for p in existing_projects 
-                                   if search_term.lower() in p.get('name', '').lower() or 
-                                      search_term.lower() in p.get('description', '').lower()]
+                filtered_projects = load_existing_projects(search_term)
             
             st.markdown(f"**{len(filtered_projects)} project(s) available**")
             
-            for project in filtered_projects[:10]:  # Show max 10 projects
-                project_name = project.get('name', 'Unnamed Project')
-                facility_size = project.get('facility_size_acres', 'Unknown')
-                last_modified = project.get('last_modified', 'Unknown')[:10] if project.get('last_modified') else 'Unknown'
-                description = project.get('description', 'No description available')
+            for summary in filtered_projects[:10]:  # Show max 10 projects
+                project_name = summary.name or 'Unnamed Project'
+                facility_size = summary.facility_size_acres if summary.facility_size_acres is not None else 'Unknown'
+                last_modified = summary.last_modified[:10] if summary.last_modified else 'Unknown'
+                description = summary.description or 'No description available'
                 
                 st.markdown(f"""
                 <div class="project-card">
@@ -493,31 +534,22 @@ def main_page():
                 </div>
                 """, unsafe_allow_html=True)
                 
-                col_open, col_delete = st.columns([4, 1])
+                col_open, col_export, col_delete = st.columns([3, 1, 1])
                 
                 with col_open:
                     if st.button("Open Project", key=f"open_{project_name}", use_container_width=True, type="primary"):
-                        # Load project and navigate to builder
-                        st.session_state.current_project = project
-                        st.session_state.canvas_equipment = project.get('equipment', [])
-                        
-                        # Fix: Use canvas_config dimensions instead of facility_size_meters
-                        canvas_config = project.get('canvas_config', {})
-                        canvas_width = canvas_config.get('width_m', (project.get('facility_size_acres', 1.0) * 4047) ** 0.5)
-                        canvas_height = canvas_config.get('height_m', (project.get('facility_size_acres', 1.0) * 4047) ** 0.5)
-                        
-                        st.session_state.facility_scale = {
-                            "acres": project.get('facility_size_acres', 1.0),
-                            "meters": project.get('facility_size_meters', 4047),
-                            "canvas_width_m": canvas_width,
-                            "canvas_height_m": canvas_height
-                        }
-                        st.session_state.current_page = 'builder'
-                        st.rerun()
+                        if open_project(summary):
+                            st.rerun()
+                
+                with col_export:
+                    if st.button("Export", key=f"export_{project_name}",
+                                 help="Write a binary copy (.dpb) that opens faster until the project is next saved"):
+                        if export_binary_project(project_name):
+                            st.success(f"Binary copy of '{project_name}' written")
                 
                 with col_delete:
                     if st.button("Delete", key=f"delete_{project_name}", help="Delete project permanently"):
-                        if delete_project(project_name):
+                        if delete_project(project_name, summary.revision):
                             st.success(f"Project '{project_name}' deleted successfully!")
                             st.rerun()
                         else:
@@ -13,6 +13,9 @@ from dataclasses import dataclass, field
 import json
 import math
 
+from src.models.project_store import results_file
+from src.models.results_store import facility_results
+
 def reporting_page():
     """Professional CO2 analysis and reporting dashboard"""
     
@@ -415,21 +418,12 @@ def reporting_page():
     
     # Ensure canvas_manager is populated with project equipment
     if not canvas_manager.placed_equipment and st.session_state.current_project:
-        from src.models.equipment_model import EquipmentModel
-        from src.models.placed_equipment import PlacedEquipment
+        from src.models.canvas_store import project_layout
         
         # Load existing equipment from project
-        project_equipment = st.session_state.current_project.get('equipment', [])
-        if project_equipment:
-            for eq_data in project_equipment:
-                # Recreate equipment from saved data
-                equipment = EquipmentModel.from_dict(eq_data['equipment'])
-                placed_eq = PlacedEquipment(
-                    equipment=equipment,
-                    x_position=eq_data['x_position'],
-                    y_position=eq_data['y_position']
-                )
-                canvas_manager.placed_equipment.append(placed_eq)
+        loaded_equipment = project_layout(st.session_state.current_project)
+        if loaded_equipment:
+            canvas_manager.load_equipment(loaded_equipment)
     project = st.session_state.current_project
     
     # Navigation section with enhanced professional styling
@@ -464,54 +458,14 @@ def reporting_page():
         """, unsafe_allow_html=True)
         return
     
-    # Generate summary data
-    summary = canvas_manager.get_equipment_summary()
-    
-    # Try to get pre-calculated summary from saved project first (more reliable)
-    if st.session_state.current_project and 'summary' in st.session_state.current_project:
-        saved_summary = st.session_state.current_project['summary']
-        # Use saved values if they exist and are valid
-        if saved_summary.get('facilities_efficiency', 0) > 0:
-            total_co2 = saved_summary['total_co2_kg']
-            total_crude_processing_bbl_day = saved_summary['total_crude_processing_bbl_day']
-            total_crude_processing_tonnes_year = saved_summary['total_crude_processing_tonnes_year']
-            facilities_efficiency = saved_summary['facilities_efficiency']
-        else:
-            # Fallback to calculated values
-            total_co2 = summary['total_co2_kg']
-            total_crude_processing_bbl_day = summary['total_crude_processing_bbl_day']
-            total_crude_processing_tonnes_year = summary['total_crude_processing_tonnes_year']
-            facilities_efficiency = summary['facilities_efficiency']
-    else:
-        # Check if canvas_manager has equipment or if we need direct calculation
-        if len(canvas_manager.placed_equipment) == 0 and st.session_state.current_project:
-            # Direct calculation from project data - match builder page exactly
-            from src.models.equipment_model import EquipmentModel
-            total_co2_direct = 0.0
-            total_crude_direct = 0.0
-            
-            project_equipment = st.session_state.current_project.get('equipment', [])
-            for eq_data in project_equipment:
-                equipment = EquipmentModel.from_dict(eq_data['equipment'])
-                total_co2_direct += equipment.calculate_co2_emission()
-                total_crude_direct += equipment.calculate_crude_processing_capacity()
-            
-            # Use exact same calculation as builder page
-            total_crude_annual = total_crude_direct * 365.25  # Same as builder page
-            total_co2_annual = total_co2_direct * 365.25  # Same as builder page
-            crude_annual_tonnes = total_crude_annual * 0.136  # Convert bbl to tonnes
-            co2_annual_tonnes = total_co2_annual / 1000  # Convert kg to tonnes
-            
-            total_co2 = total_co2_direct
-            total_crude_processing_bbl_day = total_crude_direct
-            total_crude_processing_tonnes_year = crude_annual_tonnes
-            facilities_efficiency = co2_annual_tonnes / crude_annual_tonnes if crude_annual_tonnes > 0 else 0
-        else:
-            # Use calculated values from canvas_manager
-            total_co2 = summary['total_co2_kg']
-            total_crude_processing_bbl_day = summary['total_crude_processing_bbl_day']
-            total_crude_processing_tonnes_year = summary['total_crude_processing_tonnes_year']
-            facilities_efficiency = summary['facilities_efficiency']
+    # Derived results for this layout: from memory, else the project's results sidecar when it was
+    # written for the same layout hash and engine version, else recomputed (and the sidecar refreshed)
+    facility_metrics = facility_results(canvas_manager, results_file(project['name']))
+    summary = facility_metrics.as_summary()
+    total_co2 = summary['total_co2_kg']
+    total_crude_processing_bbl_day = summary['total_crude_processing_bbl_day']
+    total_crude_processing_tonnes_year = summary['total_crude_processing_tonnes_year']
+    facilities_efficiency = summary['facilities_efficiency']
     
     # Executive Summary Section with enhanced metrics
     st.markdown("""
@@ -894,10 +848,11 @@ def reporting_page():
     """, unsafe_allow_html=True)
     
     equipment_data = []
-    for placed in canvas_manager.placed_equipment:
+    average_co2 = total_co2 / facility_metrics.equipment_count
+    for placed, unit in zip(canvas_manager.placed_equipment, facility_metrics.units):
         equipment = placed.equipment
-        co2_emission = equipment.calculate_co2_emission()
-        fuel_consumption = equipment.calculate_fuel_consumption()
+        co2_emission = unit.co2_kg
+        fuel_consumption = unit.fuel_consumption
         
         equipment_data.append({
             'Equipment Name': equipment.name,
@@ -909,7 +864,7 @@ def reporting_page():
             'CO2 Emissions (kg/year)': co2_emission,
             'CO2 Emissions (tons/year)': co2_emission / 1000,
             'Position': f"({placed.x_position:.0f}, {placed.y_position:.0f})",
-            'Efficiency Rating': 'High' if co2_emission < (total_co2 / len(canvas_manager.placed_equipment)) else 'Standard'
+            'Efficiency Rating': 'High' if co2_emission < average_co2 else 'Standard'
         })
     
     df_equipment = pd.DataFrame(equipment_data)
@@ -1073,16 +1028,13 @@ def reporting_page():
     emission_density_per_m2 = total_co2 / facility_area_m2 if facility_area_m2 > 0 else 0
     
     # Power efficiency analysis
-    total_power = sum([eq.equipment.power_rate_kw for eq in canvas_manager.placed_equipment if eq.equipment.requires_power_config and eq.equipment.power_rate_kw > 0])
-    total_operating_hours = sum([eq.equipment.operation_time_hours for eq in canvas_manager.placed_equipment if eq.equipment.requires_power_config and eq.equipment.operation_time_hours > 0])
-    avg_capacity_factor = (total_operating_hours / len([eq for eq in canvas_manager.placed_equipment if eq.equipment.requires_power_config])) / 8760 * 100 if len([eq for eq in canvas_manager.placed_equipment if eq.equipment.requires_power_config]) > 0 else 0
+    total_power = facility_metrics.configured_power_kw
+    total_operating_hours = facility_metrics.configured_operating_hours
+    power_config_count = facility_metrics.power_config_count
+    avg_capacity_factor = (total_operating_hours / power_config_count) / 8760 * 100 if power_config_count > 0 else 0
     
     # Energy intensity calculations
-    total_energy_mwh = sum([
-        eq.equipment.power_rate_kw * eq.equipment.operation_time_hours / 1000
-        for eq in canvas_manager.placed_equipment 
-        if eq.equipment.requires_power_config and eq.equipment.power_rate_kw > 0 and eq.equipment.operation_time_hours > 0
-    ])
+    total_energy_mwh = facility_metrics.configured_energy_mwh
     energy_intensity = total_co2 / total_energy_mwh if total_energy_mwh > 0 else 0  # kg CO2 per MWh
     
     # Performance benchmarking
@@ -1336,7 +1288,7 @@ def reporting_page():
     
     # Calculate operational KPIs
     total_units = summary['total_equipment']
-    operational_units = len([eq for eq in canvas_manager.placed_equipment if eq.equipment.requires_power_config and eq.equipment.operation_time_hours > 0])
+    operational_units = facility_metrics.operational_count
     operational_availability = (operational_units / total_units * 100) if total_units > 0 else 0
     
     # Cost analysis (simplified estimates)
@@ -2507,7 +2459,8 @@ def save_report_to_file():
         if 'canvas_manager' in st.session_state and st.session_state.current_project:
             canvas_manager = st.session_state.canvas_manager
             project = st.session_state.current_project
-            summary = canvas_manager.get_equipment_summary()
+            facility_metrics = facility_results(canvas_manager, results_file(project['name']))
+            summary = facility_metrics.as_summary()
             
             report_data = {
                 'project_name': project['name'],
@@ -2515,12 +2468,12 @@ def save_report_to_file():
                 'summary': summary,
                 'equipment_details': [
                     {
-                        'name': placed.equipment.name,
-                        'category': placed.equipment.category,
-                        'co2_emissions': placed.equipment.calculate_co2_emission(),
+                        'name': unit.name,
+                        'category': unit.category,
+                        'co2_emissions': unit.co2_kg,
                         'position': {'x': placed.x_position, 'y': placed.y_position}
                     }
-                    for placed in canvas_manager.placed_equipment
+                    for placed, unit in zip(canvas_manager.placed_equipment, facility_metrics.units)
                 ]
             }
             
@@ -0,0 +1,208 @@
+"""
+Debounced background autosave: coalesces bursts of edits into one journal write off the UI thread
+"""
+import copy
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from .equipment_model import EquipmentModel
+from .facility_metrics import FacilityMetrics, metrics_fingerprint
+from .fleet import EquipmentFleet
+from .persistent_layout import EQUIPMENT_FIELDS, LayoutSnapshot, RECORD_FIELDS
+from .project_journal import diff_project, get_project_journal
+from .project_store import RevisionConflict, results_path, revision_base
+from .results_store import save_results
+from .running_totals import RunningTotals
+
+DEFAULT_IDLE_SECONDS = 2.0  # Quiet period after the last edit before writing
+WORKER_EXIT_SECONDS = 300.0  # An idle worker thread exits; the next edit starts a new one
+DERIVED_FIELDS = ("equipment", "summary", "last_modified", "equipment_count")  # Rebuilt from the layout on save
+
+
+def project_fields(project_data: Dict) -> Dict:
+    """Top-level project fields that are not derived from the layout"""
+    return {key: value for key, value in project_data.items() if key not in DERIVED_FIELDS}
+
+
+def equipment_entries(snapshot: LayoutSnapshot) -> List[Dict]:
+    """Saved equipment entries for a layout version, in placement order"""
+    entries = []
+    for equipment_id, record in snapshot.records():
+        values = dict(zip(RECORD_FIELDS, record))
+        entries.append({
+            'equipment': {'id': equipment_id, **{name: values[name] for name in EQUIPMENT_FIELDS}},
+            'x_position': values['x_position'],
+            'y_position': values['y_position'],
+            'rotation': values['rotation'],
+            'connections': list(values['connections'])
+        })
+    return entries
+
+
+def metrics_for_snapshot(snapshot: LayoutSnapshot) -> FacilityMetrics:
+    """Facility metrics for a layout version, computed without the live canvas store"""
+    equipment_list = [
+        EquipmentModel(id=equipment_id, **dict(zip(EQUIPMENT_FIELDS, record)))
+        for equipment_id, record in snapshot.records()
+    ]
+    totals = RunningTotals()
+    totals.rebuild(equipment_list, EquipmentFleet.from_equipment(equipment_list).compute())
+    return FacilityMetrics.build(metrics_fingerprint(equipment_list), equipment_list, totals)
+
+
+def project_document(fields: Dict, snapshot: LayoutSnapshot, summary: Optional[Dict] = None) -> Dict:
+    """Full project document for saving (the summary is computed from the snapshot if not given)"""
+    document = copy.deepcopy(fields)
+    document['equipment'] = equipment_entries(snapshot)
+    document['summary'] = summary if summary is not None else metrics_for_snapshot(snapshot).as_summary()
+    document['last_modified'] = datetime.now().isoformat()
+    return document
+
+
+class AutosaveWorker:
+    """Per-session background saver.
+
+    Each rerun hands over the project fields and an O(1) layout snapshot with
+    schedule(); every new change pushes the deadline back, so a burst of edits
+    produces one write once the session has been idle for `idle_seconds`. The
+    document is built and written on the worker thread. The worker never touches
+    session state: poll() tells the next rerun that everything scheduled is on disk.
+
+    Writes are saved against `base`, the document as of the last save, so edits
+    another session wrote meanwhile are merged in; take_merged_changes() hands their
+    part of the result to the next rerun, and nothing more is saved until it has been
+    taken (the session's layout lacks those edits until then). A conflicting write
+    stops autosave until attach().
+    """
+
+    def __init__(self, idle_seconds: float = DEFAULT_IDLE_SECONDS):
+        self.idle_seconds = idle_seconds
+        self.last_error: Optional[str] = None
+        self.conflict: Optional[RevisionConflict] = None
+        self._condition = threading.Condition()
+        self._write_lock = threading.Lock()  # Held while a document is being written
+        self._thread: Optional[threading.Thread] = None
+        self._baseline: Optional[Tuple[str, Dict, LayoutSnapshot]] = None  # Last state scheduled or saved
+        self._pending: Optional[Tuple[int, str, Dict, LayoutSnapshot]] = None
+        self._deadline = 0.0
+        self._generation = 0  # Last change scheduled
+        self._saved_generation = 0  # Last change written
+        self._saved_unseen = False  # A write finished since the last poll()
+        self._base: Optional[Dict] = None  # Document as of the last save, to merge against
+        self._merged_changes: Optional[Dict] = None  # Another session's edits merged into the last write
+
+    @property
+    def base(self) -> Optional[Dict]:
+        with self._condition:
+            return self._base
+
+    def set_base(self, base: Optional[Dict]):
+        with self._condition:
+            self._base = base
+
+    def take_merged_changes(self) -> Optional[Dict]:
+        """Journal-style record of edits merged in from another session (returned once), if any"""
+        with self._condition:
+            changes, self._merged_changes = self._merged_changes, None
+            return changes
+
+    def _matches_baseline(self, project_path: str, fields: Dict, snapshot: LayoutSnapshot) -> bool:
+        if self._baseline is None:
+            return False
+        path, saved_fields, saved_snapshot = self._baseline
+        return (path == project_path and saved_fields == fields and
+                next(snapshot.changes_since(saved_snapshot), None) is None)
+
+    def attach(self, project_path: str, fields: Dict, snapshot: LayoutSnapshot, base: Optional[Dict] = None):
+        """Treat this state as saved (e.g. the project was just loaded or saved explicitly)"""
+        with self._condition:
+            self._pending = None
+            self._baseline = (project_path, copy.deepcopy(fields), snapshot)
+            self._saved_generation = self._generation
+            self._base = base
+            self._merged_changes = None
+            self.conflict = None
+
+    def schedule(self, project_path: str, fields: Dict, snapshot: LayoutSnapshot) -> bool:
+        """Queue the current state for saving; returns False when nothing changed since the last schedule"""
+        with self._condition:
+            if (self.conflict is not None or self._merged_changes is not None or
+                    self._matches_baseline(project_path, fields, snapshot)):
+                return False
+            fields = copy.deepcopy(fields)
+            self._baseline = (project_path, fields, snapshot)
+            self._generation += 1
+            self._pending = (self._generation, project_path, fields, snapshot)
+            self._deadline = time.monotonic() + self.idle_seconds
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="project-autosave", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return True
+
+    def poll(self) -> bool:
+        """True once after every scheduled change has been written"""
+        with self._condition:
+            saved = self._saved_unseen and self._pending is None and self._saved_generation == self._generation
+            if saved:
+                self._saved_unseen = False
+            return saved
+
+    def cancel(self):
+        """Drop any queued save and wait for a write in progress (call before saving explicitly)"""
+        with self._condition:
+            self._pending = None
+            self._baseline = None
+        with self._write_lock:
+            pass
+
+    def _next_job(self) -> Optional[Tuple[int, str, Dict, LayoutSnapshot]]:
+        """Wait until a queued save has been idle long enough; None when the thread should exit"""
+        with self._condition:
+            while True:
+                if self._pending is None:
+                    if not self._condition.wait(timeout=WORKER_EXIT_SECONDS) and self._pending is None:
+                        self._thread = None
+                        return None
+                    continue
+                remaining = self._deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(timeout=remaining)
+            job, self._pending = self._pending, None
+            # Taken while still holding the condition so cancel() cannot slip in between
+            self._write_lock.acquire()
+            return job
+
+    def _run(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            generation, project_path, fields, snapshot = job
+            try:
+                metrics = metrics_for_snapshot(snapshot)
+                document = project_document(fields, snapshot, metrics.as_summary())
+                committed = get_project_journal(project_path).save(document, base=self.base)
+                changes = diff_project(document, committed) if committed is not document else None
+                if changes is None:
+                    # Reports open from the sidecar instead of recomputing this layout
+                    save_results(results_path(project_path), metrics,
+                                 [entry['equipment']['id'] for entry in document['equipment']])
+                with self._condition:
+                    self._base = revision_base(committed)
+                    self._merged_changes = changes
+                    self._saved_generation = max(self._saved_generation, generation)
+                    self._saved_unseen = True
+                    self.last_error = None
+            except RevisionConflict as e:
+                with self._condition:
+                    self.conflict = e
+            except Exception as e:
+                with self._condition:
+                    self.last_error = str(e)
+                    self._baseline = None  # Retry on the next rerun
+            finally:
+                self._write_lock.release()
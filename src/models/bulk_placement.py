@@ -0,0 +1,120 @@
+"""
+Pattern and clipboard placement of many equipment units in one operation
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .equipment_model import EquipmentModel
+from .placed_equipment import CanvasManager, PlacedEquipment
+
+DEFAULT_PATTERN_GAP_M = 5.0  # Same clearance _resolve_overlaps leaves between units
+
+
+@dataclass
+class PlacementResult:
+    """Outcome of a bulk placement"""
+    placed: List[PlacedEquipment] = field(default_factory=list)
+    skipped: List[Tuple[float, float]] = field(default_factory=list)  # Requested positions that overlapped
+
+
+@dataclass
+class ClipboardEntry:
+    """A copied unit's configuration and its offset from the copied group's origin"""
+    equipment_dict: Dict
+    dx: float
+    dy: float
+    rotation: float = 0.0
+
+
+def clone_equipment(template: EquipmentModel) -> EquipmentModel:
+    """Fresh equipment instance (new id) with the template's configuration"""
+    data = template.to_dict()
+    data["id"] = ""
+    return EquipmentModel.from_dict(data)
+
+
+def default_pattern_spacing(template: EquipmentModel) -> Tuple[float, float]:
+    """Centre-to-centre spacing that leaves the default clearance between footprints"""
+    width, height = PlacedEquipment(equipment=template, x_position=0, y_position=0).get_equipment_size()
+    return width + DEFAULT_PATTERN_GAP_M, height + DEFAULT_PATTERN_GAP_M
+
+
+def grid_spacing(spacing: float, grid_size: float) -> float:
+    """Spacing rounded up to a whole number of grid cells (at least one), so snapped positions keep it exactly"""
+    return max(1, math.ceil(spacing / grid_size - 1e-9)) * grid_size
+
+
+def array_positions(origin_x: float, origin_y: float, rows: int, columns: int, spacing_x: float, spacing_y: float,
+                    grid_size: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Centres of a rows x columns array starting at the origin, row by row.
+
+    Placement snaps every position to the grid; with `grid_size` the origin is snapped and
+    the spacing rounded up to whole grid cells first, so the placed array stays evenly
+    spaced and no unit is closer to its neighbour than requested.
+    """
+    if grid_size:
+        origin_x, origin_y = round(origin_x / grid_size) * grid_size, round(origin_y / grid_size) * grid_size
+        spacing_x, spacing_y = grid_spacing(spacing_x, grid_size), grid_spacing(spacing_y, grid_size)
+    grid_x, grid_y = np.meshgrid(origin_x + spacing_x * np.arange(columns), origin_y + spacing_y * np.arange(rows))
+    return grid_x.ravel(), grid_y.ravel()
+
+
+def parse_coordinate_list(text: str) -> List[Tuple[float, float]]:
+    """Parse one "x, y" pair per line (blank lines and # comments are ignored)"""
+    coordinates = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.replace(";", ",").replace("\t", ",").split(",")
+        if len(parts) != 2:
+            parts = line.split()
+        try:
+            x, y = (float(part) for part in parts)
+        except ValueError:
+            raise ValueError(f"Line {line_number}: expected 'x, y' but got '{line}'")
+        coordinates.append((x, y))
+    return coordinates
+
+
+def place_pattern(canvas_manager: CanvasManager, template: EquipmentModel, xs, ys,
+                  skip_overlaps: bool = True) -> PlacementResult:
+    """Place one clone of the template at every position"""
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    equipment_list = [clone_equipment(template) for _ in range(len(xs))]
+    placed, skipped = canvas_manager.add_equipment_batch(equipment_list, xs, ys, skip_overlaps)
+    return PlacementResult(placed, [(float(xs[index]), float(ys[index])) for index in skipped])
+
+
+def copy_group(canvas_manager: CanvasManager, equipment_ids: List[str]) -> List[ClipboardEntry]:
+    """Copy units relative to the top-left corner of their centres"""
+    placed_list = [placed for placed in (canvas_manager.get_equipment(equipment_id) for equipment_id in equipment_ids)
+                   if placed is not None]
+    if not placed_list:
+        return []
+    origin_x = min(placed.x_position for placed in placed_list)
+    origin_y = min(placed.y_position for placed in placed_list)
+    return [
+        ClipboardEntry(placed.equipment.to_dict(), placed.x_position - origin_x, placed.y_position - origin_y,
+                       placed.rotation)
+        for placed in placed_list
+    ]
+
+
+def paste_group(canvas_manager: CanvasManager, clipboard: List[ClipboardEntry], x: float, y: float,
+                skip_overlaps: bool = True) -> PlacementResult:
+    """Insert copies of the clipboard with its origin at (x, y)"""
+    if not clipboard:
+        return PlacementResult()
+    equipment_list = [clone_equipment(EquipmentModel.from_dict(entry.equipment_dict)) for entry in clipboard]
+    xs = np.array([x + entry.dx for entry in clipboard])
+    ys = np.array([y + entry.dy for entry in clipboard])
+    placed, skipped = canvas_manager.add_equipment_batch(equipment_list, xs, ys, skip_overlaps)
+
+    rotations = {equipment.id: entry.rotation for equipment, entry in zip(equipment_list, clipboard)}
+    for unit in placed:
+        canvas_manager.set_rotation(unit, rotations[unit.equipment.id])
+    return PlacementResult(placed, [(float(xs[index]), float(ys[index])) for index in skipped])
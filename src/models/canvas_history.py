@@ -0,0 +1,270 @@
+"""
+Delta-based undo/redo history for the canvas store, bounded by memory and persistable
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .placed_equipment import CanvasManager
+from .persistent_layout import EQUIPMENT_FIELDS, RECORD_FIELDS, LayoutSnapshot, Record, placed_from_record
+
+HISTORY_FORMAT_VERSION = 1
+
+
+def _record_from_json(values: List) -> Record:
+    values = list(values)
+    values[-1] = tuple(values[-1])  # connections
+    return tuple(values)
+
+
+def state_fingerprint(snapshot: LayoutSnapshot) -> str:
+    """Order-independent hash of a layout version"""
+    state = snapshot.as_dict()
+    digest = hashlib.blake2b(digest_size=16)
+    for equipment_id in sorted(state):
+        digest.update(f"{equipment_id}\x1f{state[equipment_id]!r}\x1e".encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class HistoryEntry:
+    """Changes made by one action: whole records for added/removed units, changed fields otherwise"""
+    action: str
+    timestamp: str
+    added: Dict[str, Record] = field(default_factory=dict)
+    removed: Dict[str, Record] = field(default_factory=dict)
+    before: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    after: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    size_bytes: int = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            "action": self.action,
+            "timestamp": self.timestamp,
+            "added": self.added,
+            "removed": self.removed,
+            "before": self.before,
+            "after": self.after
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'HistoryEntry':
+        entry = cls(
+            action=data["action"],
+            timestamp=data["timestamp"],
+            added={key: _record_from_json(value) for key, value in data.get("added", {}).items()},
+            removed={key: _record_from_json(value) for key, value in data.get("removed", {}).items()},
+            before=data.get("before", {}),
+            after=data.get("after", {})
+        )
+        entry.size_bytes = len(json.dumps(data))
+        return entry
+
+
+def diff_snapshots(old: LayoutSnapshot, new: LayoutSnapshot, action: str) -> Optional[HistoryEntry]:
+    """Entry turning the old version into the new one, or None if they match.
+
+    Only subtrees the two versions do not share are visited, so the cost follows
+    the size of the edit rather than the size of the layout.
+    """
+    entry = HistoryEntry(action=action, timestamp=datetime.now().isoformat())
+    for equipment_id, previous, record in new.changes_since(old):
+        if previous is None:
+            entry.added[equipment_id] = record
+        elif record is None:
+            entry.removed[equipment_id] = previous
+        else:
+            changed = [index for index, (a, b) in enumerate(zip(previous, record)) if a != b]
+            entry.before[equipment_id] = {RECORD_FIELDS[index]: previous[index] for index in changed}
+            entry.after[equipment_id] = {RECORD_FIELDS[index]: record[index] for index in changed}
+    if not (entry.added or entry.removed or entry.before):
+        return None
+    entry.size_bytes = len(json.dumps(entry.to_dict()))
+    return entry
+
+
+class CanvasHistory:
+    """Undo/redo as a list of deltas between immutable layout snapshots.
+
+    Call record() before an action and sync() (or undo/redo) afterwards; edits made
+    without record() are captured as "Edit" entries at the next sync. Memory is capped
+    in bytes; a snapshot kept every `checkpoint_every` entries lets seek() jump far
+    without replaying every delta. Snapshots share structure with the live layout, so
+    they pin only the nodes the entries after them replaced.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024, checkpoint_every: int = 25):
+        self.max_bytes = max_bytes
+        self.checkpoint_every = checkpoint_every
+        self.entries: List[HistoryEntry] = []
+        self.index = -1  # Last applied entry; -1 means at the oldest retained state
+        self.checkpoints: Dict[int, LayoutSnapshot] = {}  # entry index -> layout after it
+        self.total_bytes = 0
+        self._shadow = LayoutSnapshot()
+        self._pending_action: Optional[str] = None
+
+    @property
+    def can_undo(self) -> bool:
+        return self.index >= 0
+
+    @property
+    def can_redo(self) -> bool:
+        return self.index < len(self.entries) - 1
+
+    def attach(self, canvas_manager: CanvasManager):
+        """Start a fresh history from the store's current layout"""
+        self.entries = []
+        self.index = -1
+        self.checkpoints = {}
+        self.total_bytes = 0
+        self._shadow = canvas_manager.snapshot()
+        self._pending_action = None
+
+    def record(self, action: str, canvas_manager: CanvasManager):
+        """Label the next change; anything changed before this call becomes its own entry"""
+        self.sync(canvas_manager)
+        self._pending_action = action
+
+    def commit(self, action: str, canvas_manager: CanvasManager) -> Optional[HistoryEntry]:
+        """Record changes made since the last sync as one entry labelled `action`"""
+        self._pending_action = action
+        return self.sync(canvas_manager)
+
+    def sync(self, canvas_manager: CanvasManager) -> Optional[HistoryEntry]:
+        """Turn changes since the last sync into a history entry"""
+        current = canvas_manager.snapshot()
+        entry = diff_snapshots(self._shadow, current, self._pending_action or "Edit")
+        self._pending_action = None
+        if entry is None:
+            return None
+
+        # A new action discards the redo tail
+        for index in range(self.index + 1, len(self.entries)):
+            self.total_bytes -= self.entries[index].size_bytes
+            self.checkpoints.pop(index, None)
+        del self.entries[self.index + 1:]
+
+        self.entries.append(entry)
+        self.index = len(self.entries) - 1
+        self.total_bytes += entry.size_bytes
+        self._shadow = current
+        if (self.index + 1) % self.checkpoint_every == 0:
+            self.checkpoints[self.index] = current
+        self._enforce_budget()
+        return entry
+
+    def undo(self, canvas_manager: CanvasManager) -> bool:
+        self.sync(canvas_manager)
+        if not self.can_undo:
+            return False
+        self._apply(canvas_manager, self.entries[self.index], reverse=True)
+        self.index -= 1
+        return True
+
+    def redo(self, canvas_manager: CanvasManager) -> bool:
+        self.sync(canvas_manager)
+        if not self.can_redo:
+            return False
+        self.index += 1
+        self._apply(canvas_manager, self.entries[self.index], reverse=False)
+        return True
+
+    def seek(self, canvas_manager: CanvasManager, target: int) -> bool:
+        """Move to the state after entry `target` (-1 for the oldest retained state)"""
+        self.sync(canvas_manager)
+        if not -1 <= target < len(self.entries):
+            return False
+
+        # Jump to the nearest checkpoint when that replays fewer deltas than walking
+        nearest = min(self.checkpoints, key=lambda index: abs(index - target), default=None)
+        if nearest is not None and abs(nearest - target) + 1 < abs(self.index - target):
+            canvas_manager.restore_snapshot(self.checkpoints[nearest])
+            self._shadow = self.checkpoints[nearest]
+            self.index = nearest
+
+        while self.index > target:
+            self._apply(canvas_manager, self.entries[self.index], reverse=True)
+            self.index -= 1
+        while self.index < target:
+            self.index += 1
+            self._apply(canvas_manager, self.entries[self.index], reverse=False)
+        return True
+
+    def _apply(self, canvas_manager: CanvasManager, entry: HistoryEntry, reverse: bool):
+        """Apply an entry (or its inverse) to the store, touching only changed units"""
+        to_remove, to_add = (entry.added, entry.removed) if reverse else (entry.removed, entry.added)
+        field_values = entry.before if reverse else entry.after
+
+        if to_remove:
+            canvas_manager.remove_equipment_group(set(to_remove))
+        if to_add:
+            canvas_manager.restore_equipment([placed_from_record(key, record) for key, record in to_add.items()])
+
+        for equipment_id, values in field_values.items():
+            placed = canvas_manager.get_equipment(equipment_id)
+            if placed is None:
+                continue
+            equipment = placed.equipment
+            for name in EQUIPMENT_FIELDS:
+                if name in values:
+                    setattr(equipment, name, values[name])
+            if any(name in values for name in EQUIPMENT_FIELDS):
+                canvas_manager.refresh_equipment(equipment)
+            if "rotation" in values:
+                canvas_manager.set_rotation(placed, values["rotation"])
+            if "x_position" in values or "y_position" in values:
+                canvas_manager.update_equipment_position(placed, values.get("x_position", placed.x_position),
+                                                         values.get("y_position", placed.y_position))
+            if "connections" in values:
+                canvas_manager.set_connections(equipment_id, list(values["connections"]))
+
+        self._shadow = canvas_manager.snapshot()
+
+    def _enforce_budget(self):
+        """Evict the oldest entries (and the checkpoints after them) until the deltas fit"""
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            if self.index < 0:
+                break  # Everything retained is redo history; keep it
+            evicted = self.entries.pop(0)
+            self.total_bytes -= evicted.size_bytes
+            self.index -= 1
+            # A checkpoint after the evicted entry now describes the oldest retained state (-1)
+            self.checkpoints = {index - 1: value for index, value in self.checkpoints.items() if index >= 0}
+
+    # Persistence alongside the project file
+    def save(self, path: str, canvas_manager: CanvasManager):
+        """Write the history to a sidecar file (the store must match the saved project layout)"""
+        self.sync(canvas_manager)
+        data = {
+            "format_version": HISTORY_FORMAT_VERSION,
+            "head_fingerprint": state_fingerprint(self._shadow),
+            "index": self.index,
+            "entries": [entry.to_dict() for entry in self.entries]
+        }
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str, canvas_manager: CanvasManager) -> bool:
+        """Resume a saved history if it was written for the store's current layout"""
+        self.attach(canvas_manager)
+        if not os.path.exists(path):
+            return False
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if (data.get("format_version") != HISTORY_FORMAT_VERSION or
+                data.get("head_fingerprint") != state_fingerprint(self._shadow)):
+            return False  # Written for a different layout (e.g. the project was edited elsewhere)
+
+        self.entries = [HistoryEntry.from_dict(entry) for entry in data.get("entries", [])]
+        self.index = min(data.get("index", -1), len(self.entries) - 1)
+        self.total_bytes = sum(entry.size_bytes for entry in self.entries)
+        self._enforce_budget()
+        return True
@@ -0,0 +1,103 @@
+"""
+The session's single authoritative layout store
+"""
+import streamlit as st
+from typing import Dict, List, Optional
+
+from .equipment_model import EquipmentModel
+from .fleet import EquipmentFleet
+from .persistent_layout import EQUIPMENT_FIELDS
+from .placed_equipment import CanvasManager, PlacedEquipment
+from .draggable_canvas import DraggableCanvasManager
+
+# Every page and view (3D figure, 2D diagram, drag-and-drop canvas, reports) reads this one
+# instance; renderers derive their traces from it instead of keeping their own copies.
+CANVAS_STORE_KEY = "canvas_manager"
+RETIRED_STORE_KEYS = ("enhanced_canvas_manager",)  # Second manager kept by older sessions
+PRELOADED_FLEET_KEY = "project_fleet"  # Columnar fleet read with the opened project, used once to build its store
+
+
+def project_layout(project: Optional[Dict]) -> List[PlacedEquipment]:
+    """Placed units recorded in a project dictionary"""
+    placed_list = []
+    for eq_data in (project or {}).get('equipment', []):
+        placed_list.append(PlacedEquipment(
+            equipment=EquipmentModel.from_dict(eq_data['equipment']),
+            x_position=eq_data['x_position'],
+            y_position=eq_data['y_position'],
+            rotation=eq_data.get('rotation', 0.0),
+            connections=list(eq_data.get('connections', []))
+        ))
+    return placed_list
+
+
+def create_canvas_store(project: Optional[Dict], fleet: Optional[EquipmentFleet] = None) -> DraggableCanvasManager:
+    """Build the store for a project, sized to its rounded canvas bounds and loaded with its equipment"""
+    width = project.get('canvas_width_m', 200) if project else 200
+    height = project.get('canvas_height_m', 200) if project else 200
+
+    # Round the bounds up to a clean grid increment before sizing the store
+    rounded_bounds = DraggableCanvasManager(width, height).get_canvas_bounds()
+    store = DraggableCanvasManager(rounded_bounds[0], rounded_bounds[1])
+
+    placed_list = project_layout(project)
+    if placed_list:
+        store.load_equipment(placed_list, fleet=fleet)
+    return store
+
+
+def get_canvas_store() -> Optional[DraggableCanvasManager]:
+    """The session's layout store, if one has been created"""
+    return st.session_state.get(CANVAS_STORE_KEY)
+
+
+def ensure_canvas_store(project: Optional[Dict]) -> DraggableCanvasManager:
+    """Return the session's store, creating it from the project if needed"""
+    for key in RETIRED_STORE_KEYS:
+        if key in st.session_state:
+            del st.session_state[key]
+
+    store = st.session_state.get(CANVAS_STORE_KEY)
+    fleet = st.session_state.pop(PRELOADED_FLEET_KEY, None)
+    if store is None:
+        store = create_canvas_store(project, fleet)
+    elif not isinstance(store, DraggableCanvasManager):
+        # Older sessions hold a plain CanvasManager; carry its (possibly unsaved) layout over
+        upgraded = DraggableCanvasManager(store.facility_width_m, store.facility_height_m)
+        upgraded.load_equipment(store.placed_equipment)
+        store = upgraded
+    st.session_state[CANVAS_STORE_KEY] = store
+    return store
+
+
+def reset_canvas_store():
+    """Drop the session's store so the next ensure_canvas_store rebuilds it"""
+    for key in (CANVAS_STORE_KEY,) + RETIRED_STORE_KEYS:
+        if key in st.session_state:
+            del st.session_state[key]
+
+
+def apply_unit_changes(store: CanvasManager, units: Dict[str, Optional[Dict]]) -> int:
+    """Apply saved equipment entries by id (None removes the unit) to a live store, leaving other units alone"""
+    removed = {equipment_id for equipment_id, entry in units.items() if entry is None}
+    entries = [entry for entry in units.values() if entry is not None]
+    store.remove_equipment_group(removed)
+
+    added, changed = [], []
+    for placed in project_layout({'equipment': entries}):
+        current = store.get_equipment(placed.equipment.id)
+        if current is None:
+            added.append(placed)
+        else:
+            changed.append((current, placed))
+    store.restore_equipment(added)
+
+    # Edit existing units in place so connections from other units to them survive
+    for current, placed in changed:
+        for name in EQUIPMENT_FIELDS:
+            setattr(current.equipment, name, getattr(placed.equipment, name))
+        store.refresh_equipment(current.equipment)
+        store.set_rotation(current, placed.rotation)
+        store.update_equipment_position(current, placed.x_position, placed.y_position)
+        store.set_connections(current.equipment.id, placed.connections)
+    return len(removed) + len(entries)
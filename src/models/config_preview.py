@@ -0,0 +1,73 @@
+"""
+Browser-side live preview of an equipment configuration edit
+"""
+import os
+import streamlit as st
+import streamlit.components.v1 as components
+from typing import Dict, Optional
+
+from .equipment_model import EMISSION_FACTORS, FUEL_TYPES, EquipmentModel, export_coefficients
+from .facility_metrics import CAPACITY_FACTOR, PERIOD_DAYS, FacilityMetrics
+from .running_totals import UnitMetrics
+
+# The coefficient rows for the unit's type and the emission factors are sent once,
+# so sliders recompute unit and facility numbers locally; only a save reruns the app.
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "config_preview")
+_config_preview_component = components.declare_component("config_preview", path=_FRONTEND_DIR)
+
+LAST_COMMIT_KEY = "config_preview_last_commit"
+
+
+def facility_baseline(metrics: FacilityMetrics, unit: Optional[UnitMetrics]) -> Dict[str, float]:
+    """Facility daily totals excluding the unit being edited"""
+    baseline = {
+        'co2_kg': metrics.total_co2_kg,
+        'power_kw': metrics.total_power_kw,
+        'crude_bbl_day': metrics.total_crude_bbl_day
+    }
+    if unit is not None:
+        baseline['co2_kg'] -= unit.co2_kg
+        baseline['power_kw'] -= unit.power_kw
+        baseline['crude_bbl_day'] -= unit.crude_bbl_day
+    return baseline
+
+
+def render_configuration_preview(equipment: EquipmentModel, metrics: FacilityMetrics,
+                                 unit: Optional[UnitMetrics], period: str = "Year") -> Optional[Dict]:
+    """Show live configuration controls and return a committed configuration once per save.
+
+    The returned dict has power_rate_kw, operation_time_hours and fuel_type; None
+    means nothing new was committed.
+    """
+    saved = {
+        'power_rate_kw': float(equipment.power_rate_kw),
+        'operation_time_hours': float(equipment.operation_time_hours),
+        'fuel_type': equipment.fuel_type
+    }
+    value = _config_preview_component(
+        equipment={'id': equipment.id, 'name': equipment.name, **saved},
+        # A new revision tells the browser to drop local edits and show the saved values
+        revision=f"{equipment.id}:{saved['power_rate_kw']!r}:{saved['operation_time_hours']!r}:{saved['fuel_type']}",
+        fuel_types=FUEL_TYPES,
+        coefficients=export_coefficients(equipment.name, equipment.category),
+        emission_factors=EMISSION_FACTORS,
+        baseline=facility_baseline(metrics, unit),
+        period=period,
+        period_days=PERIOD_DAYS[period],
+        capacity_factor=CAPACITY_FACTOR,
+        key=f"config_preview_{equipment.id}",
+        default=None
+    )
+
+    if not value or value.get('commit_id') == st.session_state.get(LAST_COMMIT_KEY):
+        return None
+    st.session_state[LAST_COMMIT_KEY] = value.get('commit_id')
+
+    fuel_type = value.get('fuel_type')
+    if fuel_type not in FUEL_TYPES:
+        return None
+    return {
+        'power_rate_kw': max(0.0, float(value.get('power_rate_kw', 0.0))),
+        'operation_time_hours': min(8760.0, max(0.0, float(value.get('operation_time_hours', 0.0)))),
+        'fuel_type': fuel_type
+    }
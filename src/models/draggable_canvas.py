@@ -11,6 +11,7 @@ from dataclasses import asdict
 from .equipment_model import EquipmentModel
 from .placed_equipment import PlacedEquipment, CanvasManager
 from .interactive_canvas import create_drag_drop_canvas
+from .scene_geometry import grid_line_segments, polyline_coordinates
 
 class DraggableCanvasManager(CanvasManager):
     """Enhanced canvas manager with drag functionality and better visualization"""
@@ -19,6 +20,7 @@ class DraggableCanvasManager(CanvasManager):
         super().__init__(width_m, height_m)
         self.dragging_equipment_id: Optional[str] = None
         self.last_click_position: Optional[Tuple[float, float]] = None
+        self.webgl_threshold = 1000  # Draw equipment with WebGL (Scattergl) above this many units
     
     def create_equipment_visualization(self) -> go.Figure:
         """Create enhanced plotly figure with draggable equipment icons"""
@@ -43,21 +45,15 @@ class DraggableCanvasManager(CanvasManager):
         """Add grid lines to the figure"""
         bounds = self.get_canvas_bounds()
         
-        # Vertical grid lines
-        for x in range(0, int(bounds[0]) + 1, int(self.grid_size)):
-            fig.add_shape(
-                type="line",
-                x0=x, y0=0, x1=x, y1=bounds[1],
-                line=dict(color="rgba(200, 200, 200, 0.3)", width=1, dash="dot")
-            )
-        
-        # Horizontal grid lines  
-        for y in range(0, int(bounds[1]) + 1, int(self.grid_size)):
-            fig.add_shape(
-                type="line",
-                x0=0, y0=y, x1=bounds[0], y1=y,
-                line=dict(color="rgba(200, 200, 200, 0.3)", width=1, dash="dot")
-            )
+        # All vertical and horizontal grid lines as one None-separated trace (not one layout shape per line)
+        grid_x, grid_y = polyline_coordinates(grid_line_segments(bounds[0], bounds[1], self.grid_size))
+        fig.add_trace(go.Scatter(
+            x=grid_x, y=grid_y,
+            mode='lines',
+            line=dict(color="rgba(200, 200, 200, 0.3)", width=1, dash="dot"),
+            showlegend=False,
+            hoverinfo='skip'
+        ))
     
     def _add_facility_boundary(self, fig: go.Figure):
         """Add facility boundary rectangle"""
@@ -76,6 +72,7 @@ class DraggableCanvasManager(CanvasManager):
             'icons': [], 'names': [], 'hover_text': []
         }
         
+        totals = self.get_running_totals()
         for placed in self.placed_equipment:
             equipment = placed.equipment
             
@@ -91,7 +88,7 @@ class DraggableCanvasManager(CanvasManager):
             equipment_data['colors'].append(color)
             
             # Enhanced hover information
-            co2_emission = equipment.calculate_co2_emission()
+            co2_emission = totals.unit(equipment.id).co2_kg
             hover_info = [
                 f"<b>{equipment.icon} {equipment.name}</b>",
                 f"Category: {equipment.category}",
@@ -108,8 +105,11 @@ class DraggableCanvasManager(CanvasManager):
             equipment_data['hover_text'].append("<br>".join(hover_info))
             equipment_data['text'].append(f"{equipment.icon}")
         
+        # WebGL keeps pan and zoom interactive on very large layouts
+        scatter = go.Scattergl if len(self.placed_equipment) > self.webgl_threshold else go.Scatter
+        
         # Add equipment scatter plot
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=equipment_data['x'],
             y=equipment_data['y'],
             mode='markers+text',
@@ -130,7 +130,7 @@ class DraggableCanvasManager(CanvasManager):
         ))
         
         # Add equipment labels below icons
-        fig.add_trace(go.Scatter(
+        fig.add_trace(scatter(
             x=equipment_data['x'],
             y=[y - 15 for y in equipment_data['y']],  # Offset labels below icons
             mode='text',
@@ -221,7 +221,8 @@ class DraggableCanvasManager(CanvasManager):
     
     def get_equipment_at_position(self, x: float, y: float, tolerance: float = 15) -> Optional[PlacedEquipment]:
         """Find equipment at given position within tolerance"""
-        for placed in self.placed_equipment:
+        self._ensure_derived_in_sync()
+        for placed in self.spatial_index.within_distance(x, y, tolerance):
             distance = ((placed.x_position - x) ** 2 + (placed.y_position - y) ** 2) ** 0.5
             if distance <= tolerance:
                 return placed
@@ -231,15 +232,8 @@ def create_enhanced_canvas_interface():
     """Create the enhanced canvas interface with drag and drop functionality"""
     st.markdown("### Facility Layout Canvas")
     
-    if 'enhanced_canvas_manager' not in st.session_state:
-        if st.session_state.current_project:
-            width = st.session_state.current_project.get('canvas_width_m', 200)
-            height = st.session_state.current_project.get('canvas_height_m', 200)
-            st.session_state.enhanced_canvas_manager = DraggableCanvasManager(width, height)
-        else:
-            st.session_state.enhanced_canvas_manager = DraggableCanvasManager(200, 200)
-    
-    canvas_manager = st.session_state.enhanced_canvas_manager
+    from .canvas_store import ensure_canvas_store  # The store module imports this one
+    canvas_manager = ensure_canvas_store(st.session_state.current_project)
     
     # Canvas mode selection
     canvas_mode = st.radio(
@@ -267,7 +261,7 @@ def create_enhanced_canvas_interface():
         st.metric("Equipment Count", equipment_count)
     
     with col4:
-        total_co2 = sum(eq.equipment.calculate_co2_emission() for eq in canvas_manager.placed_equipment)
+        total_co2 = canvas_manager.get_running_totals().total_co2_kg
         st.metric("Total CO2 (kg/year)", f"{total_co2:.1f}")
     
     # Main canvas display
@@ -275,17 +269,13 @@ def create_enhanced_canvas_interface():
         st.markdown("#### Interactive Equipment Layout")
         st.info("Click and drag equipment icons to reposition. Select equipment for detailed configuration.")
         
-        # Interactive HTML5 canvas
-        canvas_component = create_drag_drop_canvas(
-            canvas_width=800, 
-            canvas_height=500
+        # Interactive HTML5 canvas (position batches are applied inside the component wrapper)
+        create_drag_drop_canvas(
+            canvas_width=800,
+            canvas_height=500,
+            canvas_manager=canvas_manager
         )
-        
-        # Handle component events (would need custom component for full functionality)
-        if canvas_component:
-            # This is where we'd handle position updates from the JavaScript component
-            pass
-            
+
     else:
         st.markdown("#### Technical Facility Diagram")
         
@@ -347,7 +337,7 @@ def display_selected_equipment_info(placed_equipment: PlacedEquipment):
             st.rerun()
         
         if st.button("Remove", key="remove_selected"):
-            canvas_manager = st.session_state.enhanced_canvas_manager
+            canvas_manager = st.session_state.canvas_manager
             if canvas_manager.remove_equipment(equipment.id):
                 st.session_state.project_saved = False
                 st.success(f"Removed {equipment.name}")
@@ -0,0 +1,562 @@
+"""
+3D equipment models for the builder canvas built from cached unit geometries.
+
+Each equipment type is described as a few primitive parts (cylinders, boxes, line
+accents, markers). The primitive meshes are computed once and every unit is an
+instance of them, translated and scaled into place. All units of a type are merged
+into one Mesh3d trace (plus at most one line and one marker trace), with per-vertex
+customdata carrying the equipment id for selection.
+
+Large layouts are drawn at a lower level of detail: fewer cylinder segments, then
+one box per unit, then clustered count markers (see LevelOfDetailConfig).
+"""
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .equipment_model import EquipmentModel
+from .placed_equipment import PlacedEquipment
+from .scene_geometry import polyline_coordinates
+
+DEFAULT_SEGMENTS = 20  # Cylinder theta segments at full detail
+
+# Levels of detail, from most to least detailed
+DETAIL_FULL = "full"          # Full-resolution models
+DETAIL_REDUCED = "reduced"    # Fewer cylinder segments
+DETAIL_BOXES = "boxes"        # One bounding box per unit
+DETAIL_CLUSTERS = "clusters"  # One count marker per grid cell
+DETAIL_LEVELS = [DETAIL_FULL, DETAIL_REDUCED, DETAIL_BOXES, DETAIL_CLUSTERS]
+
+
+@dataclass
+class LevelOfDetailConfig:
+    """Thresholds for switching the 3D canvas to cheaper representations"""
+    reduced_from_units: int = 150
+    boxes_from_units: int = 500
+    clusters_from_units: int = 3000
+    reduced_from_extent_m: float = 1000.0  # Larger sites make full-detail meshes sub-pixel
+    boxes_from_extent_m: float = 3000.0
+    reduced_segments: int = 8
+    cluster_cells: int = 40  # Cluster grid cells along the longer canvas side
+    forced_level: Optional[str] = None  # Override automatic selection (one of DETAIL_LEVELS)
+
+
+def select_detail_level(unit_count: int, extent_m: float, config: LevelOfDetailConfig) -> str:
+    """Pick the least detailed level demanded by either the unit count or the visible extent"""
+    if config.forced_level in DETAIL_LEVELS:
+        return config.forced_level
+
+    if unit_count >= config.clusters_from_units:
+        by_count = 3
+    elif unit_count >= config.boxes_from_units:
+        by_count = 2
+    elif unit_count >= config.reduced_from_units:
+        by_count = 1
+    else:
+        by_count = 0
+
+    if extent_m >= config.boxes_from_extent_m:
+        by_extent = 2
+    elif extent_m >= config.reduced_from_extent_m:
+        by_extent = 1
+    else:
+        by_extent = 0
+
+    return DETAIL_LEVELS[max(by_count, by_extent)]
+
+
+@dataclass(frozen=True)
+class UnitGeometry:
+    """Triangle mesh in a unit frame, shared by every instance of a primitive"""
+    vertices: np.ndarray  # (V, 3)
+    faces: np.ndarray     # (F, 3) vertex indices
+
+
+@lru_cache(maxsize=None)
+def cylinder_geometry(segments: int = DEFAULT_SEGMENTS, axis: str = "z") -> UnitGeometry:
+    """Capped cylinder of radius 1 running from 0 to 1 along the given axis ("z" or "x")"""
+    theta = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    ring_a, ring_b = np.cos(theta), np.sin(theta)
+    zeros, ones = np.zeros(segments), np.ones(segments)
+
+    if axis == "z":
+        bottom = np.column_stack([ring_a, ring_b, zeros])
+        top = np.column_stack([ring_a, ring_b, ones])
+        centers = np.array([[0, 0, 0], [0, 0, 1]], dtype=float)
+    else:
+        bottom = np.column_stack([zeros, ring_a, ring_b])
+        top = np.column_stack([ones, ring_a, ring_b])
+        centers = np.array([[0, 0, 0], [1, 0, 0]], dtype=float)
+    vertices = np.vstack([bottom, top, centers])
+
+    index = np.arange(segments)
+    following = (index + 1) % segments
+    bottom_center, top_center = 2 * segments, 2 * segments + 1
+    faces = np.vstack([
+        np.column_stack([index, following, index + segments]),                     # Side, lower triangles
+        np.column_stack([following, following + segments, index + segments]),     # Side, upper triangles
+        np.column_stack([np.full(segments, bottom_center), following, index]),     # Bottom cap
+        np.column_stack([np.full(segments, top_center), index + segments, following + segments])  # Top cap
+    ])
+    return UnitGeometry(vertices=vertices, faces=faces)
+
+
+@lru_cache(maxsize=None)
+def box_geometry() -> UnitGeometry:
+    """Unit cube spanning [0, 1] on every axis"""
+    vertices = np.array([
+        [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+        [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]
+    ], dtype=float)
+    faces = np.array([
+        [0, 2, 1], [0, 3, 2],  # Bottom
+        [4, 5, 6], [4, 6, 7],  # Top
+        [0, 1, 5], [0, 5, 4],  # Front
+        [1, 2, 6], [1, 6, 5],  # Right
+        [2, 3, 7], [2, 7, 6],  # Back
+        [3, 0, 4], [3, 4, 7]   # Left
+    ])
+    return UnitGeometry(vertices=vertices, faces=faces)
+
+
+def primitive_geometry(kind: str, segments: int = DEFAULT_SEGMENTS) -> UnitGeometry:
+    """Cached geometry for a primitive kind ("box", "cylinder_z", "cylinder_x")"""
+    if kind == "box":
+        return box_geometry()
+    return cylinder_geometry(segments, kind[-1])
+
+
+@dataclass
+class SolidPart:
+    """Instance of a cached primitive: vertex = unit vertex * scale + offset"""
+    primitive: str
+    offset: Tuple[float, float, float]
+    scale: Tuple[float, float, float]
+    color: str
+
+
+@dataclass
+class LinePart:
+    points: List[Tuple[float, float, float]]
+    color: str
+    width: int
+
+
+@dataclass
+class MarkerPart:
+    point: Tuple[float, float, float]
+    color: str
+    size: int
+    symbol: str = "circle"
+
+
+@dataclass
+class UnitModel:
+    """Primitive parts and hover text describing one placed unit"""
+    hover: str
+    solids: List[SolidPart] = field(default_factory=list)
+    lines: List[LinePart] = field(default_factory=list)
+    markers: List[MarkerPart] = field(default_factory=list)
+
+    def as_box(self) -> Optional['UnitModel']:
+        """Single bounding box around the solids and lines, in the unit's main colour"""
+        low, high, colors = [], [], []
+        for part in self.solids:
+            scale = np.asarray(part.scale, dtype=float)
+            if part.primitive == "box":
+                low.append(np.asarray(part.offset, dtype=float))
+            else:
+                # Cylinders are centred on the offset across their two radial axes
+                axis = 2 if part.primitive == "cylinder_z" else 0
+                radial = scale.copy()
+                radial[axis] = 0
+                low.append(np.asarray(part.offset, dtype=float) - radial)
+                scale = scale + radial
+            high.append(low[-1] + scale)
+            colors.append(part.color)
+        for part in self.lines:
+            points = np.asarray(part.points, dtype=float)
+            low.append(points.min(axis=0))
+            high.append(points.max(axis=0))
+            colors.append(part.color)
+        if not low:
+            return None
+
+        minimum = np.min(low, axis=0)
+        size = np.maximum(np.max(high, axis=0) - minimum, 0.5)  # Keep flat features (fences) visible
+        return UnitModel(hover=self.hover, solids=[SolidPart("box", tuple(minimum), tuple(size), colors[0])])
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(high, max(low, value))
+
+
+def _power_hover(equipment: EquipmentModel) -> str:
+    return f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}"
+
+
+def equipment_kind(equipment: EquipmentModel) -> Optional[str]:
+    """3D model type for an equipment unit (None if it has no 3D representation)"""
+    name, category = equipment.name, equipment.category
+    if category == "Power Generation":
+        if "Turbine" in name:
+            return "turbine"
+        return "diesel_generator" if "Diesel" in name else "gas_generator"
+    if category == "Process Heating & Steam":
+        if "Boiler" in name:
+            return "boiler"
+        return "furnace" if "Furnace" in name else "heater"
+    if category == "Flaring & Destructor":
+        return "flare" if "Flare" in name else "oxidizer"
+    if category == "Utility":
+        return "chiller" if "Chiller" in name else "utility"
+    if category == "Drivers & Machinery":
+        return "compressor" if "Compressor" in name else "pump"
+    if category == "Non-Combustion":
+        if "Tank" in name:
+            return "tank"
+        if "Pipeline" in name:
+            return "pipeline"
+        if "Building" in name:
+            return "building"
+        return "fence" if "Fence" in name else "entrance"
+    return None
+
+
+def _turbine(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    # Cylindrical housing with an offset exhaust stack, scaled by power rating
+    scale = _clamp(equipment.power_rate_kw / 2000, 1.0, 3.0)
+    width, height = 8 * scale, 6 * scale
+    return UnitModel(hover=_power_hover(equipment), solids=[
+        SolidPart("cylinder_z", (x, y, 2), (width / 2, width / 2, height), '#4a5568'),
+        SolidPart("cylinder_z", (x + 2, y + 2, 2 + height), (width / 6, width / 6, 15), '#e2e8f0')
+    ])
+
+
+def _generator(x: float, y: float, equipment: EquipmentModel, gen_type: str) -> UnitModel:
+    # Rectangular housing; diesel units get an exhaust pipe
+    scale = _clamp(equipment.power_rate_kw / 1500, 0.8, 2.5)
+    width, length, height = 6 * scale, 8 * scale, 4 * scale
+    model = UnitModel(
+        hover=f"<b>{equipment.name}</b><br>Type: {gen_type.title()}<br>Power: {equipment.power_rate_kw}kW<br>Fuel: {equipment.fuel_type}",
+        solids=[SolidPart("box", (x, y, 0), (length, width, height), '#2d3748')]
+    )
+    if gen_type == "diesel":
+        model.lines.append(LinePart([(x + length / 2, y + width / 2, height), (x + length / 2, y + width / 2, height + 8)], '#4a5568', 5))
+    return model
+
+
+def _boiler(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 2000, 1.0, 2.0)
+    radius, height = 4 * scale, 12 * scale
+    return UnitModel(hover=_power_hover(equipment), solids=[
+        SolidPart("cylinder_z", (x, y, 0), (radius, radius, height), '#4a5568')
+    ])
+
+
+def _furnace(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 2500, 1.0, 2.0)
+    width, length, height = 8 * scale, 10 * scale, 8 * scale
+    return UnitModel(
+        hover=_power_hover(equipment),
+        solids=[SolidPart("box", (x, y, 0), (length, width, height), '#744210')],
+        lines=[LinePart([(x + length / 2, y + width / 2, height), (x + length / 2, y + width / 2, height + 15)], '#4a5568', 6)]
+    )
+
+
+def _horizontal_cylinder(x: float, y: float, equipment: EquipmentModel, radius: float, length: float, color: str) -> UnitModel:
+    return UnitModel(hover=_power_hover(equipment), solids=[
+        SolidPart("cylinder_x", (x, y, 2), (length, radius, radius), color)
+    ])
+
+
+def _heater(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 1000, 0.8, 1.5)
+    return _horizontal_cylinder(x, y, equipment, 3 * scale, 8 * scale, '#e53e3e')
+
+
+def _compressor(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 2000, 1.0, 2.0)
+    return _horizontal_cylinder(x, y, equipment, 3 * scale, 10 * scale, '#805ad5')
+
+
+def _flare(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    # Tall stack with a flame tip
+    height, radius = 35, 0.8
+    return UnitModel(
+        hover=f"<b>{equipment.name}</b><br>Height: {height}m<br>Fuel: {equipment.fuel_type}",
+        solids=[SolidPart("cylinder_z", (x, y, 0), (radius, radius, height), '#4a5568')],
+        markers=[MarkerPart((x, y, height), '#ff6b35', 8), MarkerPart((x, y, height + 5), '#ff6b35', 8)]
+    )
+
+
+def _vertical_cylinder(x: float, y: float, equipment: EquipmentModel, radius: float, height: float, color: str) -> UnitModel:
+    return UnitModel(hover=_power_hover(equipment), solids=[
+        SolidPart("cylinder_z", (x, y, 0), (radius, radius, height), color)
+    ])
+
+
+def _oxidizer(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 1500, 1.0, 2.0)
+    return _vertical_cylinder(x, y, equipment, 3 * scale, 8 * scale, '#e53e3e')
+
+
+def _pump(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 500, 0.6, 1.5)
+    return _vertical_cylinder(x, y, equipment, 2 * scale, 3 * scale, '#3182ce')
+
+
+def _box_unit(x: float, y: float, hover: str, length: float, width: float, height: float, color: str) -> UnitModel:
+    return UnitModel(hover=hover, solids=[SolidPart("box", (x, y, 0), (length, width, height), color)])
+
+
+def _chiller(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 1000, 1.0, 2.0)
+    hover = f"<b>{equipment.name}</b><br>Power: {equipment.power_rate_kw}kW<br>Type: Cooling System"
+    return _box_unit(x, y, hover, 12 * scale, 8 * scale, 6 * scale, '#3182ce')
+
+
+def _utility(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    scale = _clamp(equipment.power_rate_kw / 800, 0.8, 1.5)
+    return _box_unit(x, y, _power_hover(equipment), 6 * scale, 4 * scale, 4 * scale, '#38a169')
+
+
+def _tank(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    radius, height = (12, 10) if "Crude" in equipment.name else (8, 15)
+    color = '#e2e8f0' if "Storage" in equipment.name else '#805ad5'
+    return UnitModel(hover=f"<b>{equipment.name}</b><br>Radius: {radius}m<br>Height: {height}m", solids=[
+        SolidPart("cylinder_z", (x, y, 0), (radius, radius, height), color)
+    ])
+
+
+def _pipeline(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    # Horizontal pipe centred on (x, y), with a centre marker
+    length, radius = 20, 0.5
+    x_start, x_end = x - length / 2, x + length / 2
+    return UnitModel(
+        hover=f"<b>{equipment.name}</b><br>Length: {length}m<br>Center: ({x:.1f}m, {y:.1f}m)<br>X Range: {x_start:.1f} to {x_end:.1f}",
+        solids=[SolidPart("cylinder_x", (x_start, y, 1), (length, radius, radius), '#4a5568')],
+        markers=[MarkerPart((x, y, 2), 'red', 8, 'cross')]
+    )
+
+
+def _building(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    width, length, height = 8, 12, 6
+    hover = f"<b>{equipment.name}</b><br>Size: {length}m × {width}m × {height}m"
+    return _box_unit(x - length / 2, y - width / 2, hover, length, width, height, '#4a5568')
+
+
+def _fence(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    length, height = 15, 3
+    model = UnitModel(hover=f"<b>{equipment.name}</b><br>Length: {length}m<br>Height: {height}m")
+    model.lines.append(LinePart([(x - length / 2, y, 0), (x + length / 2, y, 0)], '#4a5568', 4))
+    for offset in range(0, length + 1, 3):
+        post_x = x - length / 2 + offset
+        model.lines.append(LinePart([(post_x, y, 0), (post_x, y, height)], '#4a5568', 3))
+    return model
+
+
+def _entrance(x: float, y: float, equipment: EquipmentModel) -> UnitModel:
+    width, height = 8, 4
+    return UnitModel(hover=f"<b>{equipment.name}</b><br>Width: {width}m<br>Height: {height}m", lines=[
+        LinePart([(x - width / 2, y, 0), (x - width / 2, y, height)], '#4a5568', 5),
+        LinePart([(x + width / 2, y, 0), (x + width / 2, y, height)], '#4a5568', 5),
+        LinePart([(x - width / 2, y, height / 2), (x + width / 2, y, height / 2)], '#e2e8f0', 3)
+    ])
+
+
+MODEL_BUILDERS = {
+    "turbine": _turbine,
+    "diesel_generator": lambda x, y, equipment: _generator(x, y, equipment, "diesel"),
+    "gas_generator": lambda x, y, equipment: _generator(x, y, equipment, "gas"),
+    "boiler": _boiler,
+    "furnace": _furnace,
+    "heater": _heater,
+    "flare": _flare,
+    "oxidizer": _oxidizer,
+    "chiller": _chiller,
+    "utility": _utility,
+    "compressor": _compressor,
+    "pump": _pump,
+    "tank": _tank,
+    "pipeline": _pipeline,
+    "building": _building,
+    "fence": _fence,
+    "entrance": _entrance
+}
+
+
+def _merged_mesh(name: str, entries: List[Tuple[str, str, UnitModel]], segments: int) -> Optional[go.Mesh3d]:
+    """Instance every solid part of a group of units into one Mesh3d"""
+    # Group parts by primitive so each cached geometry is transformed in one vectorized step
+    by_primitive: Dict[str, Tuple[List, List, List, List, List]] = {}
+    for equipment_id, hover, model in entries:
+        for part in model.solids:
+            offsets, scales, colors, ids, hovers = by_primitive.setdefault(part.primitive, ([], [], [], [], []))
+            offsets.append(part.offset)
+            scales.append(part.scale)
+            colors.append(part.color)
+            ids.append(equipment_id)
+            hovers.append(hover)
+    if not by_primitive:
+        return None
+
+    vertex_blocks, face_blocks, face_colors, vertex_ids, vertex_hover = [], [], [], [], []
+    vertex_count = 0
+    for primitive, (offsets, scales, colors, ids, hovers) in by_primitive.items():
+        geometry = primitive_geometry(primitive, segments)
+        instances = len(offsets)
+        per_vertex = len(geometry.vertices)
+        vertices = geometry.vertices[None, :, :] * np.asarray(scales)[:, None, :] + np.asarray(offsets)[:, None, :]
+        faces = geometry.faces[None, :, :] + (vertex_count + per_vertex * np.arange(instances))[:, None, None]
+        vertex_blocks.append(vertices.reshape(-1, 3))
+        face_blocks.append(faces.reshape(-1, 3))
+        face_colors.append(np.repeat(np.asarray(colors, dtype=object), len(geometry.faces)))
+        vertex_ids.append(np.repeat(np.asarray(ids, dtype=object), per_vertex))
+        vertex_hover.append(np.repeat(np.asarray(hovers, dtype=object), per_vertex))
+        vertex_count += instances * per_vertex
+
+    vertices = np.vstack(vertex_blocks)
+    faces = np.vstack(face_blocks)
+    return go.Mesh3d(
+        x=vertices[:, 0], y=vertices[:, 1], z=vertices[:, 2],
+        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+        facecolor=np.concatenate(face_colors),
+        customdata=np.concatenate(vertex_ids),
+        hovertext=np.concatenate(vertex_hover),
+        hovertemplate="%{hovertext}<extra></extra>",
+        flatshading=True,
+        name=name,
+        showlegend=False
+    )
+
+
+def _merged_lines(name: str, entries: List[Tuple[str, str, UnitModel]]) -> List[go.Scatter3d]:
+    """One None-separated polyline trace per line style"""
+    by_style: Dict[Tuple[str, int], Tuple[List, List, List]] = {}
+    for equipment_id, hover, model in entries:
+        for part in model.lines:
+            segments, ids, hovers = by_style.setdefault((part.color, part.width), ([], [], []))
+            segments.append(part.points)
+            ids.extend([equipment_id] * (len(part.points) + 1))
+            hovers.extend([hover] * (len(part.points) + 1))
+
+    traces = []
+    for (color, width), (segments, ids, hovers) in by_style.items():
+        x, y, z = polyline_coordinates(segments)
+        traces.append(go.Scatter3d(
+            x=x, y=y, z=z,
+            mode='lines',
+            line=dict(color=color, width=width),
+            customdata=ids[:len(x)],
+            hovertext=hovers[:len(x)],
+            hovertemplate="%{hovertext}<extra></extra>",
+            name=name,
+            showlegend=False
+        ))
+    return traces
+
+
+def _merged_markers(name: str, entries: List[Tuple[str, str, UnitModel]]) -> Optional[go.Scatter3d]:
+    markers = [(equipment_id, part) for equipment_id, _, model in entries for part in model.markers]
+    if not markers:
+        return None
+    return go.Scatter3d(
+        x=[part.point[0] for _, part in markers],
+        y=[part.point[1] for _, part in markers],
+        z=[part.point[2] for _, part in markers],
+        mode='markers',
+        marker=dict(
+            size=[part.size for _, part in markers],
+            color=[part.color for _, part in markers],
+            symbol=[part.symbol for _, part in markers]
+        ),
+        customdata=[equipment_id for equipment_id, _ in markers],
+        name=name,
+        showlegend=False,
+        hoverinfo='skip'
+    )
+
+
+def _cluster_traces(placed_list: List[PlacedEquipment], extent_m: float, cells: int) -> List:
+    """Aggregate units into grid cells and draw one sized, labelled marker per cell"""
+    if not placed_list:
+        return []
+    positions = np.array([(placed.x_position, placed.y_position) for placed in placed_list], dtype=float)
+    names = np.array([placed.equipment.name for placed in placed_list], dtype=object)
+
+    cell_size = max(extent_m / cells, 1.0)
+    cell_keys = np.floor(positions / cell_size).astype(np.int64)
+    _, cluster_of, counts = np.unique(cell_keys, axis=0, return_inverse=True, return_counts=True)
+    cluster_of = cluster_of.ravel()
+    centroid_x = np.bincount(cluster_of, weights=positions[:, 0]) / counts
+    centroid_y = np.bincount(cluster_of, weights=positions[:, 1]) / counts
+
+    # Most common equipment name per cluster for the hover label
+    order = np.argsort(cluster_of, kind="stable")
+    boundaries = np.cumsum(counts)[:-1]
+    hover = []
+    for cluster, members in enumerate(np.split(order, boundaries)):
+        member_names, name_counts = np.unique(names[members].astype(str), return_counts=True)
+        hover.append(f"<b>{counts[cluster]} units</b><br>Mostly: {member_names[np.argmax(name_counts)]}")
+
+    return [go.Scatter3d(
+        x=centroid_x, y=centroid_y, z=np.zeros(len(counts)),
+        mode='markers+text',
+        marker=dict(
+            size=np.clip(6 + 3 * np.sqrt(counts), 6, 40),
+            color='#2b6cb0',
+            opacity=0.8,
+            line=dict(color='#ffffff', width=1)
+        ),
+        text=[str(count) for count in counts],
+        textposition='top center',
+        hovertext=hover,
+        hovertemplate="%{hovertext}<extra></extra>",
+        name='Equipment Clusters',
+        showlegend=False
+    )]
+
+
+def build_equipment_traces(placed_list: List[PlacedEquipment], segments: int = DEFAULT_SEGMENTS,
+                           as_boxes: bool = False) -> List:
+    """Traces for all placed equipment: a merged mesh, lines and markers per equipment type"""
+    groups: Dict[str, List[Tuple[str, str, UnitModel]]] = {}
+    for placed in placed_list:
+        kind = equipment_kind(placed.equipment)
+        if kind is None:
+            continue
+        model = MODEL_BUILDERS[kind](placed.x_position, placed.y_position, placed.equipment)
+        if as_boxes:
+            model = model.as_box()
+            if model is None:
+                continue
+        groups.setdefault(kind, []).append((placed.equipment.id, model.hover, model))
+
+    traces = []
+    for kind, entries in groups.items():
+        mesh = _merged_mesh(kind, entries, segments)
+        if mesh is not None:
+            traces.append(mesh)
+        traces.extend(_merged_lines(kind, entries))
+        markers = _merged_markers(kind, entries)
+        if markers is not None:
+            traces.append(markers)
+    return traces
+
+
+def build_canvas_equipment_traces(placed_list: List[PlacedEquipment], extent_m: float,
+                                  config: Optional[LevelOfDetailConfig] = None) -> Tuple[List, str]:
+    """Equipment traces at the level of detail suited to the layout; returns (traces, level)"""
+    config = config or LevelOfDetailConfig()
+    level = select_detail_level(len(placed_list), extent_m, config)
+    if level == DETAIL_CLUSTERS:
+        return _cluster_traces(placed_list, extent_m, config.cluster_cells), level
+    if level == DETAIL_BOXES:
+        return build_equipment_traces(placed_list, as_boxes=True), level
+    if level == DETAIL_REDUCED:
+        return build_equipment_traces(placed_list, segments=config.reduced_segments), level
+    return build_equipment_traces(placed_list), level
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Tuple
 import uuid
 
 # Equipment categories as defined in requirements
@@ -27,6 +27,161 @@ EMISSION_FACTORS = {
     "None": {"factor": 0.0, "unit": "kg CO2/unit"}
 }
 
+# Categories and fuels that never burn fuel on site
+NON_COMBUSTION_CATEGORIES = ["Non-Combustion", "Fluid Handling"]
+NON_COMBUSTION_FUELS = ["None", "Electric"]
+
+# Passive equipment without power or fuel configuration
+NON_POWER_EQUIPMENT = ["Storage Tank", "Crude Tank", "Pipeline", "Control Building", "Fence", "Entrance"]
+
+GAS_FUELS = ["Natural Gas", "Gas"]
+
+# Fuel draw per kW of rating per daily operating hour, keyed by (category, name, fuel type).
+# A name of None applies to every equipment in the category.
+FUEL_RATES = {
+    # Gas turbine: ~10,000-12,000 BTU/kWh = ~10.5-12.6 kWh thermal/kWh electrical
+    ("Power Generation", "Gas Turbine", "Natural Gas"): 11.0,
+    ("Power Generation", "Gas Turbine", "Gas"): 11.0,
+    # Gas engine: ~9,000-10,000 BTU/kWh = ~9.5-10.5 kWh thermal/kWh electrical
+    ("Power Generation", "Gas Engine Generator", "Natural Gas"): 10.0,
+    ("Power Generation", "Gas Engine Generator", "Gas"): 10.0,
+    # Diesel generator: ~0.25-0.3 L/kWh
+    ("Power Generation", "Diesel Gen-set", "Diesel"): 0.28,
+    # Boilers, heaters, furnaces: thermal input = thermal output / 85% efficiency
+    ("Process Heating & Steam", None, "Natural Gas"): 1 / 0.85,
+    ("Process Heating & Steam", None, "Gas"): 1 / 0.85,
+    ("Process Heating & Steam", None, "Diesel"): 0.30,  # L/kWh thermal
+    # Utility heaters: 80% efficiency
+    ("Utility", "Heater", "Natural Gas"): 1 / 0.80,
+    ("Utility", "Heater", "Gas"): 1 / 0.80,
+    ("Utility", "Heater", "Diesel"): 0.32,  # L/kWh thermal
+    # Gas-fired absorption chiller: COP ~1.2
+    ("Utility", "Chiller", "Natural Gas"): 1 / 1.2,
+    ("Utility", "Chiller", "Gas"): 1 / 1.2,
+    # Glycol reboiler: 75% efficiency
+    ("Utility", "Glycol Reboiler", "Natural Gas"): 1 / 0.75,
+    ("Utility", "Glycol Reboiler", "Gas"): 1 / 0.75,
+    # Gas engine compressor: ~10-11 kWh thermal per kWh shaft power
+    ("Drivers & Machinery", "Gas Engine Compressor", "Natural Gas"): 10.5,
+    ("Drivers & Machinery", "Gas Engine Compressor", "Gas"): 10.5,
+    # Engine pump drives: diesel ~0.26-0.30 L/kWh, gas 10 kWh thermal per kWh shaft
+    ("Drivers & Machinery", "Pump Engine Drive", "Diesel"): 0.28,
+    ("Drivers & Machinery", "Pump Engine Drive", "Natural Gas"): 10.0,
+    ("Drivers & Machinery", "Pump Engine Drive", "Gas"): 10.0,
+    # Thermal oxidizer/incinerator: ~30% auxiliary fuel, rest from waste heat
+    ("Flaring & Destructor", "Thermal Oxidizer", "Natural Gas"): 0.30,
+    ("Flaring & Destructor", "Thermal Oxidizer", "Gas"): 0.30,
+    ("Flaring & Destructor", "Incinerator", "Natural Gas"): 0.30,
+    ("Flaring & Destructor", "Incinerator", "Gas"): 0.30,
+}
+
+# Flare Stack: power_rate_kw is the thermal capacity of gas being burned, NOT electrical output.
+# Fuel is reported in MJ (1 kWh = 3.6 MJ) and uses a per-MJ natural gas emission factor.
+FLARE_PILOT_GAS_KW = 75  # Continuous pilot flame (~50-100 kW thermal)
+FLARE_UTILIZATION = 0.15  # 15% average utilization of rated capacity
+FLARE_EMISSION_FACTOR_MJ = 0.0561  # kg CO2/MJ for natural gas
+MJ_PER_KWH = 3.6
+
+# Net electrical output per kW of rating, keyed by (category, name)
+POWER_FACTORS = {
+    # Generators: power_rate_kw is the electrical rating, derated for maintenance/standby
+    ("Power Generation", "Gas Turbine"): 0.95,
+    ("Power Generation", "Gas Engine Generator"): 0.92,
+    ("Power Generation", "Diesel Gen-set"): 0.90,
+    # Heat recovery / waste-to-energy: conversion efficiency x availability
+    ("Flaring & Destructor", "Thermal Oxidizer"): 0.25 * 0.92,
+    ("Flaring & Destructor", "Incinerator"): 0.18 * 0.85,
+    ("Flaring & Destructor", "Flare Stack"): 0.12 * 0.30,
+}
+
+# Thermodynamic constants for crude oil processing
+CRUDE_DENSITY_KG_PER_BBL = 136  # kg per barrel (API 30° crude oil)
+CRUDE_SPECIFIC_HEAT = 2.0  # kJ/kg·K (crude oil specific heat capacity)
+DELTA_T_HEATING = 290  # K (60°C to 350°C typical refinery heating)
+# Energy required per barrel for sensible heating = 136 * 2.0 * 290 / 1000 = 78.88 MJ
+ENERGY_PER_BARREL_MJ = (CRUDE_DENSITY_KG_PER_BBL * CRUDE_SPECIFIC_HEAT * DELTA_T_HEATING) / 1000
+
+# Thermal efficiency (or thermal equivalent for enabling equipment) toward crude throughput,
+# keyed by (category, name). Power generation only produces electricity and is excluded.
+CRUDE_THERMAL_FACTORS = {
+    ("Process Heating & Steam", "Process Heater"): 0.85,
+    ("Process Heating & Steam", "Furnace"): 0.80,
+    ("Process Heating & Steam", "Boiler"): 0.85,
+    ("Utility", "Heater"): 0.80,
+    ("Utility", "Chiller"): 0.30,  # 1 kW cooling ~ 0.3 kW thermal processing
+    ("Utility", "Glycol Reboiler"): 0.75,
+    ("Drivers & Machinery", "Pump Engine Drive"): 0.50,  # essential pumping
+    ("Drivers & Machinery", "Gas Engine Compressor"): 0.40,  # associated gas handling
+    ("Flaring & Destructor", "Flare Stack"): 0.10,  # emergency relief
+    ("Flaring & Destructor", "Thermal Oxidizer"): 0.15,  # environmental compliance
+    ("Flaring & Destructor", "Incinerator"): 0.12,  # waste handling
+}
+
+@dataclass(frozen=True)
+class EquipmentCoefficients:
+    """Linear calculation coefficients for one (name, category, fuel type) combination"""
+    fuel_rate: float = 0.0  # fuel units per kW of rating per daily operating hour
+    fuel_base: float = 0.0  # fixed daily fuel draw (flare pilot gas)
+    co2_factor: float = 0.0  # kg CO2 per fuel unit
+    power_factor: float = 0.0  # net electrical kW per kW of rating
+    crude_rate: float = 0.0  # bbl/day per kW of rating per daily operating hour
+
+def compile_coefficients(name: str, category: str, fuel_type: str) -> EquipmentCoefficients:
+    """Resolve the engineering factors for one equipment type into linear coefficients"""
+    requires_power = name not in NON_POWER_EQUIPMENT
+    combustion = category not in NON_COMBUSTION_CATEGORIES and fuel_type not in NON_COMBUSTION_FUELS
+    
+    fuel_rate = fuel_base = co2_factor = 0.0
+    if combustion:
+        if name == "Flare Stack" and category == "Flaring & Destructor" and fuel_type in GAS_FUELS:
+            fuel_rate = FLARE_UTILIZATION * MJ_PER_KWH
+            fuel_base = FLARE_PILOT_GAS_KW * 24 * MJ_PER_KWH
+        elif requires_power:
+            fuel_rate = FUEL_RATES.get((category, name, fuel_type), FUEL_RATES.get((category, None, fuel_type), 0.0))
+        
+        if name == "Flare Stack" and fuel_type in GAS_FUELS:
+            co2_factor = FLARE_EMISSION_FACTOR_MJ
+        elif fuel_type in EMISSION_FACTORS:
+            co2_factor = EMISSION_FACTORS[fuel_type]["factor"]
+    
+    power_factor = POWER_FACTORS.get((category, name), 0.0) if requires_power else 0.0
+    crude_rate = 0.0
+    if requires_power and (category, name) in CRUDE_THERMAL_FACTORS:
+        crude_rate = MJ_PER_KWH * CRUDE_THERMAL_FACTORS[(category, name)] / ENERGY_PER_BARREL_MJ
+    
+    return EquipmentCoefficients(
+        fuel_rate=fuel_rate,
+        fuel_base=fuel_base,
+        co2_factor=co2_factor,
+        power_factor=power_factor,
+        crude_rate=crude_rate
+    )
+
+def _build_coefficient_table() -> Dict[Tuple[str, str, str], EquipmentCoefficients]:
+    """Precompile coefficients for every library equipment type and fuel"""
+    table = {}
+    for category, names in EQUIPMENT_CATEGORIES.items():
+        for name in names:
+            for fuel_type in FUEL_TYPES:
+                table[(name, category, fuel_type)] = compile_coefficients(name, category, fuel_type)
+    return table
+
+# Compiled once at import; shared by scalar and vectorized evaluators
+COEFFICIENT_TABLE = _build_coefficient_table()
+
+def get_coefficients(name: str, category: str, fuel_type: str) -> EquipmentCoefficients:
+    """Look up coefficients, compiling and caching combinations outside the library"""
+    key = (name, category, fuel_type)
+    coefficients = COEFFICIENT_TABLE.get(key)
+    if coefficients is None:
+        coefficients = compile_coefficients(name, category, fuel_type)
+        COEFFICIENT_TABLE[key] = coefficients
+    return coefficients
+
+def export_coefficients(name: str, category: str) -> Dict[str, Dict[str, float]]:
+    """JSON-ready coefficient rows for one equipment type, keyed by fuel type (for browser-side previews)"""
+    return {fuel_type: asdict(get_coefficients(name, category, fuel_type)) for fuel_type in FUEL_TYPES}
+
 @dataclass
 class EquipmentModel:
     """Base equipment model with CO2 calculation capabilities"""
@@ -48,11 +203,11 @@ class EquipmentModel:
     def has_combustion(self) -> bool:
         """Check if equipment has combustion properties"""
         # Non-combustion categories
-        if self.category in ["Non-Combustion", "Fluid Handling"]:
+        if self.category in NON_COMBUSTION_CATEGORIES:
             return False
         
         # Equipment with no fuel or electric fuel don't combust
-        if self.fuel_type in ["None", "Electric"]:
+        if self.fuel_type in NON_COMBUSTION_FUELS:
             return False
             
         return True
@@ -60,325 +215,34 @@ class EquipmentModel:
     @property
     def requires_power_config(self) -> bool:
         """Check if equipment requires power configuration"""
-        non_power_equipment = ["Storage Tank", "Crude Tank", "Pipeline", "Control Building", "Fence", "Entrance"]
-        return self.name not in non_power_equipment
+        return self.name not in NON_POWER_EQUIPMENT
+    
+    @property
+    def coefficients(self) -> EquipmentCoefficients:
+        """Calculation coefficients for this equipment's name, category and fuel type"""
+        return get_coefficients(self.name, self.category, self.fuel_type)
+    
+    @property
+    def daily_operation_hours(self) -> float:
+        """Average daily operating hours from annual hours, capped at 24"""
+        return min(24, self.operation_time_hours / 365)
     
     def calculate_fuel_consumption(self) -> float:
-        """Calculate total fuel consumption based on equipment type and engineering principles"""
-        if not self.has_combustion or not self.requires_power_config:
-            return 0.0
-        
-        # Equipment-specific fuel consumption calculations based on real engineering data
-        daily_operation_hours = min(24, self.operation_time_hours / 365)  # Convert annual to daily
-        
-        if self.category == "Power Generation":
-            if self.name == "Gas Turbine":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Gas turbine: ~10,000-12,000 BTU/kWh = ~10.5-12.6 kWh thermal/kWh electrical
-                    heat_rate = 11.0  # kWh thermal input per kWh electrical output
-                    thermal_consumption = self.power_rate_kw * heat_rate * daily_operation_hours
-                    return thermal_consumption
-                else:
-                    return 0.0  # Gas turbines typically only use gas
-                    
-            elif self.name == "Gas Engine Generator":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Gas engine: ~9,000-10,000 BTU/kWh = ~9.5-10.5 kWh thermal/kWh electrical
-                    heat_rate = 10.0  # kWh thermal input per kWh electrical output
-                    thermal_consumption = self.power_rate_kw * heat_rate * daily_operation_hours
-                    return thermal_consumption
-                else:
-                    return 0.0
-                    
-            elif self.name == "Diesel Gen-set":
-                if self.fuel_type == "Diesel":
-                    # Diesel generator: ~0.25-0.3 L/kWh
-                    fuel_consumption_rate = 0.28  # L/kWh
-                    return self.power_rate_kw * fuel_consumption_rate * daily_operation_hours
-                else:
-                    return 0.0
-                    
-        elif self.category == "Process Heating & Steam":
-            if self.fuel_type in ["Natural Gas", "Gas"]:
-                # Boilers, heaters, furnaces: direct thermal usage
-                # Efficiency: 80-90%, so thermal input = thermal output / efficiency
-                thermal_efficiency = 0.85  # 85% average efficiency
-                thermal_consumption = self.power_rate_kw * (1/thermal_efficiency) * daily_operation_hours
-                return thermal_consumption
-            elif self.fuel_type == "Diesel":
-                # Process heater using diesel
-                fuel_consumption_rate = 0.30  # L/kWh thermal
-                return self.power_rate_kw * fuel_consumption_rate * daily_operation_hours
-                
-        elif self.category == "Utility":
-            if self.name == "Heater":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    thermal_efficiency = 0.80  # 80% efficiency for utility heaters
-                    thermal_consumption = self.power_rate_kw * (1/thermal_efficiency) * daily_operation_hours
-                    return thermal_consumption
-                elif self.fuel_type == "Diesel":
-                    fuel_consumption_rate = 0.32  # L/kWh thermal
-                    return self.power_rate_kw * fuel_consumption_rate * daily_operation_hours
-                    
-            elif self.name == "Chiller":
-                if self.fuel_type == "Electric":
-                    # Electric chiller
-                    return self.power_rate_kw * daily_operation_hours
-                elif self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Gas-fired absorption chiller: COP ~1.2, so thermal input = cooling output / COP
-                    cop = 1.2  # Coefficient of performance
-                    thermal_consumption = self.power_rate_kw * (1/cop) * daily_operation_hours
-                    return thermal_consumption
-                    
-            elif self.name == "Glycol Reboiler":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    thermal_efficiency = 0.75  # 75% reboiler efficiency
-                    thermal_consumption = self.power_rate_kw * (1/thermal_efficiency) * daily_operation_hours
-                    return thermal_consumption
-                    
-        elif self.category == "Drivers & Machinery":
-            if self.name == "Gas Engine Compressor":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Gas engine compressor: ~10-11 kWh thermal per kWh shaft power
-                    heat_rate = 10.5  # kWh thermal input per kWh shaft power
-                    thermal_consumption = self.power_rate_kw * heat_rate * daily_operation_hours
-                    return thermal_consumption
-                    
-            elif self.name == "Pump Engine Drive":
-                if self.fuel_type == "Diesel":
-                    # Diesel engine drive: ~0.26-0.30 L/kWh shaft power
-                    fuel_consumption_rate = 0.28  # L/kWh
-                    return self.power_rate_kw * fuel_consumption_rate * daily_operation_hours
-                elif self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Gas engine drive
-                    heat_rate = 10.0  # kWh thermal input per kWh shaft power
-                    thermal_consumption = self.power_rate_kw * heat_rate * daily_operation_hours
-                    return thermal_consumption
-                    
-        elif self.category == "Flaring & Destructor":
-            if self.name == "Flare Stack":
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Flare Stack: power_rate_kw represents thermal capacity (heat rate) of gas being burned
-                    # NOT electrical output - flares consume gas to burn waste gases safely
-                    
-                    # Pilot gas: continuous small flame (~50-100 kW thermal)
-                    pilot_gas_thermal = 75  # kW thermal for pilot
-                    pilot_consumption = pilot_gas_thermal * 24  # 24 hours/day
-                    
-                    # Main flare operation: power_rate_kw is thermal capacity
-                    # For normal operation, flares operate at fraction of capacity
-                    # Emergency/upset conditions may use full capacity intermittently
-                    flare_utilization = 0.15  # 15% average utilization of rated capacity
-                    main_flare_consumption = self.power_rate_kw * daily_operation_hours * flare_utilization
-                    
-                    total_thermal_kwh = pilot_consumption + main_flare_consumption
-                    
-                    # Convert thermal kWh to energy for proper CO₂ calculation
-                    # 1 kWh = 3.6 MJ, using natural gas emission factor of 0.0561 kg CO₂/MJ
-                    energy_mj = total_thermal_kwh * 3.6  # Convert kWh to MJ
-                    return energy_mj  # Return MJ for CO₂ calculation
-                    
-            elif self.name in ["Thermal Oxidizer", "Incinerator"]:
-                if self.fuel_type in ["Natural Gas", "Gas"]:
-                    # Thermal oxidizer/incinerator: auxiliary fuel consumption
-                    # Typically 20-40% auxiliary fuel, rest from waste heat
-                    auxiliary_fuel_fraction = 0.30  # 30% auxiliary fuel
-                    thermal_consumption = self.power_rate_kw * auxiliary_fuel_fraction * daily_operation_hours
-                    return thermal_consumption
-        
-        # Default fallback for electric equipment
-        if self.fuel_type == "Electric":
-            return self.power_rate_kw * daily_operation_hours
-            
-        return 0.0
+        """Calculate daily fuel consumption (liters, kWh thermal, or MJ for flares)"""
+        coefficients = self.coefficients
+        return coefficients.fuel_rate * self.power_rate_kw * self.daily_operation_hours + coefficients.fuel_base
     
     def calculate_co2_emission(self) -> float:
         """Calculate CO2 emissions in kg CO2"""
-        if not self.has_combustion:
-            return 0.0
-        
-        fuel_consumption = self.calculate_fuel_consumption()
-        
-        # Special handling for flares - they return MJ, not kWh
-        if self.name == "Flare Stack" and self.fuel_type in ["Natural Gas", "Gas"]:
-            # fuel_consumption is in MJ, use direct emission factor
-            emission_factor_mj = 0.0561  # kg CO₂/MJ for natural gas
-            return fuel_consumption * emission_factor_mj
-        
-        # Standard calculation for other equipment (kWh or liters)
-        if self.fuel_type in EMISSION_FACTORS:
-            emission_factor = EMISSION_FACTORS[self.fuel_type]["factor"]
-            return fuel_consumption * emission_factor
-        
-        return 0.0
+        return self.calculate_fuel_consumption() * self.coefficients.co2_factor
     
     def calculate_power_production(self) -> float:
         """Calculate electrical power production capacity in kW based on engineering principles"""
-        if not self.requires_power_config:
-            return 0.0
-        
-        if self.category == "Power Generation":
-            # Primary electrical power generation equipment
-            # Note: power_rate_kw for generators typically represents their electrical output rating
-            if self.name == "Gas Turbine":
-                # Industrial gas turbine - show net electrical capacity
-                # Apply minimal derating for real-world conditions
-                capacity_factor = 0.95  # 95% of nameplate (maintenance, minor derating)
-                net_capacity = self.power_rate_kw * capacity_factor
-                return net_capacity
-                
-            elif self.name == "Gas Engine Generator":
-                # Reciprocating gas engine generator - very reliable
-                capacity_factor = 0.92  # 92% of nameplate (slightly lower due to maintenance)
-                net_capacity = self.power_rate_kw * capacity_factor
-                return net_capacity
-                
-            elif self.name == "Diesel Gen-set":
-                # Diesel generator set - backup/standby power
-                # For standby generators, show available capacity when needed
-                capacity_factor = 0.90  # 90% of nameplate (backup equipment derating)
-                net_capacity = self.power_rate_kw * capacity_factor
-                return net_capacity
-                
-        elif self.category == "Flaring & Destructor":
-            # Heat recovery and waste-to-energy systems
-            if self.name == "Thermal Oxidizer":
-                # Heat recovery from thermal oxidizer exhaust
-                heat_recovery_efficiency = 0.25  # 25% heat-to-power conversion
-                availability_factor = 0.92  # High availability for continuous process
-                net_capacity = self.power_rate_kw * heat_recovery_efficiency * availability_factor
-                return net_capacity
-                
-            elif self.name == "Incinerator":
-                # Waste-to-energy from incinerator
-                waste_to_energy_efficiency = 0.18  # 18% waste heat to electricity
-                availability_factor = 0.85  # Lower availability due to waste variability
-                net_capacity = self.power_rate_kw * waste_to_energy_efficiency * availability_factor
-                return net_capacity
-                
-            elif self.name == "Flare Stack":
-                # Modern flares with heat recovery systems
-                heat_recovery_efficiency = 0.12  # 12% heat recovery to power
-                utilization_factor = 0.30  # 30% utilization (emergency operation)
-                net_capacity = self.power_rate_kw * heat_recovery_efficiency * utilization_factor
-                return net_capacity
-                
-        # REMOVED: Process Heating & Steam equipment (boilers, heaters, furnaces)
-        # These generate heat/steam for processing, NOT electrical power
-        # Only dedicated power generation equipment should contribute to electrical output
-        
-        # Other equipment categories consume power but don't generate electricity
-        # (Process heating, utilities, machinery, etc. are all power consumers)
-        return 0.0
+        return self.coefficients.power_factor * self.power_rate_kw
     
     def calculate_crude_processing_capacity(self) -> float:
         """Calculate crude oil processing capacity in bbl/day based on rigorous engineering principles"""
-        if not self.requires_power_config:
-            return 0.0
-        
-        # Thermodynamic constants for crude oil processing
-        CRUDE_DENSITY_KG_PER_BBL = 136  # kg per barrel (API 30° crude oil)
-        CRUDE_SPECIFIC_HEAT = 2.0  # kJ/kg·K (crude oil specific heat capacity)
-        DELTA_T_HEATING = 290  # K (60°C to 350°C typical refinery heating)
-        MJ_PER_KWH = 3.6  # Conversion factor
-        
-        # Energy required per barrel for sensible heating
-        energy_per_barrel_mj = (CRUDE_DENSITY_KG_PER_BBL * CRUDE_SPECIFIC_HEAT * DELTA_T_HEATING) / 1000
-        # = 136 * 2.0 * 290 / 1000 = 78.88 MJ per barrel
-        
-        # Daily operation hours (convert annual hours to daily average)
-        daily_operation_hours = min(24, self.operation_time_hours / 365)  # Convert annual to daily, max 24h
-        
-        if self.category == "Process Heating & Steam":
-            if self.name == "Process Heater":
-                # Direct fired heater - following your calculation pattern
-                thermal_efficiency = 0.85  # 85% thermal efficiency
-                energy_per_day_mj = self.power_rate_kw * daily_operation_hours * MJ_PER_KWH * thermal_efficiency
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Furnace":
-                # Process furnace - high-temperature operations
-                thermal_efficiency = 0.80  # 80% efficiency for furnaces
-                energy_per_day_mj = self.power_rate_kw * daily_operation_hours * MJ_PER_KWH * thermal_efficiency
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Boiler":
-                # Steam boiler - following your exact calculation method
-                # energy_per_day = power_kw * hours_per_day * 3.6 * efficiency
-                boiler_efficiency = 0.85  # Standard boiler efficiency
-                energy_per_day_mj = self.power_rate_kw * daily_operation_hours * MJ_PER_KWH * boiler_efficiency
-                raw_throughput = energy_per_day_mj / energy_per_barrel_mj
-                return raw_throughput
-                
-        elif self.category == "Utility":
-            if self.name == "Heater":
-                # Utility heater - supplementary heating using same thermodynamic approach
-                thermal_efficiency = 0.80  # 80% efficiency for utility heaters
-                energy_per_day_mj = self.power_rate_kw * daily_operation_hours * MJ_PER_KWH * thermal_efficiency
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Chiller":
-                # Chillers enable crude processing by cooling product streams
-                # Using thermodynamic approach - cooling capacity supports crude throughput
-                # 1 kW cooling = ~0.3 kW equivalent thermal processing capacity
-                cooling_thermal_equivalent = 0.30  # 30% thermal equivalent
-                energy_per_day_mj = self.power_rate_kw * cooling_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Glycol Reboiler":
-                # Glycol reboiler for gas dehydration - uses thermal energy approach
-                thermal_efficiency = 0.75  # 75% reboiler efficiency
-                energy_per_day_mj = self.power_rate_kw * daily_operation_hours * MJ_PER_KWH * thermal_efficiency
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-        elif self.category == "Drivers & Machinery":
-            if self.name == "Pump Engine Drive":
-                # Pump drives ENABLE crude processing by providing pumping capacity
-                # Pumps don't create crude but are essential for moving it through process
-                # Conservative approach: 1 kW pumping = 0.5 kW equivalent thermal processing
-                pumping_thermal_equivalent = 0.50  # 50% thermal equivalent for essential pumping
-                energy_per_day_mj = self.power_rate_kw * pumping_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Gas Engine Compressor":
-                # Gas compression enables crude processing by handling associated gas
-                # Without gas compression, crude processing would be severely limited
-                # Conservative approach: 1 kW compression = 0.4 kW equivalent thermal processing
-                compression_thermal_equivalent = 0.40  # 40% thermal equivalent
-                energy_per_day_mj = self.power_rate_kw * compression_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-        elif self.category == "Flaring & Destructor":
-            if self.name == "Flare Stack":
-                # Flare stacks enable safe crude processing by providing emergency relief
-                # Essential safety equipment - without flares, processing rates must be severely limited
-                # Conservative approach: flare capacity enables processing but with low thermal equivalent
-                safety_thermal_equivalent = 0.10  # 10% thermal equivalent for essential safety
-                energy_per_day_mj = self.power_rate_kw * safety_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Thermal Oxidizer":
-                # VOC thermal oxidizers enable environmental compliance for higher throughput
-                # Required for regulatory compliance - enables continuous operation
-                environmental_thermal_equivalent = 0.15  # 15% thermal equivalent for compliance
-                energy_per_day_mj = self.power_rate_kw * environmental_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-            elif self.name == "Incinerator":
-                # Waste incinerators enable continuous operation by destroying waste streams
-                # Essential for continuous processing operations
-                waste_thermal_equivalent = 0.12  # 12% thermal equivalent for waste handling
-                energy_per_day_mj = self.power_rate_kw * waste_thermal_equivalent * daily_operation_hours * MJ_PER_KWH
-                return energy_per_day_mj / energy_per_barrel_mj
-                
-        # REMOVED: Power Generation equipment from crude processing
-        # Power generation equipment (turbines, generators, gen-sets) ONLY generate electricity
-        # They do NOT directly process crude oil or contribute to bbl/day throughput
-        # Their role is to provide electrical power to support facility operations
-        
-        # Non-combustion equipment (storage, pipeline, etc.) doesn't directly contribute
-        # to processing capacity but could be modeled for logistics in future
-        return 0.0
+        return self.coefficients.crude_rate * self.power_rate_kw * self.daily_operation_hours
     
     def get_equipment_info(self) -> Dict:
         """Get comprehensive equipment information"""
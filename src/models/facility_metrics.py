@@ -0,0 +1,192 @@
+"""
+Immutable per-layout facility metrics snapshot shared by the builder and reporting pages
+"""
+import hashlib
+from dataclasses import asdict, astuple, dataclass
+from typing import Dict, List, Tuple
+
+from .equipment_model import (
+    CRUDE_THERMAL_FACTORS, EMISSION_FACTORS, EQUIPMENT_CATEGORIES, FUEL_RATES, FUEL_TYPES, POWER_FACTORS,
+    EquipmentModel, get_coefficients
+)
+from .running_totals import RunningTotals, UnitMetrics
+
+# Reporting period lengths in days (average month, leap-year adjusted year)
+PERIOD_DAYS = {
+    "Day": 1,
+    "Month": 30.44,
+    "Year": 365.25
+}
+PERIOD_ABBREVIATIONS = {"Day": "d", "Month": "m", "Year": "y"}
+CAPACITY_FACTOR = 0.85  # Typical capacity factor for continuous operation
+CRUDE_TONNES_PER_BBL = 0.136
+# Bump when a formula feeding FacilityMetrics changes; coefficient and constant edits are picked up by the stamp
+RESULTS_FORMULA_VERSION = 1
+
+
+def _engine_stamp() -> str:
+    """Hash of the formula version and every coefficient and constant stored results are computed from"""
+    library = [
+        (name, category, fuel_type, astuple(get_coefficients(name, category, fuel_type)))
+        for category, names in EQUIPMENT_CATEGORIES.items() for name in names for fuel_type in FUEL_TYPES
+    ]
+    # The raw tables too, since types outside the library are compiled from them on demand
+    tables = [sorted(table.items(), key=repr)
+              for table in (FUEL_RATES, POWER_FACTORS, CRUDE_THERMAL_FACTORS, EMISSION_FACTORS)]
+    inputs = (RESULTS_FORMULA_VERSION, library, tables, CAPACITY_FACTOR, CRUDE_TONNES_PER_BBL,
+              sorted(PERIOD_DAYS.items()))
+    return hashlib.blake2b(repr(inputs).encode(), digest_size=16).hexdigest()
+
+
+# Stored results stamped with a different engine are recomputed
+RESULTS_ENGINE_VERSION = _engine_stamp()
+
+
+def metrics_fingerprint(equipment_list: List[EquipmentModel]) -> str:
+    """Content hash of every input the metrics depend on, in placement order"""
+    digest = hashlib.blake2b(digest_size=16)
+    for equipment in equipment_list:
+        digest.update(
+            f"{equipment.id}\x1f{equipment.name}\x1f{equipment.category}\x1f{equipment.fuel_type}\x1f"
+            f"{equipment.power_rate_kw!r}\x1f{equipment.operation_time_hours!r}\x1e".encode()
+        )
+    return digest.hexdigest()
+
+
+def period_multiplier(period: str) -> float:
+    """Days in a reporting period"""
+    return PERIOD_DAYS[period]
+
+
+def power_for_period(power_kw: float, period: str) -> Tuple[float, str]:
+    """Instantaneous kW for a day, otherwise energy in kWh at the typical capacity factor"""
+    if period == "Day":
+        return power_kw, "kW"
+    return power_kw * 24 * PERIOD_DAYS[period] * CAPACITY_FACTOR, "kWh"
+
+
+@dataclass(frozen=True)
+class FacilityMetrics:
+    """Derived facility values for one layout version; period views only rescale these numbers"""
+    fingerprint: str
+    units: Tuple[UnitMetrics, ...]  # In placement order
+    equipment_count: int
+    combustion_count: int
+    total_fuel_consumption: float
+    total_co2_kg: float  # Daily
+    total_power_kw: float
+    total_crude_bbl_day: float
+    total_generation_kwh_year: float
+    by_category: Tuple[Tuple[str, int, float], ...]  # (category, count, co2_kg)
+    by_fuel_type: Tuple[Tuple[str, int, float], ...]  # (fuel_type, count, co2_kg)
+    crude_breakdown: Tuple[Tuple[str, float], ...]  # (name, bbl/day) for contributing units
+    power_breakdown: Tuple[Tuple[str, float], ...]  # (name, kW) for contributing units
+
+    # Power-configurable equipment statistics used by the reporting analytics
+    power_config_count: int
+    operational_count: int  # Power-configurable units with operating hours
+    configured_power_kw: float
+    configured_operating_hours: float
+    configured_energy_mwh: float
+
+    @classmethod
+    def build(cls, fingerprint: str, equipment_list: List[EquipmentModel], totals: RunningTotals) -> 'FacilityMetrics':
+        """Assemble a snapshot from running totals and one pass over the equipment list"""
+        units = tuple(totals.unit(equipment.id) for equipment in equipment_list)
+
+        power_config_count = 0
+        operational_count = 0
+        configured_power_kw = 0.0
+        configured_operating_hours = 0.0
+        configured_energy_mwh = 0.0
+        for equipment in equipment_list:
+            if not equipment.requires_power_config:
+                continue
+            power_config_count += 1
+            if equipment.power_rate_kw > 0:
+                configured_power_kw += equipment.power_rate_kw
+            if equipment.operation_time_hours > 0:
+                operational_count += 1
+                configured_operating_hours += equipment.operation_time_hours
+            if equipment.power_rate_kw > 0 and equipment.operation_time_hours > 0:
+                configured_energy_mwh += equipment.power_rate_kw * equipment.operation_time_hours / 1000
+
+        return cls(
+            fingerprint=fingerprint,
+            units=units,
+            equipment_count=len(units),
+            combustion_count=totals.combustion_count,
+            total_fuel_consumption=totals.total_fuel_consumption,
+            total_co2_kg=totals.total_co2_kg,
+            total_power_kw=totals.total_power_kw,
+            total_crude_bbl_day=totals.total_crude_bbl_day,
+            total_generation_kwh_year=totals.total_generation_kwh_year,
+            by_category=tuple((key, entry["count"], entry["co2_kg"]) for key, entry in totals.by_category.items()),
+            by_fuel_type=tuple((key, entry["count"], entry["co2_kg"]) for key, entry in totals.by_fuel_type.items()),
+            crude_breakdown=tuple((unit.name, unit.crude_bbl_day) for unit in units if unit.crude_bbl_day > 0),
+            power_breakdown=tuple((unit.name, unit.power_kw) for unit in units if unit.power_kw > 0),
+            power_config_count=power_config_count,
+            operational_count=operational_count,
+            configured_power_kw=configured_power_kw,
+            configured_operating_hours=configured_operating_hours,
+            configured_energy_mwh=configured_energy_mwh
+        )
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FacilityMetrics':
+        values = dict(data)
+        values['units'] = tuple(UnitMetrics(**unit) for unit in data['units'])
+        for name in ('by_category', 'by_fuel_type', 'crude_breakdown', 'power_breakdown'):
+            values[name] = tuple(tuple(row) for row in data[name])
+        return cls(**values)
+
+    # Period scaling
+    def co2_for_period(self, period: str) -> float:
+        return self.total_co2_kg * PERIOD_DAYS[period]
+
+    def crude_for_period(self, period: str) -> float:
+        return self.total_crude_bbl_day * PERIOD_DAYS[period]
+
+    def power_for_period(self, period: str) -> Tuple[float, str]:
+        return power_for_period(self.total_power_kw, period)
+
+    # Annual efficiency metrics
+    @property
+    def crude_tonnes_year(self) -> float:
+        return self.total_crude_bbl_day * PERIOD_DAYS["Year"] * CRUDE_TONNES_PER_BBL
+
+    @property
+    def co2_tonnes_year(self) -> float:
+        return self.total_co2_kg * PERIOD_DAYS["Year"] / 1000
+
+    @property
+    def co2_per_crude_tonne(self) -> float:
+        """Annual t CO2 per tonne of crude processed (0 when nothing is processed)"""
+        crude_tonnes = self.crude_tonnes_year
+        return self.co2_tonnes_year / crude_tonnes if crude_tonnes > 0 else 0
+
+    @property
+    def generation_kwh_year(self) -> float:
+        """Annual energy generation at the typical capacity factor"""
+        return self.total_generation_kwh_year * CAPACITY_FACTOR
+
+    @property
+    def co2_per_kwh(self) -> float:
+        """Annual kg CO2 per kWh generated (0 when nothing is generated)"""
+        generation = self.generation_kwh_year
+        return self.total_co2_kg * PERIOD_DAYS["Year"] / generation if generation > 0 else 0
+
+    def as_summary(self) -> Dict:
+        """Summary dict in the shape stored with saved projects"""
+        return {
+            "total_equipment": self.equipment_count,
+            "total_co2_kg": self.total_co2_kg,
+            "total_crude_processing_bbl_day": self.total_crude_bbl_day,
+            "total_crude_processing_tonnes_year": self.crude_tonnes_year,
+            "facilities_efficiency": self.co2_per_crude_tonne,
+            "by_category": {key: {"count": count, "co2_kg": co2} for key, count, co2 in self.by_category},
+            "by_fuel_type": {key: {"count": count, "co2_kg": co2} for key, count, co2 in self.by_fuel_type}
+        }
@@ -0,0 +1,93 @@
+"""
+Content-addressed cache of built Plotly figures with LRU eviction and a memory cap
+"""
+import hashlib
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .placed_equipment import PlacedEquipment
+
+
+def layout_fingerprint(placed_list: List[PlacedEquipment], canvas_bounds: Tuple[float, float],
+                       render_options: Iterable[Any] = ()) -> str:
+    """Stable hash of everything a canvas figure is drawn from.
+
+    Covers each unit's identity, configuration and placement (in order), the canvas
+    bounds and any render options (their repr must be deterministic).
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr((tuple(canvas_bounds), tuple(render_options))).encode())
+    for placed in placed_list:
+        equipment = placed.equipment
+        digest.update(
+            f"{equipment.id}\x1f{equipment.name}\x1f{equipment.category}\x1f{equipment.fuel_type}\x1f"
+            f"{equipment.power_rate_kw!r}\x1f{equipment.operation_time_hours!r}\x1f"
+            f"{placed.x_position!r}\x1f{placed.y_position!r}\x1f{placed.rotation!r}\x1e".encode()
+        )
+    return digest.hexdigest()
+
+
+def _value_bytes(value: Any) -> int:
+    if isinstance(value, np.ndarray):
+        return value.nbytes if value.dtype != object else sum(_value_bytes(item) for item in value)
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(_value_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_value_bytes(item) for item in value)
+    return 8
+
+
+def estimate_figure_bytes(fig) -> int:
+    """Approximate memory held by a figure's trace data"""
+    return sum(_value_bytes(trace.to_plotly_json()) for trace in fig.data)
+
+
+class FigureCache:
+    """Least-recently-used figure cache bounded by entry count and approximate size"""
+
+    def __init__(self, max_entries: int = 8, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for a key (marks it most recently used)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key: str, value: Any, size_bytes: int):
+        """Store a value, evicting least recently used entries to stay within the caps.
+
+        A value larger than the memory cap is not cached.
+        """
+        if key in self._entries:
+            self.total_bytes -= self._entries.pop(key)[1]
+        if size_bytes > self.max_bytes:
+            return
+        self._entries[key] = (value, size_bytes)
+        self.total_bytes += size_bytes
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.total_bytes -= evicted_bytes
+
+    def clear(self):
+        self._entries.clear()
+        self.total_bytes = 0
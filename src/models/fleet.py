@@ -0,0 +1,266 @@
+"""
+Columnar (struct-of-arrays) fleet representation for vectorized equipment calculations
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .equipment_model import EquipmentModel, get_coefficients
+
+# Coefficient vector layout, mirroring EquipmentCoefficients: fuel = FUEL_RATE * kW * daily_hours + FUEL_BASE,
+# co2 = fuel * CO2_FACTOR, power = POWER_FACTOR * kW, crude = CRUDE_RATE * kW * daily_hours
+FUEL_RATE, FUEL_BASE, CO2_FACTOR, POWER_FACTOR, CRUDE_RATE = range(5)
+COEFFICIENT_COUNT = 5
+
+
+def coefficient_vector(name: str, category: str, fuel_type: str) -> np.ndarray:
+    """Coefficients for one equipment type from the shared coefficient table"""
+    coefficients = get_coefficients(name, category, fuel_type)
+    return np.array([
+        coefficients.fuel_rate,
+        coefficients.fuel_base,
+        coefficients.co2_factor,
+        coefficients.power_factor,
+        coefficients.crude_rate
+    ])
+
+
+class CodeBook:
+    """Encodes strings as small integer codes"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+@dataclass
+class FleetMetrics:
+    """Per-unit and aggregate results of one vectorized fleet pass"""
+    ids: List[str]
+    fuel_consumption: np.ndarray
+    co2_kg: np.ndarray
+    power_kw: np.ndarray
+    crude_bbl_day: np.ndarray
+    category_codes: np.ndarray
+    fuel_codes: np.ndarray
+    categories: List[str]
+    fuel_types: List[str]
+
+    def row_index(self) -> Dict[str, int]:
+        """Map equipment id to its row in the per-unit arrays"""
+        return {equipment_id: row for row, equipment_id in enumerate(self.ids)}
+
+    @property
+    def total_co2_kg(self) -> float:
+        return float(self.co2_kg.sum())
+
+    @property
+    def total_fuel_consumption(self) -> float:
+        return float(self.fuel_consumption.sum())
+
+    @property
+    def total_power_kw(self) -> float:
+        return float(self.power_kw.sum())
+
+    @property
+    def total_crude_bbl_day(self) -> float:
+        return float(self.crude_bbl_day.sum())
+
+    def _rollup(self, codes: np.ndarray, labels: List[str]) -> Dict[str, Dict]:
+        counts = np.bincount(codes, minlength=len(labels))
+        co2 = np.bincount(codes, weights=self.co2_kg, minlength=len(labels))
+        return {
+            label: {"count": int(counts[code]), "co2_kg": float(co2[code])}
+            for code, label in enumerate(labels) if counts[code] > 0
+        }
+
+    def by_category(self) -> Dict[str, Dict]:
+        """Count and CO2 grouped by equipment category"""
+        return self._rollup(self.category_codes, self.categories)
+
+    def by_fuel_type(self) -> Dict[str, Dict]:
+        """Count and CO2 grouped by fuel type"""
+        return self._rollup(self.fuel_codes, self.fuel_types)
+
+
+class EquipmentFleet:
+    """Struct-of-arrays view of placed equipment with one vectorized pass for all metrics"""
+
+    def __init__(self, capacity: int = 64):
+        self.ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self.names = CodeBook()
+        self.categories = CodeBook()
+        self.fuel_types = CodeBook()
+
+        # Coefficient rows are looked up once per (name, category, fuel_type) combination
+        self._type_keys: Dict[Tuple[int, int, int], int] = {}
+        self._type_coefficients = np.zeros((0, COEFFICIENT_COUNT))
+
+        self.power_rate_kw = np.zeros(capacity)
+        self.operation_time_hours = np.zeros(capacity)
+        self.name_code = np.zeros(capacity, dtype=np.int32)
+        self.category_code = np.zeros(capacity, dtype=np.int32)
+        self.fuel_code = np.zeros(capacity, dtype=np.int32)
+        self.type_code = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, equipment_id: str) -> bool:
+        return equipment_id in self._rows
+
+    @classmethod
+    def from_equipment(cls, equipment_list: List[EquipmentModel]) -> 'EquipmentFleet':
+        """Build a fleet from equipment models"""
+        fleet = cls(capacity=max(64, len(equipment_list)))
+        for equipment in equipment_list:
+            fleet.append(equipment)
+        return fleet
+
+    @classmethod
+    def from_columns(cls, ids: List[str], strings: List[str], name_codes: np.ndarray, category_codes: np.ndarray,
+                     fuel_codes: np.ndarray, power_rate_kw: np.ndarray,
+                     operation_time_hours: np.ndarray) -> 'EquipmentFleet':
+        """Build a fleet from dictionary-coded columns; strings are encoded once per distinct code, not per unit.
+
+        Codes index `strings`; negative codes (no string value) are treated as "".
+        """
+        n = len(ids)
+        fleet = cls(capacity=max(64, n))
+        labels = list(strings) + ["", ""]  # Codes -2 and -1 index the tail
+
+        def recode(codes: np.ndarray, book: CodeBook) -> np.ndarray:
+            distinct, inverse = np.unique(np.asarray(codes), return_inverse=True)
+            local = np.array([book.encode(labels[code]) for code in distinct.tolist()], dtype=np.int32)
+            return local[inverse.reshape(-1)] if n else np.zeros(0, dtype=np.int32)
+
+        fleet.name_code[:n] = recode(name_codes, fleet.names)
+        fleet.category_code[:n] = recode(category_codes, fleet.categories)
+        fleet.fuel_code[:n] = recode(fuel_codes, fleet.fuel_types)
+        if n:
+            keys = np.stack([fleet.name_code[:n], fleet.category_code[:n], fleet.fuel_code[:n]], axis=1)
+            distinct, inverse = np.unique(keys, axis=0, return_inverse=True)
+            type_codes = np.array([fleet._type_code_for(*key) for key in distinct.tolist()], dtype=np.int32)
+            fleet.type_code[:n] = type_codes[inverse.reshape(-1)]
+        fleet.power_rate_kw[:n] = power_rate_kw
+        fleet.operation_time_hours[:n] = operation_time_hours
+        fleet.ids = list(ids)
+        fleet._rows = {equipment_id: row for row, equipment_id in enumerate(fleet.ids)}
+        return fleet
+
+    def _grow(self, needed: int):
+        capacity = len(self.power_rate_kw)
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for attr in ("power_rate_kw", "operation_time_hours", "name_code",
+                     "category_code", "fuel_code", "type_code"):
+            old = getattr(self, attr)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:capacity] = old
+            setattr(self, attr, new)
+
+    def _type_code_for(self, name_code: int, category_code: int, fuel_code: int) -> int:
+        key = (name_code, category_code, fuel_code)
+        code = self._type_keys.get(key)
+        if code is None:
+            coefficients = coefficient_vector(
+                self.names.values[name_code],
+                self.categories.values[category_code],
+                self.fuel_types.values[fuel_code]
+            )
+            code = len(self._type_keys)
+            self._type_keys[key] = code
+            self._type_coefficients = np.vstack([self._type_coefficients, coefficients])
+        return code
+
+    def _write_row(self, row: int, equipment: EquipmentModel):
+        name_code = self.names.encode(equipment.name)
+        category_code = self.categories.encode(equipment.category)
+        fuel_code = self.fuel_types.encode(equipment.fuel_type)
+
+        self.power_rate_kw[row] = equipment.power_rate_kw
+        self.operation_time_hours[row] = equipment.operation_time_hours
+        self.name_code[row] = name_code
+        self.category_code[row] = category_code
+        self.fuel_code[row] = fuel_code
+        self.type_code[row] = self._type_code_for(name_code, category_code, fuel_code)
+
+    def append(self, equipment: EquipmentModel):
+        """Add a unit to the end of the fleet (updates in place if already present)"""
+        if equipment.id in self._rows:
+            self.update(equipment)
+            return
+        row = len(self.ids)
+        self._grow(row + 1)
+        self._write_row(row, equipment)
+        self.ids.append(equipment.id)
+        self._rows[equipment.id] = row
+
+    def update(self, equipment: EquipmentModel) -> bool:
+        """Refresh a unit's row after its configuration changed"""
+        row = self._rows.get(equipment.id)
+        if row is None:
+            return False
+        self._write_row(row, equipment)
+        return True
+
+    def remove(self, equipment_id: str) -> bool:
+        """Remove a unit by swapping the last row into its slot"""
+        row = self._rows.pop(equipment_id, None)
+        if row is None:
+            return False
+        last = len(self.ids) - 1
+        if row != last:
+            for attr in ("power_rate_kw", "operation_time_hours", "name_code",
+                         "category_code", "fuel_code", "type_code"):
+                column = getattr(self, attr)
+                column[row] = column[last]
+            moved_id = self.ids[last]
+            self.ids[row] = moved_id
+            self._rows[moved_id] = row
+        self.ids.pop()
+        return True
+
+    def clear(self):
+        """Remove all units (codebooks and coefficient rows are kept)"""
+        self.ids = []
+        self._rows = {}
+
+    def compute(self) -> FleetMetrics:
+        """Evaluate fuel, CO2, power and crude for every unit in one vectorized pass"""
+        n = len(self.ids)
+        power_rate = self.power_rate_kw[:n]
+        daily_hours = np.minimum(24, self.operation_time_hours[:n] / 365)
+        coefficients = self._type_coefficients[self.type_code[:n]] if n else np.zeros((0, COEFFICIENT_COUNT))
+
+        rated_daily = power_rate * daily_hours
+        fuel = coefficients[:, FUEL_RATE] * rated_daily + coefficients[:, FUEL_BASE]
+        co2 = fuel * coefficients[:, CO2_FACTOR]
+        power = coefficients[:, POWER_FACTOR] * power_rate
+        crude = coefficients[:, CRUDE_RATE] * rated_daily
+
+        return FleetMetrics(
+            ids=list(self.ids),
+            fuel_consumption=fuel,
+            co2_kg=co2,
+            power_kw=power,
+            crude_bbl_day=crude,
+            category_codes=self.category_code[:n].copy(),
+            fuel_codes=self.fuel_code[:n].copy(),
+            categories=list(self.categories.values),
+            fuel_types=list(self.fuel_types.values)
+        )
@@ -0,0 +1,159 @@
+"""
+Multi-selection and group transforms applied to many placed units at once
+"""
+import math
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .equipment_model import FUEL_TYPES
+from .placed_equipment import CanvasManager, PlacedEquipment
+from .spatial_index import Bounds
+
+ALIGN_MODES = {
+    "left": "Left edges",
+    "center_x": "Horizontal centres",
+    "right": "Right edges",
+    "top": "Top edges",
+    "center_y": "Vertical centres",
+    "bottom": "Bottom edges"
+}
+DISTRIBUTE_AXES = {"x": "Horizontally", "y": "Vertically"}
+
+
+def select_in_region(canvas_manager: CanvasManager, region: Bounds) -> List[str]:
+    """Ids of units whose footprint intersects a rectangular region (box select)"""
+    return [placed.equipment.id for placed in canvas_manager.get_equipment_in_region(region)]
+
+
+def select_matching(canvas_manager: CanvasManager, categories: Iterable[str] = (),
+                    fuel_types: Iterable[str] = ()) -> List[str]:
+    """Ids of units in any of the categories and using any of the fuel types (empty means any)"""
+    categories, fuel_types = set(categories), set(fuel_types)
+    return [
+        placed.equipment.id for placed in canvas_manager.placed_equipment
+        if (not categories or placed.equipment.category in categories)
+        and (not fuel_types or placed.equipment.fuel_type in fuel_types)
+    ]
+
+
+def _resolve(canvas_manager: CanvasManager, equipment_ids: Iterable[str]) -> List[PlacedEquipment]:
+    placed_list = []
+    for equipment_id in dict.fromkeys(equipment_ids):  # De-duplicate, keep order
+        placed = canvas_manager.get_equipment(equipment_id)
+        if placed is not None:
+            placed_list.append(placed)
+    return placed_list
+
+
+def _columns(placed_list: List[PlacedEquipment]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Centre coordinates and footprint sizes of the selection as arrays"""
+    xs = np.fromiter((placed.x_position for placed in placed_list), dtype=float, count=len(placed_list))
+    ys = np.fromiter((placed.y_position for placed in placed_list), dtype=float, count=len(placed_list))
+    sizes = np.array([placed.get_equipment_size() for placed in placed_list], dtype=float).reshape(-1, 2)
+    return xs, ys, sizes[:, 0], sizes[:, 1]
+
+
+def translate_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str], dx: float, dy: float) -> int:
+    """Shift every selected unit by the same offset"""
+    placed_list = _resolve(canvas_manager, equipment_ids)
+    if not placed_list:
+        return 0
+    xs, ys, _, _ = _columns(placed_list)
+    canvas_manager.set_positions(placed_list, xs + dx, ys + dy)
+    return len(placed_list)
+
+
+def rotate_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str], angle_deg: float,
+                 pivot: Optional[Tuple[float, float]] = None) -> int:
+    """Rotate the selection rigidly about a pivot (default: its centroid)"""
+    placed_list = _resolve(canvas_manager, equipment_ids)
+    if not placed_list:
+        return 0
+    xs, ys, _, _ = _columns(placed_list)
+    cx, cy = pivot if pivot is not None else (xs.mean(), ys.mean())
+    theta = math.radians(angle_deg)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    dx, dy = xs - cx, ys - cy
+    canvas_manager.set_positions(placed_list, cx + dx * cos_t - dy * sin_t, cy + dx * sin_t + dy * cos_t)
+    for placed in placed_list:
+        canvas_manager.set_rotation(placed, (placed.rotation + angle_deg) % 360)
+    return len(placed_list)
+
+
+def align_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str], mode: str) -> int:
+    """Line up edges or centres of the selection with the selection's bounding box"""
+    if mode not in ALIGN_MODES:
+        raise ValueError(f"Unknown alignment: {mode}")
+    placed_list = _resolve(canvas_manager, equipment_ids)
+    if len(placed_list) < 2:
+        return 0
+    xs, ys, widths, heights = _columns(placed_list)
+    if mode == "left":
+        xs = np.full_like(xs, (xs - widths / 2).min()) + widths / 2
+    elif mode == "right":
+        xs = np.full_like(xs, (xs + widths / 2).max()) - widths / 2
+    elif mode == "center_x":
+        xs = np.full_like(xs, ((xs - widths / 2).min() + (xs + widths / 2).max()) / 2)
+    elif mode == "top":
+        ys = np.full_like(ys, (ys - heights / 2).min()) + heights / 2
+    elif mode == "bottom":
+        ys = np.full_like(ys, (ys + heights / 2).max()) - heights / 2
+    else:
+        ys = np.full_like(ys, ((ys - heights / 2).min() + (ys + heights / 2).max()) / 2)
+    canvas_manager.set_positions(placed_list, xs, ys)
+    return len(placed_list)
+
+
+def distribute_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str], axis: str) -> int:
+    """Space the selection so the gaps between neighbouring footprints are equal along an axis"""
+    if axis not in DISTRIBUTE_AXES:
+        raise ValueError(f"Unknown axis: {axis}")
+    placed_list = _resolve(canvas_manager, equipment_ids)
+    if len(placed_list) < 3:
+        return 0
+    xs, ys, widths, heights = _columns(placed_list)
+    centres, extents = (xs, widths) if axis == "x" else (ys, heights)
+
+    order = np.argsort(centres, kind="stable")
+    sorted_extents = extents[order]
+    start = centres[order[0]] - sorted_extents[0] / 2
+    end = centres[order[-1]] + sorted_extents[-1] / 2
+    gap = (end - start - sorted_extents.sum()) / (len(placed_list) - 1)
+    # Each centre sits after all preceding footprints and gaps
+    leading = np.concatenate(([0.0], np.cumsum(sorted_extents[:-1] + gap)))
+    new_centres = np.empty_like(centres)
+    new_centres[order] = start + leading + sorted_extents / 2
+
+    if axis == "x":
+        canvas_manager.set_positions(placed_list, new_centres, ys)
+    else:
+        canvas_manager.set_positions(placed_list, xs, new_centres)
+    return len(placed_list)
+
+
+def delete_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str]) -> int:
+    """Remove every selected unit"""
+    return canvas_manager.remove_equipment_group(set(equipment_ids))
+
+
+def bulk_edit_group(canvas_manager: CanvasManager, equipment_ids: Iterable[str],
+                    power_rate_kw: Optional[float] = None, operation_time_hours: Optional[float] = None,
+                    fuel_type: Optional[str] = None) -> int:
+    """Set the given parameters on every selected power-configurable unit (None leaves a field unchanged)"""
+    if fuel_type is not None and fuel_type not in FUEL_TYPES:
+        raise ValueError(f"Unknown fuel type: {fuel_type}")
+    edited = 0
+    for placed in _resolve(canvas_manager, equipment_ids):
+        equipment = placed.equipment
+        if not equipment.requires_power_config:
+            continue
+        if power_rate_kw is not None:
+            equipment.power_rate_kw = power_rate_kw
+        if operation_time_hours is not None:
+            equipment.operation_time_hours = operation_time_hours
+        if fuel_type is not None:
+            equipment.fuel_type = fuel_type
+        canvas_manager.refresh_equipment(equipment)
+        edited += 1
+    return edited
@@ -1,277 +1,156 @@
 """
 Interactive drag and drop interface for equipment placement
 """
+import os
 import streamlit as st
 import streamlit.components.v1 as components
-import json
 from typing import Dict, List, Optional, Tuple
 
-def create_drag_drop_canvas(canvas_width: int = 800, canvas_height: int = 600):
-    """Create an interactive drag and drop canvas using HTML5 Canvas and JavaScript"""
-    
-    # Equipment data for the JavaScript component
-    equipment_data = []
-    if 'enhanced_canvas_manager' in st.session_state:
-        canvas_manager = st.session_state.enhanced_canvas_manager
-        for placed in canvas_manager.placed_equipment:
-            equipment = placed.equipment
-            equipment_data.append({
-                'id': equipment.id,
-                'name': equipment.name,
-                'icon': equipment.icon,
-                'x': placed.x_position,
-                'y': placed.y_position,
-                'category': equipment.category,
-                'co2': equipment.calculate_co2_emission(),
-                'selected': placed.is_selected
-            })
-    
-    # HTML and JavaScript for drag and drop canvas
-    html_code = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            .canvas-container {{
-                border: 2px solid #2E8B57;
-                border-radius: 10px;
-                background: linear-gradient(45deg, #f0f8f0 25%, transparent 25%), 
-                           linear-gradient(-45deg, #f0f8f0 25%, transparent 25%), 
-                           linear-gradient(45deg, transparent 75%, #f0f8f0 75%), 
-                           linear-gradient(-45deg, transparent 75%, #f0f8f0 75%);
-                background-size: 20px 20px;
-                background-position: 0 0, 0 10px, 10px -10px, -10px 0px;
-                position: relative;
-                overflow: hidden;
-                margin: 10px 0;
-            }}
-            .equipment-item {{
-                position: absolute;
-                width: 60px;
-                height: 60px;
-                background: linear-gradient(135deg, #4ECDC4, #44A08D);
-                border: 3px solid white;
-                border-radius: 50%;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                font-size: 24px;
-                cursor: move;
-                user-select: none;
-                box-shadow: 0 4px 8px rgba(0,0,0,0.2);
-                transition: all 0.2s ease;
-                z-index: 10;
-            }}
-            .equipment-item:hover {{
-                transform: scale(1.1);
-                box-shadow: 0 6px 12px rgba(0,0,0,0.3);
-                z-index: 20;
-            }}
-            .equipment-item.selected {{
-                background: linear-gradient(135deg, #FF6B6B, #EE5A52);
-                border-color: #FFD93D;
-                box-shadow: 0 0 20px rgba(255, 107, 107, 0.5);
-            }}
-            .equipment-item.dragging {{
-                opacity: 0.8;
-                transform: scale(1.15);
-                z-index: 30;
-            }}
-            .equipment-label {{
-                position: absolute;
-                top: 65px;
-                left: 50%;
-                transform: translateX(-50%);
-                background: rgba(255, 255, 255, 0.95);
-                padding: 2px 8px;
-                border-radius: 12px;
-                font-size: 10px;
-                font-weight: bold;
-                color: #2c3e50;
-                white-space: nowrap;
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                border: 1px solid #ddd;
-            }}
-            .grid-overlay {{
-                position: absolute;
-                top: 0;
-                left: 0;
-                width: 100%;
-                height: 100%;
-                pointer-events: none;
-                opacity: 0.3;
-            }}
-            .facility-info {{
-                position: absolute;
-                top: 10px;
-                left: 10px;
-                background: rgba(255, 255, 255, 0.9);
-                padding: 10px;
-                border-radius: 8px;
-                font-size: 12px;
-                box-shadow: 0 2px 8px rgba(0,0,0,0.1);
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="canvas-container" id="canvas" style="width: {canvas_width}px; height: {canvas_height}px;">
-            <div class="facility-info">
-                <div><strong>🏭 Facility Layout Canvas</strong></div>
-                <div>Drag equipment to reposition</div>
-                <div>Click to select equipment</div>
-            </div>
-            <div class="grid-overlay"></div>
-        </div>
-        
-        <script>
-            let equipmentData = {json.dumps(equipment_data)};
-            let selectedEquipment = null;
-            let isDragging = false;
-            let dragOffset = {{x: 0, y: 0}};
-            
-            const canvas = document.getElementById('canvas');
-            const canvasRect = canvas.getBoundingClientRect();
-            
-            // Create equipment elements
-            function createEquipmentElements() {{
-                // Clear existing equipment
-                const existingEquipment = canvas.querySelectorAll('.equipment-item');
-                existingEquipment.forEach(el => el.remove());
-                
-                equipmentData.forEach(equipment => {{
-                    const equipmentEl = document.createElement('div');
-                    equipmentEl.className = 'equipment-item';
-                    if (equipment.selected) equipmentEl.classList.add('selected');
-                    equipmentEl.id = `equipment-${{equipment.id}}`;
-                    equipmentEl.innerHTML = `
-                        ${{equipment.icon}}
-                        <div class="equipment-label">${{equipment.name}}</div>
-                    `;
-                    
-                    // Position equipment (scale from meters to pixels)
-                    const scale = Math.min({canvas_width}/200, {canvas_height}/200); // Assume 200m = canvas size
-                    equipmentEl.style.left = `${{equipment.x * scale - 30}}px`;
-                    equipmentEl.style.top = `${{equipment.y * scale - 30}}px`;
-                    
-                    // Add event listeners
-                    equipmentEl.addEventListener('mousedown', handleMouseDown);
-                    equipmentEl.addEventListener('click', handleClick);
-                    
-                    canvas.appendChild(equipmentEl);
-                }});
-            }}
-            
-            function handleMouseDown(e) {{
-                e.preventDefault();
-                isDragging = true;
-                const equipment = e.target.closest('.equipment-item');
-                equipment.classList.add('dragging');
-                
-                const rect = equipment.getBoundingClientRect();
-                const canvasRect = canvas.getBoundingClientRect();
-                dragOffset.x = e.clientX - rect.left - rect.width/2;
-                dragOffset.y = e.clientY - rect.top - rect.height/2;
-                
-                document.addEventListener('mousemove', handleMouseMove);
-                document.addEventListener('mouseup', handleMouseUp);
-            }}
-            
-            function handleMouseMove(e) {{
-                if (!isDragging) return;
-                
-                const equipment = document.querySelector('.dragging');
-                if (!equipment) return;
-                
-                const canvasRect = canvas.getBoundingClientRect();
-                const x = e.clientX - canvasRect.left - dragOffset.x - 30;
-                const y = e.clientY - canvasRect.top - dragOffset.y - 30;
-                
-                // Constrain to canvas bounds
-                const constrainedX = Math.max(0, Math.min(x, {canvas_width} - 60));
-                const constrainedY = Math.max(0, Math.min(y, {canvas_height} - 60));
-                
-                equipment.style.left = `${{constrainedX}}px`;
-                equipment.style.top = `${{constrainedY}}px`;
-            }}
-            
-            function handleMouseUp(e) {{
-                if (!isDragging) return;
-                
-                const equipment = document.querySelector('.dragging');
-                if (equipment) {{
-                    equipment.classList.remove('dragging');
-                    
-                    // Convert back to meters and send to Streamlit
-                    const rect = equipment.getBoundingClientRect();
-                    const canvasRect = canvas.getBoundingClientRect();
-                    const scale = Math.min({canvas_width}/200, {canvas_height}/200);
-                    
-                    const centerX = (rect.left - canvasRect.left + 30) / scale;
-                    const centerY = (rect.top - canvasRect.top + 30) / scale;
-                    
-                    // Send position update to Streamlit
-                    window.parent.postMessage({{
-                        type: 'equipment_moved',
-                        equipment_id: equipment.id.replace('equipment-', ''),
-                        x: Math.round(centerX),
-                        y: Math.round(centerY)
-                    }}, '*');
-                }}
-                
-                isDragging = false;
-                document.removeEventListener('mousemove', handleMouseMove);
-                document.removeEventListener('mouseup', handleMouseUp);
-            }}
-            
-            function handleClick(e) {{
-                e.stopPropagation();
-                const equipment = e.target.closest('.equipment-item');
-                
-                // Clear previous selection
-                document.querySelectorAll('.equipment-item').forEach(el => el.classList.remove('selected'));
-                
-                // Select clicked equipment
-                equipment.classList.add('selected');
-                
-                // Send selection to Streamlit
-                window.parent.postMessage({{
-                    type: 'equipment_selected',
-                    equipment_id: equipment.id.replace('equipment-', '')
-                }}, '*');
-            }}
-            
-            // Initialize
-            createEquipmentElements();
-            
-            // Handle canvas click (deselect)
-            canvas.addEventListener('click', (e) => {{
-                if (e.target === canvas || e.target.classList.contains('grid-overlay')) {{
-                    document.querySelectorAll('.equipment-item').forEach(el => el.classList.remove('selected'));
-                    window.parent.postMessage({{
-                        type: 'equipment_deselected'
-                    }}, '*');
-                }}
-            }});
-            
-            // Listen for equipment updates from Streamlit
-            window.addEventListener('message', (event) => {{
-                if (event.data.type === 'update_equipment') {{
-                    equipmentData = event.data.equipment_data;
-                    createEquipmentElements();
-                }}
-            }});
-        </script>
-    </body>
-    </html>
+from .placed_equipment import CanvasManager, PlacedEquipment
+
+# Bidirectional component: the browser owns drag and snap state and sends back one
+# debounced batch of moves; the server answers with delta patches against a version.
+_FRONTEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "frontend", "drag_drop_canvas")
+_drag_drop_component = components.declare_component("drag_drop_canvas", path=_FRONTEND_DIR)
+
+COMPONENT_KEY = "drag_drop_canvas"
+SYNC_STATE_KEY = "drag_drop_canvas_sync"
+LAST_BATCH_KEY = "drag_drop_canvas_last_batch"
+BATCH_DEBOUNCE_MS = 400
+
+
+def _client_record(placed: PlacedEquipment) -> Dict:
+    """Fields the browser needs to draw one unit"""
+    equipment = placed.equipment
+    return {
+        'id': equipment.id,
+        'name': equipment.name,
+        'icon': equipment.icon,
+        'x': placed.x_position,
+        'y': placed.y_position,
+        'selected': placed.is_selected
+    }
+
+
+class CanvasSyncState:
+    """Server-side mirror of what the browser canvas currently shows"""
+
+    def __init__(self):
+        self.version = 0
+        self.client_units: Dict[str, Dict] = {}  # equipment id -> last record sent to / reported by the browser
+        self.needs_full = True
+
+    def next_patch(self, placed_list: List[PlacedEquipment]) -> Dict:
+        """Diff the layout against the browser's view and advance the version.
+
+        Returns a full snapshot after a resync request, otherwise only the added,
+        moved, updated (name/icon/selection) and removed units.
+        """
+        current = {placed.equipment.id: _client_record(placed) for placed in placed_list}
+        base_version = self.version
+
+        if self.needs_full:
+            self.version += 1
+            self.client_units = current
+            self.needs_full = False
+            return {'full': True, 'added': list(current.values()), 'version': self.version}
+
+        added, moved, updated = [], [], []
+        for equipment_id, record in current.items():
+            previous = self.client_units.get(equipment_id)
+            if previous is None:
+                added.append(record)
+                continue
+            if (previous['x'], previous['y']) != (record['x'], record['y']):
+                moved.append({'id': equipment_id, 'x': record['x'], 'y': record['y']})
+            if (previous['name'], previous['icon'], previous['selected']) != \
+                    (record['name'], record['icon'], record['selected']):
+                updated.append(record)
+        removed = [equipment_id for equipment_id in self.client_units if equipment_id not in current]
+
+        if added or moved or updated or removed:
+            self.version += 1
+            self.client_units = current
+        return {
+            'full': False,
+            'base_version': base_version,
+            'version': self.version,
+            'added': added,
+            'moved': moved,
+            'updated': updated,
+            'removed': removed
+        }
+
+    def acknowledge_moves(self, moves: List[Dict]):
+        """Record positions the browser already shows so they are not echoed back"""
+        for move in moves:
+            record = self.client_units.get(move['id'])
+            if record is not None:
+                record['x'], record['y'] = move['x'], move['y']
+
+    def acknowledge_selection(self, selected_id: Optional[str]):
+        for equipment_id, record in self.client_units.items():
+            record['selected'] = equipment_id == selected_id
+
+
+def handle_canvas_events(value: Optional[Dict], canvas_manager: CanvasManager,
+                         sync: CanvasSyncState) -> bool:
+    """Apply one batch sent by the drag and drop canvas.
+
+    Each batch carries every position change since the last one, so a multi-unit
+    rearrangement costs a single rerun. Returns True if the layout changed.
     """
-    
-    # Render the HTML component
-    component_value = components.html(html_code, height=canvas_height + 50, scrolling=False)
-    
-    return component_value
+    if not value or value.get('batch_id') == st.session_state.get(LAST_BATCH_KEY):
+        return False
+    st.session_state[LAST_BATCH_KEY] = value.get('batch_id')
+
+    if value.get('type') == 'resync':
+        sync.needs_full = True
+        return False
+
+    applied = []
+    for move in value.get('moves', []):
+        placed = canvas_manager.get_equipment(move.get('id'))
+        if placed is None:
+            continue
+        canvas_manager.update_equipment_position(placed, float(move['x']), float(move['y']))
+        applied.append(move)
+    sync.acknowledge_moves(applied)
+
+    if value.get('selection_changed'):
+        canvas_manager.select_equipment(value.get('selected_id'))
+        sync.acknowledge_selection(value.get('selected_id'))
+
+    if applied:
+        st.session_state.project_saved = False
+    return bool(applied)
+
+
+def create_drag_drop_canvas(canvas_width: int = 800, canvas_height: int = 600,
+                            canvas_manager: Optional[CanvasManager] = None):
+    """Create the interactive drag and drop canvas component"""
+    if canvas_manager is None:
+        canvas_manager = st.session_state.get('canvas_manager')
+    if canvas_manager is None:
+        return None
+
+    if SYNC_STATE_KEY not in st.session_state:
+        st.session_state[SYNC_STATE_KEY] = CanvasSyncState()
+    sync = st.session_state[SYNC_STATE_KEY]
+
+    # The component's latest value is in session state before it is redrawn, so
+    # the batch is applied first and the patch below already reflects it
+    handle_canvas_events(st.session_state.get(COMPONENT_KEY), canvas_manager, sync)
+
+    width_m, height_m = canvas_manager.get_canvas_bounds()
+    config = {
+        'width_px': canvas_width,
+        'height_px': canvas_height,
+        'width_m': width_m,
+        'height_m': height_m,
+        'grid_size': canvas_manager.grid_size,
+        'debounce_ms': BATCH_DEBOUNCE_MS
+    }
+    patch = sync.next_patch(canvas_manager.placed_equipment)
 
-def handle_canvas_events():
-    """Handle events from the drag and drop canvas"""
-    # This would typically be handled through Streamlit's component communication
-    # For now, we'll use session state to track changes
-    pass
\ No newline at end of file
+    return _drag_drop_component(config=config, patch=patch, key=COMPONENT_KEY, default=None)
@@ -0,0 +1,303 @@
+"""
+Immutable, structurally shared layout versions (hash array mapped trie keyed by equipment id)
+"""
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .equipment_model import EquipmentModel
+
+if TYPE_CHECKING:
+    from .placed_equipment import PlacedEquipment
+
+_BITS = 5
+_MASK = (1 << _BITS) - 1
+_HASH_MASK = 0xFFFFFFFF
+_MISSING = object()
+
+# Per-unit state held in a layout version, in record order
+EQUIPMENT_FIELDS = ("name", "category", "power_rate_kw", "operation_time_hours", "fuel_type",
+                    "fuel_consumption_rate", "description", "icon")
+PLACEMENT_FIELDS = ("x_position", "y_position", "rotation", "connections")
+RECORD_FIELDS = EQUIPMENT_FIELDS + PLACEMENT_FIELDS
+
+Record = Tuple[Any, ...]
+
+
+def unit_record(placed: 'PlacedEquipment') -> Record:
+    """Hashable snapshot of one unit's tracked fields"""
+    equipment = placed.equipment
+    return (equipment.name, equipment.category, equipment.power_rate_kw, equipment.operation_time_hours,
+            equipment.fuel_type, equipment.fuel_consumption_rate, equipment.description, equipment.icon,
+            placed.x_position, placed.y_position, placed.rotation, tuple(placed.connections))
+
+
+def placed_from_record(equipment_id: str, record: Record) -> 'PlacedEquipment':
+    """Fresh placed unit rebuilt from a record"""
+    from .placed_equipment import PlacedEquipment  # The canvas manager imports this module
+    values = dict(zip(RECORD_FIELDS, record))
+    equipment = EquipmentModel(id=equipment_id, **{name: values[name] for name in EQUIPMENT_FIELDS})
+    return PlacedEquipment(equipment=equipment, x_position=values["x_position"], y_position=values["y_position"],
+                           rotation=values["rotation"], connections=list(values["connections"]))
+
+
+class _Entry:
+    __slots__ = ("key", "hash", "value")
+
+    def __init__(self, key, key_hash: int, value):
+        self.key = key
+        self.hash = key_hash
+        self.value = value
+
+
+class _CollisionNode:
+    """Entries whose 32-bit hashes are identical"""
+    __slots__ = ("hash", "entries")
+
+    def __init__(self, key_hash: int, entries: Tuple[_Entry, ...]):
+        self.hash = key_hash
+        self.entries = entries
+
+    def find(self, key, key_hash: int, shift: int):
+        for entry in self.entries:
+            if entry.key == key:
+                return entry.value
+        return _MISSING
+
+    def assoc(self, key, key_hash: int, value, shift: int):
+        if key_hash != self.hash:
+            # A different hash reached this slot; push the collision one level down
+            return _BitmapNode(_bit(self.hash, shift), (self,)).assoc(key, key_hash, value, shift)
+        for index, entry in enumerate(self.entries):
+            if entry.key == key:
+                if entry.value is value:
+                    return self, False
+                entries = self.entries[:index] + (_Entry(key, key_hash, value),) + self.entries[index + 1:]
+                return _CollisionNode(self.hash, entries), False
+        return _CollisionNode(self.hash, self.entries + (_Entry(key, key_hash, value),)), True
+
+    def without(self, key, key_hash: int, shift: int):
+        """(replacement, removed); the replacement is a lone _Entry once one entry is left"""
+        for index, entry in enumerate(self.entries):
+            if entry.key == key:
+                entries = self.entries[:index] + self.entries[index + 1:]
+                return (entries[0] if len(entries) == 1 else _CollisionNode(self.hash, entries)), True
+        return self, False
+
+
+class _BitmapNode:
+    """Up to 32 slots, stored densely and addressed by a population-count bitmap"""
+    __slots__ = ("bitmap", "items")
+
+    def __init__(self, bitmap: int, items: Tuple):
+        self.bitmap = bitmap
+        self.items = items  # _Entry or child node per set bit, in bit order
+
+    def find(self, key, key_hash: int, shift: int):
+        bit = _bit(key_hash, shift)
+        if not self.bitmap & bit:
+            return _MISSING
+        item = self.items[(self.bitmap & (bit - 1)).bit_count()]
+        if isinstance(item, _Entry):
+            return item.value if item.key == key else _MISSING
+        return item.find(key, key_hash, shift + _BITS)
+
+    def _replace(self, index: int, item) -> '_BitmapNode':
+        return _BitmapNode(self.bitmap, self.items[:index] + (item,) + self.items[index + 1:])
+
+    def assoc(self, key, key_hash: int, value, shift: int):
+        """(new node, added); returns self unchanged when the value is already stored"""
+        bit = _bit(key_hash, shift)
+        index = (self.bitmap & (bit - 1)).bit_count()
+        if not self.bitmap & bit:
+            items = self.items[:index] + (_Entry(key, key_hash, value),) + self.items[index:]
+            return _BitmapNode(self.bitmap | bit, items), True
+
+        item = self.items[index]
+        if isinstance(item, _Entry):
+            if item.key == key:
+                if item.value is value:
+                    return self, False
+                return self._replace(index, _Entry(key, key_hash, value)), False
+            return self._replace(index, _merge(item, _Entry(key, key_hash, value), shift + _BITS)), True
+
+        child, added = item.assoc(key, key_hash, value, shift + _BITS)
+        if child is item:
+            return self, added
+        return self._replace(index, child), added
+
+    def without(self, key, key_hash: int, shift: int):
+        """(new node or None when emptied, removed)"""
+        bit = _bit(key_hash, shift)
+        if not self.bitmap & bit:
+            return self, False
+        index = (self.bitmap & (bit - 1)).bit_count()
+        item = self.items[index]
+
+        if isinstance(item, _Entry):
+            if item.key != key:
+                return self, False
+            child = None
+        else:
+            child, removed = item.without(key, key_hash, shift + _BITS)
+            if not removed:
+                return self, False
+            # Pull a lone entry up so paths stay as short as the keys require
+            if isinstance(child, _BitmapNode) and len(child.items) == 1 and isinstance(child.items[0], _Entry):
+                child = child.items[0]
+
+        if child is not None:
+            return self._replace(index, child), True
+        if len(self.items) == 1:
+            return None, True
+        return _BitmapNode(self.bitmap ^ bit, self.items[:index] + self.items[index + 1:]), True
+
+
+_EMPTY_NODE = _BitmapNode(0, ())
+
+
+def _bit(key_hash: int, shift: int) -> int:
+    return 1 << ((key_hash >> shift) & _MASK)
+
+
+def _merge(first: _Entry, second: _Entry, shift: int):
+    """Smallest subtree holding two entries whose hashes agree up to `shift`"""
+    if first.hash == second.hash:
+        return _CollisionNode(first.hash, (first, second))
+    first_bit, second_bit = _bit(first.hash, shift), _bit(second.hash, shift)
+    if first_bit == second_bit:
+        return _BitmapNode(first_bit, (_merge(first, second, shift + _BITS),))
+    items = (first, second) if first_bit < second_bit else (second, first)
+    return _BitmapNode(first_bit | second_bit, items)
+
+
+def _iter_entries(item) -> Iterator[_Entry]:
+    if item is None:
+        return
+    if isinstance(item, _Entry):
+        yield item
+    elif isinstance(item, _CollisionNode):
+        yield from item.entries
+    else:
+        for child in item.items:
+            yield from _iter_entries(child)
+
+
+def _diff(old, new) -> Iterator[Tuple[Any, Any, Any]]:
+    """(key, old value, new value) for every difference; shared subtrees are skipped unvisited"""
+    if old is new:
+        return
+    if isinstance(old, _BitmapNode) and isinstance(new, _BitmapNode):
+        for bit_index in range(1 << _BITS):
+            bit = 1 << bit_index
+            old_item = old.items[(old.bitmap & (bit - 1)).bit_count()] if old.bitmap & bit else None
+            new_item = new.items[(new.bitmap & (bit - 1)).bit_count()] if new.bitmap & bit else None
+            if old_item is not new_item:
+                yield from _diff(old_item, new_item)
+        return
+
+    # Differently shaped slots (entry vs subtree, collisions) are small; compare them directly
+    old_values = {entry.key: entry.value for entry in _iter_entries(old)}
+    new_values = {entry.key: entry.value for entry in _iter_entries(new)}
+    for key, value in old_values.items():
+        other = new_values.get(key, _MISSING)
+        if other is not value and (other is _MISSING or other != value):
+            yield key, value, other
+    for key, value in new_values.items():
+        if key not in old_values:
+            yield key, _MISSING, value
+
+
+class PersistentMap:
+    """Immutable mapping where set/delete return a new map sharing all untouched nodes.
+
+    Copies are free (the map is never mutated), updates copy only the O(log32 n)
+    nodes on one key's path, and diff() skips every subtree two versions share.
+    """
+    __slots__ = ("_root", "_count")
+
+    def __init__(self, root: _BitmapNode = _EMPTY_NODE, count: int = 0):
+        self._root = root
+        self._count = count
+
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[Any, Any]]) -> 'PersistentMap':
+        result = cls()
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key) -> bool:
+        return self._root.find(key, hash(key) & _HASH_MASK, 0) is not _MISSING
+
+    def __iter__(self) -> Iterator:
+        for entry in _iter_entries(self._root):
+            yield entry.key
+
+    def get(self, key, default=None):
+        value = self._root.find(key, hash(key) & _HASH_MASK, 0)
+        return default if value is _MISSING else value
+
+    def items(self) -> Iterator[Tuple[Any, Any]]:
+        for entry in _iter_entries(self._root):
+            yield entry.key, entry.value
+
+    def set(self, key, value) -> 'PersistentMap':
+        root, added = self._root.assoc(key, hash(key) & _HASH_MASK, value, 0)
+        if root is self._root:
+            return self
+        return PersistentMap(root, self._count + added)
+
+    def delete(self, key) -> 'PersistentMap':
+        root, removed = self._root.without(key, hash(key) & _HASH_MASK, 0)
+        if not removed:
+            return self
+        return PersistentMap(root if root is not None else _EMPTY_NODE, self._count - 1)
+
+    def diff(self, other: 'PersistentMap') -> Iterator[Tuple[Any, Any, Any]]:
+        """(key, value here, value in other) for changed keys; a missing side is reported as None"""
+        for key, old, new in _diff(self._root, other._root):
+            yield key, (None if old is _MISSING else old), (None if new is _MISSING else new)
+
+
+class LayoutSnapshot:
+    """One immutable version of the layout: equipment id -> (placement sequence, record).
+
+    Holding a snapshot costs nothing beyond the nodes later edits replace, so undo
+    history, what-if branches and background report jobs can each keep their own.
+    """
+    __slots__ = ("units",)
+
+    def __init__(self, units: Optional[PersistentMap] = None):
+        self.units = units if units is not None else PersistentMap()
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def __contains__(self, equipment_id: str) -> bool:
+        return equipment_id in self.units
+
+    def record(self, equipment_id: str) -> Optional[Record]:
+        value = self.units.get(equipment_id)
+        return value[1] if value is not None else None
+
+    def records(self) -> List[Tuple[str, Record]]:
+        """(equipment id, record) pairs in placement order"""
+        ordered = sorted(self.units.items(), key=lambda item: item[1][0])
+        return [(equipment_id, value[1]) for equipment_id, value in ordered]
+
+    def as_dict(self) -> Dict[str, Record]:
+        return dict(self.records())
+
+    def changes_since(self, older: 'LayoutSnapshot') -> Iterator[Tuple[str, Optional[Record], Optional[Record]]]:
+        """(equipment id, older record, this record) for every unit that differs; None means absent"""
+        for equipment_id, old, new in older.units.diff(self.units):
+            old_record = old[1] if old is not None else None
+            new_record = new[1] if new is not None else None
+            if old_record != new_record:
+                yield equipment_id, old_record, new_record
+
+    def to_placed_equipment(self) -> List['PlacedEquipment']:
+        """Fresh placed units for this version, in placement order"""
+        return [placed_from_record(equipment_id, record) for equipment_id, record in self.records()]
@@ -1,9 +1,15 @@
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Set, Tuple, Optional
 import uuid
+import numpy as np
 from src.models.equipment_model import EquipmentModel
+from src.models.fleet import EquipmentFleet, FleetMetrics
+from src.models.running_totals import RunningTotals
+from src.models.facility_metrics import FacilityMetrics, metrics_fingerprint
+from src.models.spatial_index import SpatialGrid
+from src.models.persistent_layout import LayoutSnapshot, PersistentMap, unit_record
 
-@dataclass 
+@dataclass(eq=False)  # Identity semantics: units are mutable and looked up by equipment id
 class PlacedEquipment:
     """Equipment placed on the canvas with position and configuration"""
     equipment: EquipmentModel
@@ -134,9 +140,40 @@ class CanvasManager:
     def __init__(self, facility_width_m: float, facility_height_m: float):
         self.facility_width_m = facility_width_m
         self.facility_height_m = facility_height_m
-        self.placed_equipment: List[PlacedEquipment] = []
+        self._placed: Optional[List[PlacedEquipment]] = []  # placed_equipment, derived from _by_id after a removal
         self.grid_size = 5.0  # 5 meter grid
         self.snap_distance = 10.0  # 10 meter snap distance
+        self.fleet = EquipmentFleet()  # Columnar mirror of placed_equipment for vectorized metrics
+        self.totals = RunningTotals()  # Facility totals and rollups kept current on every edit
+        self._facility_metrics: Optional[FacilityMetrics] = None  # Memoized snapshot for the current layout
+        self.spatial_index: SpatialGrid[PlacedEquipment] = SpatialGrid()  # Uniform grid over equipment bounds
+        self._by_id: Dict[str, PlacedEquipment] = {}  # equipment id -> placed unit, in placement order
+        self._connected_from: Dict[str, Set[str]] = {}  # equipment id -> ids of units connected to it
+        self._layout = PersistentMap()  # Immutable mirror: equipment id -> (placement sequence, record)
+        self._layout_sequence = 0
+        self.selected_id: Optional[str] = None
+    
+    @property
+    def placed_equipment(self) -> List[PlacedEquipment]:
+        """Placed units in placement order"""
+        if self._placed is None:
+            self._placed = list(self._by_id.values())
+        return self._placed
+    
+    @placed_equipment.setter
+    def placed_equipment(self, placed_list: List[PlacedEquipment]):
+        self._placed = placed_list
+    
+    def _track_unit(self, placed: PlacedEquipment):
+        """Index a new unit by id and append it to the placement order"""
+        self._by_id[placed.equipment.id] = placed
+        if self._placed is not None:
+            self._placed.append(placed)
+    
+    def _untrack_unit(self, equipment_id: str):
+        """Drop a unit from the id index; the ordered list is derived again on next use, so no list scan"""
+        del self._by_id[equipment_id]
+        self._placed = None
     
     def add_equipment(self, equipment: EquipmentModel, x: float, y: float) -> PlacedEquipment:
         """Add equipment to canvas at specified position"""
@@ -156,80 +193,288 @@ class CanvasManager:
         # Check for snap opportunities
         self._auto_snap(placed)
         
-        self.placed_equipment.append(placed)
+        self._track_unit(placed)
+        self.fleet.append(equipment)
+        self.totals.add(equipment)
+        self.spatial_index.insert(equipment.id, placed, placed.bounds)
+        self._commit_unit(placed)
         return placed
     
+    def add_equipment_batch(self, equipment_list: List[EquipmentModel], xs: np.ndarray, ys: np.ndarray,
+                            skip_overlaps: bool = True) -> Tuple[List[PlacedEquipment], List[int]]:
+        """Place many units in one pass; returns (placed units, indices skipped for overlapping).
+        
+        Each position is snapped to the grid and clamped, as arrays, with no nudging or
+        auto-snap. A pattern therefore stays regular only if its offsets are whole grid
+        cells (bulk_placement.array_positions rounds array spacing up to that). Each
+        candidate is checked against the existing layout and the units accepted earlier
+        in the same batch.
+        """
+        self._ensure_derived_in_sync()
+        xs = np.clip(np.round(np.asarray(xs, dtype=float) / self.grid_size) * self.grid_size, 0, self.facility_width_m)
+        ys = np.clip(np.round(np.asarray(ys, dtype=float) / self.grid_size) * self.grid_size, 0, self.facility_height_m)
+        
+        placed_list: List[PlacedEquipment] = []
+        skipped: List[int] = []
+        for index, (equipment, x, y) in enumerate(zip(equipment_list, xs.tolist(), ys.tolist())):
+            placed = PlacedEquipment(equipment=equipment, x_position=x, y_position=y)
+            if skip_overlaps and self.spatial_index.query(placed.bounds):
+                skipped.append(index)
+                continue
+            self._track_unit(placed)
+            self.spatial_index.insert(equipment.id, placed, placed.bounds)
+            self.fleet.append(equipment)
+            self.totals.add(equipment)
+            self._commit_unit(placed)
+            placed_list.append(placed)
+        return placed_list, skipped
+    
+    def restore_equipment(self, placed_list: List[PlacedEquipment]):
+        """Append units exactly as given (no snapping or overlap checks), e.g. when undoing a removal"""
+        self._ensure_derived_in_sync()
+        for placed in placed_list:
+            equipment_id = placed.equipment.id
+            self._track_unit(placed)
+            self.fleet.append(placed.equipment)
+            self.totals.add(placed.equipment)
+            self.spatial_index.insert(equipment_id, placed, placed.bounds)
+            for target_id in placed.connections:
+                self._connected_from.setdefault(target_id, set()).add(equipment_id)
+            self._commit_unit(placed)
+    
+    def load_equipment(self, placed_list: List[PlacedEquipment], fleet: Optional[EquipmentFleet] = None):
+        """Replace all placed equipment as-is (no snapping), e.g. when loading a project or restoring history.
+        
+        `fleet` may carry a prebuilt columnar fleet for the same units (such as one read from a
+        binary project); it is used only if its ids match the units in order.
+        """
+        self.placed_equipment = list(placed_list)
+        self._rebuild_derived(fleet=fleet)
+    
+    def restore_snapshot(self, snapshot: LayoutSnapshot):
+        """Replace the layout with a snapshot's version, sharing its immutable structure"""
+        self.placed_equipment = snapshot.to_placed_equipment()
+        self._rebuild_derived(rebuild_layout=False)
+        self._layout = snapshot.units
+        self._layout_sequence = max((value[0] for _, value in snapshot.units.items()), default=-1) + 1
+    
+    def snapshot(self) -> LayoutSnapshot:
+        """O(1) immutable version of the current layout; later edits never change it"""
+        self._ensure_derived_in_sync()
+        return LayoutSnapshot(self._layout)
+    
+    def _commit_unit(self, placed: PlacedEquipment):
+        """Write one unit's current record into the immutable layout (copies only its path)"""
+        equipment_id = placed.equipment.id
+        current = self._layout.get(equipment_id)
+        record = unit_record(placed)
+        if current is None:
+            self._layout = self._layout.set(equipment_id, (self._layout_sequence, record))
+            self._layout_sequence += 1
+        elif current[1] != record:
+            self._layout = self._layout.set(equipment_id, (current[0], record))
+    
+    def _rebuild_derived(self, rebuild_layout: bool = True, fleet: Optional[EquipmentFleet] = None):
+        """Recompute the fleet, running totals and spatial index from placed_equipment"""
+        placed_list = self.placed_equipment  # Authoritative here; _by_id is rebuilt from it
+        equipment_list = [placed.equipment for placed in placed_list]
+        if fleet is None or fleet.ids != [equipment.id for equipment in equipment_list]:
+            fleet = EquipmentFleet.from_equipment(equipment_list)
+        self.fleet = fleet
+        self.totals.rebuild(equipment_list, self.fleet.compute())
+        self.spatial_index.clear()
+        self._by_id = {}
+        self._connected_from = {}
+        self.selected_id = None
+        if rebuild_layout:
+            self._layout = PersistentMap()
+            self._layout_sequence = 0
+        for placed in placed_list:
+            equipment_id = placed.equipment.id
+            self._by_id[equipment_id] = placed
+            self.spatial_index.insert(equipment_id, placed, placed.bounds)
+            for target_id in placed.connections:
+                self._connected_from.setdefault(target_id, set()).add(equipment_id)
+            if placed.is_selected and self.selected_id is None:
+                self.selected_id = equipment_id
+            if rebuild_layout:
+                self._commit_unit(placed)
+    
+    def _ensure_derived_in_sync(self):
+        """Rebuild derived data if the list was mutated without going through the manager"""
+        # With no list derived since the last removal there is none to mutate; _by_id is the layout
+        count = len(self._placed) if self._placed is not None else len(self._by_id)
+        if (len(self.fleet) != count or len(self.totals) != count or
+                len(self.spatial_index) != count or len(self._by_id) != count or len(self._layout) != count):
+            self._rebuild_derived()
+    
+    def get_equipment(self, equipment_id: str) -> Optional[PlacedEquipment]:
+        """Look up a placed unit by equipment id"""
+        self._ensure_derived_in_sync()
+        return self._by_id.get(equipment_id)
+    
+    def get_equipment_in_region(self, region: Tuple[float, float, float, float]) -> List[PlacedEquipment]:
+        """Units whose footprint intersects a (min_x, min_y, max_x, max_y) region, in placement order"""
+        self._ensure_derived_in_sync()
+        return self.spatial_index.query(region)
+    
+    def clear_all_equipment(self):
+        """Remove all equipment from canvas"""
+        self.placed_equipment = []
+        self.fleet.clear()
+        self.totals.clear()
+        self.spatial_index.clear()
+        self._by_id = {}
+        self._connected_from = {}
+        self._layout = PersistentMap()
+        self.selected_id = None
+    
+    def refresh_equipment(self, equipment: EquipmentModel) -> bool:
+        """Re-sync derived data after an equipment's configuration was edited in place"""
+        if not self.fleet.update(equipment):
+            return False
+        self.totals.update(equipment)
+        placed = self._by_id.get(equipment.id)
+        if placed is not None:
+            self._commit_unit(placed)
+        return True
+    
     def remove_equipment(self, equipment_id: str) -> bool:
         """Remove equipment from canvas"""
-        for i, placed in enumerate(self.placed_equipment):
-            if placed.equipment.id == equipment_id:
-                # Remove connections to this equipment
-                for other in self.placed_equipment:
-                    other.remove_connection(equipment_id)
-                
-                self.placed_equipment.pop(i)
-                return True
-        return False
+        placed = self.get_equipment(equipment_id)
+        if placed is None:
+            return False
+        
+        # Remove connections to this equipment (only units that actually reference it)
+        for source_id in self._connected_from.pop(equipment_id, ()):
+            source = self._by_id.get(source_id)
+            if source is not None:
+                source.remove_connection(equipment_id)
+                self._commit_unit(source)
+        for target_id in placed.connections:
+            self._connected_from.get(target_id, set()).discard(equipment_id)
+        
+        if self.selected_id == equipment_id:
+            self.selected_id = None
+        
+        self._untrack_unit(equipment_id)
+        self.fleet.remove(equipment_id)
+        self.totals.remove(equipment_id)
+        self.spatial_index.remove(equipment_id)
+        self._layout = self._layout.delete(equipment_id)
+        return True
+    
+    def remove_equipment_group(self, equipment_ids: Set[str]) -> int:
+        """Remove many units, updating each derived structure per removed unit (no full rebuild)"""
+        self._ensure_derived_in_sync()
+        equipment_ids = {equipment_id for equipment_id in equipment_ids if equipment_id in self._by_id}
+        if not equipment_ids:
+            return 0
+        
+        for equipment_id in equipment_ids:
+            # Drop connections that point at removed units from the units that remain
+            for source_id in self._connected_from.pop(equipment_id, ()):
+                if source_id not in equipment_ids:
+                    self._by_id[source_id].remove_connection(equipment_id)
+                    self._commit_unit(self._by_id[source_id])
+            for target_id in self._by_id[equipment_id].connections:
+                if target_id not in equipment_ids:
+                    self._connected_from.get(target_id, set()).discard(equipment_id)
+        
+        if self.selected_id in equipment_ids:
+            self.selected_id = None
+        for equipment_id in equipment_ids:
+            self._untrack_unit(equipment_id)
+            self.fleet.remove(equipment_id)
+            self.totals.remove(equipment_id)
+            self.spatial_index.remove(equipment_id)
+            self._layout = self._layout.delete(equipment_id)
+        return len(equipment_ids)
+    
+    def connect_equipment(self, source_id: str, target_id: str) -> bool:
+        """Record a connection from one placed unit to another"""
+        source = self.get_equipment(source_id)
+        if source is None or target_id not in self._by_id:
+            return False
+        source.add_connection(target_id)
+        self._connected_from.setdefault(target_id, set()).add(source_id)
+        self._commit_unit(source)
+        return True
+    
+    def disconnect_equipment(self, source_id: str, target_id: str) -> bool:
+        """Remove a connection between two placed units"""
+        source = self.get_equipment(source_id)
+        if source is None or target_id not in source.connections:
+            return False
+        source.remove_connection(target_id)
+        self._connected_from.get(target_id, set()).discard(source_id)
+        self._commit_unit(source)
+        return True
     
     def move_equipment(self, equipment_id: str, new_x: float, new_y: float) -> bool:
         """Move equipment to new position"""
-        for placed in self.placed_equipment:
-            if placed.equipment.id == equipment_id:
-                # Snap to grid
-                placed.x_position = round(new_x / self.grid_size) * self.grid_size
-                placed.y_position = round(new_y / self.grid_size) * self.grid_size
-                
-                # Ensure within bounds
-                placed.x_position = max(0, min(placed.x_position, self.facility_width_m))
-                placed.y_position = max(0, min(placed.y_position, self.facility_height_m))
-                
-                # Check for snap opportunities
-                self._auto_snap(placed)
-                return True
-        return False
+        placed = self.get_equipment(equipment_id)
+        if placed is None:
+            return False
+        
+        # Snap to grid
+        placed.x_position = round(new_x / self.grid_size) * self.grid_size
+        placed.y_position = round(new_y / self.grid_size) * self.grid_size
+        
+        # Ensure within bounds
+        placed.x_position = max(0, min(placed.x_position, self.facility_width_m))
+        placed.y_position = max(0, min(placed.y_position, self.facility_height_m))
+        
+        # Check for snap opportunities
+        self._auto_snap(placed)
+        self.spatial_index.update(equipment_id, placed, placed.bounds)
+        self._commit_unit(placed)
+        return True
     
-    def select_equipment(self, equipment_id: str):
+    def select_equipment(self, equipment_id: Optional[str]):
         """Select equipment (deselect others)"""
-        for placed in self.placed_equipment:
-            placed.is_selected = (placed.equipment.id == equipment_id)
+        previous = self.get_equipment(self.selected_id) if self.selected_id else None
+        if previous is not None:
+            previous.is_selected = False
+        
+        selected = self.get_equipment(equipment_id) if equipment_id else None
+        if selected is not None:
+            selected.is_selected = True
+        self.selected_id = equipment_id if selected is not None else None
     
     def get_selected_equipment(self) -> Optional[PlacedEquipment]:
         """Get currently selected equipment"""
-        for placed in self.placed_equipment:
-            if placed.is_selected:
-                return placed
-        return None
+        return self.get_equipment(self.selected_id) if self.selected_id else None
     
     def _resolve_overlaps(self, new_equipment: PlacedEquipment) -> PlacedEquipment:
         """Resolve overlaps by adjusting position"""
         max_attempts = 10
         attempt = 0
         
+        self._ensure_derived_in_sync()
         while attempt < max_attempts:
-            overlapping = False
-            for existing in self.placed_equipment:
-                if new_equipment.overlaps_with(existing):
-                    overlapping = True
-                    # Move to the right by equipment width
-                    width, _ = new_equipment.get_equipment_size()
-                    new_equipment.x_position += width + 5  # 5m gap
-                    
-                    # If moved out of bounds, try moving down
-                    if new_equipment.x_position > self.facility_width_m:
-                        new_equipment.x_position = width/2
-                        new_equipment.y_position += new_equipment.get_equipment_size()[1] + 5
-                    
-                    break
-            
-            if not overlapping:
+            # Only units in the grid cells under the new bounds can overlap
+            if not self.spatial_index.query(new_equipment.bounds):
                 break
+            
+            # Move to the right by equipment width
+            width, height = new_equipment.get_equipment_size()
+            new_equipment.x_position += width + 5  # 5m gap
+            
+            # If moved out of bounds, try moving down
+            if new_equipment.x_position > self.facility_width_m:
+                new_equipment.x_position = width/2
+                new_equipment.y_position += height + 5
+            
             attempt += 1
         
         return new_equipment
     
     def _auto_snap(self, equipment: PlacedEquipment):
         """Auto-snap equipment to nearby equipment"""
-        for other in self.placed_equipment:
+        self._ensure_derived_in_sync()
+        nearby = self.spatial_index.within_distance(equipment.x_position, equipment.y_position, self.snap_distance)
+        for other in nearby:
             if other.equipment.id != equipment.equipment.id and equipment.can_snap_to(other, self.snap_distance):
                 # Determine best snap position
                 dx = equipment.x_position - other.x_position
@@ -265,59 +510,69 @@ class CanvasManager:
         
         return (width_rounded, height_rounded)
     
+    def get_fleet_metrics(self) -> FleetMetrics:
+        """Compute per-unit and aggregate metrics for all placed equipment in one vectorized pass"""
+        self._ensure_derived_in_sync()
+        return self.fleet.compute()
+    
+    def get_running_totals(self) -> RunningTotals:
+        """Facility totals and rollups maintained incrementally (no per-unit work on read)"""
+        self._ensure_derived_in_sync()
+        return self.totals
+    
     def calculate_total_co2_emissions(self) -> float:
         """Calculate total CO2 emissions for all equipment"""
-        total = 0.0
-        for placed in self.placed_equipment:
-            total += placed.equipment.calculate_co2_emission()
-        return total
+        return self.get_running_totals().total_co2_kg
+    
+    def get_facility_metrics(self, loader: Optional[Callable[[str], Optional[FacilityMetrics]]] = None) -> FacilityMetrics:
+        """Immutable metrics snapshot, rebuilt only when the equipment content hash changes.
+        
+        `loader` is offered the new content hash first and may return stored metrics for it.
+        """
+        equipment_list = [placed.equipment for placed in self.placed_equipment]
+        fingerprint = metrics_fingerprint(equipment_list)
+        if self._facility_metrics is None or self._facility_metrics.fingerprint != fingerprint:
+            stored = loader(fingerprint) if loader is not None else None
+            if stored is not None and stored.fingerprint == fingerprint:
+                self._facility_metrics = stored
+            else:
+                self._facility_metrics = FacilityMetrics.build(fingerprint, equipment_list, self.get_running_totals())
+        return self._facility_metrics
     
     def get_equipment_summary(self) -> Dict:
         """Get summary of all equipment and emissions"""
-        total_crude_processing_bbl_day = 0.0
-        
-        for placed in self.placed_equipment:
-            total_crude_processing_bbl_day += placed.equipment.calculate_crude_processing_capacity()
-        
-        # Calculate facilities efficiency using same method as builder page
-        total_co2_kg = self.calculate_total_co2_emissions()
-        
-        # Use 365.25 days per year (same as builder page)
-        total_crude_annual = total_crude_processing_bbl_day * 365.25
-        total_co2_annual = total_co2_kg * 365.25
-        crude_annual_tonnes = total_crude_annual * 0.136  # Convert bbl to tonnes
-        co2_annual_tonnes = total_co2_annual / 1000  # Convert kg to tonnes
-        
-        facilities_efficiency = co2_annual_tonnes / crude_annual_tonnes if crude_annual_tonnes > 0 else 0
-        
-        summary = {
-            "total_equipment": len(self.placed_equipment),
-            "total_co2_kg": total_co2_kg,
-            "total_crude_processing_bbl_day": total_crude_processing_bbl_day,
-            "total_crude_processing_tonnes_year": crude_annual_tonnes,
-            "facilities_efficiency": facilities_efficiency,
-            "by_category": {},
-            "by_fuel_type": {}
-        }
-        
-        for placed in self.placed_equipment:
-            equipment = placed.equipment
-            category = equipment.category
-            fuel_type = equipment.fuel_type
-            
-            # By category
-            if category not in summary["by_category"]:
-                summary["by_category"][category] = {"count": 0, "co2_kg": 0.0}
-            summary["by_category"][category]["count"] += 1
-            summary["by_category"][category]["co2_kg"] += equipment.calculate_co2_emission()
-            
-            # By fuel type
-            if fuel_type not in summary["by_fuel_type"]:
-                summary["by_fuel_type"][fuel_type] = {"count": 0, "co2_kg": 0.0}
-            summary["by_fuel_type"][fuel_type]["count"] += 1
-            summary["by_fuel_type"][fuel_type]["co2_kg"] += equipment.calculate_co2_emission()
-        
-        return summary
+        return self.get_facility_metrics().as_summary()
+    
+    def set_positions(self, placed_list: List[PlacedEquipment], xs: np.ndarray, ys: np.ndarray):
+        """Move many units at once, clamping all coordinates to the canvas in one vectorized step"""
+        bounds = self.get_canvas_bounds()
+        xs = np.clip(np.asarray(xs, dtype=float), 0, bounds[0])
+        ys = np.clip(np.asarray(ys, dtype=float), 0, bounds[1])
+        for placed, x, y in zip(placed_list, xs.tolist(), ys.tolist()):
+            placed.x_position = x
+            placed.y_position = y
+            if self._by_id.get(placed.equipment.id) is placed:
+                self.spatial_index.update(placed.equipment.id, placed, placed.bounds)
+                self._commit_unit(placed)
+    
+    def set_rotation(self, placed_equipment: PlacedEquipment, rotation: float):
+        """Rotate a placed unit (degrees)"""
+        placed_equipment.rotation = rotation
+        if self._by_id.get(placed_equipment.equipment.id) is placed_equipment:
+            self._commit_unit(placed_equipment)
+    
+    def set_connections(self, equipment_id: str, target_ids: List[str]) -> bool:
+        """Replace a unit's outgoing connections, keeping the given order"""
+        placed = self.get_equipment(equipment_id)
+        if placed is None:
+            return False
+        for target_id in placed.connections:
+            self._connected_from.get(target_id, set()).discard(equipment_id)
+        placed.connections = [target_id for target_id in target_ids if target_id in self._by_id]
+        for target_id in placed.connections:
+            self._connected_from.setdefault(target_id, set()).add(equipment_id)
+        self._commit_unit(placed)
+        return True
     
     def update_equipment_position(self, placed_equipment: PlacedEquipment, new_x: float, new_y: float):
         """Update equipment position with validation"""
@@ -331,6 +586,7 @@ class CanvasManager:
         placed_equipment.x_position = new_x
         placed_equipment.y_position = new_y
         
-        # Add to undo stack if not already recording
-        if self.placed_equipment and placed_equipment in self.placed_equipment:
-            self.add_to_undo_stack()
\ No newline at end of file
+        # Keep the spatial index current (history is recorded by the builder page)
+        if self._by_id.get(placed_equipment.equipment.id) is placed_equipment:
+            self.spatial_index.update(placed_equipment.equipment.id, placed_equipment, placed_equipment.bounds)
+            self._commit_unit(placed_equipment)
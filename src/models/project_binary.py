@@ -0,0 +1,341 @@
+"""
+Optional binary project format: typed equipment columns that can be memory-mapped
+"""
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fleet import EquipmentFleet
+from .project_store import (
+    PROJECTS_DIR, fsync_directory, journal_path, load_project_document, project_file, read_project_summary,
+    write_project
+)
+
+BINARY_SUFFIX = ".dpb"
+BINARY_MAGIC = b"DLPHBIN1"
+BINARY_FORMAT_VERSION = 1
+COLUMN_ALIGNMENT = 64
+
+# Equipment entry fields stored as columns: (column name, path inside the entry)
+NUMBER_FIELDS = (
+    ("x_position", ("x_position",)),
+    ("y_position", ("y_position",)),
+    ("rotation", ("rotation",)),
+    ("power_rate_kw", ("equipment", "power_rate_kw")),
+    ("operation_time_hours", ("equipment", "operation_time_hours")),
+    ("fuel_consumption_rate", ("equipment", "fuel_consumption_rate")),
+)
+STRING_FIELDS = (
+    ("id", ("equipment", "id")),
+    ("name", ("equipment", "name")),
+    ("category", ("equipment", "category")),
+    ("fuel_type", ("equipment", "fuel_type")),
+    ("description", ("equipment", "description")),
+    ("icon", ("equipment", "icon")),
+)
+# Key order the app writes entries in (EquipmentModel.to_dict for the equipment), restored on decode
+ENTRY_KEYS = ("equipment", "x_position", "y_position", "rotation", "connections")
+EQUIPMENT_KEYS = ("id", "name", "category", "power_rate_kw", "operation_time_hours", "fuel_type",
+                  "fuel_consumption_rate", "description", "icon")
+
+# A number column keeps exact JSON types with a tag per unit; values that fit neither go to the extras
+TAG_FLOAT, TAG_INT, TAG_ABSENT, TAG_OTHER = range(4)
+CODE_ABSENT, CODE_OTHER = -1, -2
+_EXACT_INT_LIMIT = 2 ** 53
+_MISSING = object()
+
+
+def binary_path(project_path: str) -> str:
+    """Binary copy kept next to a project file"""
+    return os.path.splitext(project_path)[0] + BINARY_SUFFIX
+
+
+def binary_file(project_name: str, directory: str = PROJECTS_DIR) -> str:
+    return binary_path(project_file(project_name, directory))
+
+
+def _get(entry: Dict, path: Tuple[str, ...]):
+    value = entry
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return _MISSING
+        value = value[key]
+    return value
+
+
+def _put(entry: Dict, path: Tuple[str, ...], value):
+    target = entry
+    for key in path[:-1]:
+        target = target.setdefault(key, {})
+    target[path[-1]] = value
+
+
+class _StringTable:
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+def encode_project(project_data: Dict) -> Tuple[Dict, Dict[str, np.ndarray]]:
+    """Split a project document into a JSON header and typed equipment columns"""
+    entries = project_data.get('equipment', [])
+    count = len(entries)
+    strings = _StringTable()
+    extras: Dict[str, Dict] = {}  # unit index -> values kept as JSON
+
+    def keep_extra(index: int, path: Tuple[str, ...], value):
+        _put(extras.setdefault(str(index), {}), path, value)
+
+    columns: Dict[str, np.ndarray] = {}
+    for column, path in NUMBER_FIELDS:
+        values = np.zeros(count, dtype='<f8')
+        tags = np.full(count, TAG_ABSENT, dtype=np.uint8)
+        for index, entry in enumerate(entries):
+            value = _get(entry, path)
+            if value is _MISSING:
+                continue
+            if isinstance(value, float):
+                values[index], tags[index] = value, TAG_FLOAT
+            elif isinstance(value, int) and not isinstance(value, bool) and abs(value) < _EXACT_INT_LIMIT:
+                values[index], tags[index] = value, TAG_INT
+            else:
+                tags[index] = TAG_OTHER
+                keep_extra(index, path, value)
+        columns[column] = values
+        columns[f"{column}.tag"] = tags
+
+    for column, path in STRING_FIELDS:
+        codes = np.full(count, CODE_ABSENT, dtype='<i4')
+        for index, entry in enumerate(entries):
+            value = _get(entry, path)
+            if value is _MISSING:
+                continue
+            if isinstance(value, str):
+                codes[index] = strings.encode(value)
+            else:
+                codes[index] = CODE_OTHER
+                keep_extra(index, path, value)
+        columns[column] = codes
+
+    # Connections as one flat code array with per-unit offsets (CSR)
+    present = np.zeros(count, dtype=np.uint8)
+    offsets = np.zeros(count + 1, dtype='<i8')
+    targets: List[int] = []
+    for index, entry in enumerate(entries):
+        value = entry.get('connections', _MISSING) if isinstance(entry, dict) else _MISSING
+        if isinstance(value, list) and all(isinstance(target, str) for target in value):
+            present[index] = 1
+            targets.extend(strings.encode(target) for target in value)
+        elif value is not _MISSING:
+            present[index] = 2
+            keep_extra(index, ('connections',), value)
+        offsets[index + 1] = len(targets)
+    columns["connections.present"] = present
+    columns["connections.offsets"] = offsets
+    columns["connections.targets"] = np.array(targets, dtype='<i4')
+
+    # Keys outside the columnar schema travel unchanged
+    for index, entry in enumerate(entries):
+        for key, value in entry.items():
+            if key not in ENTRY_KEYS:
+                keep_extra(index, (key,), value)
+        for key, value in entry.get('equipment', {}).items():
+            if key not in EQUIPMENT_KEYS:
+                keep_extra(index, ('equipment', key), value)
+
+    header = {
+        "format_version": BINARY_FORMAT_VERSION,
+        "document": {key: value for key, value in project_data.items() if key != 'equipment'},
+        "keys": list(project_data),
+        "unit_count": count,
+        "strings": strings.values,
+        "extras": extras
+    }
+    return header, columns
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // COLUMN_ALIGNMENT) * COLUMN_ALIGNMENT
+
+
+def write_binary_project(path: str, project_data: Dict):
+    """Atomically write a project in the binary format"""
+    header, columns = encode_project(project_data)
+    offset = 0
+    header["columns"] = {}
+    for name, values in columns.items():
+        header["columns"][name] = {"dtype": values.dtype.str, "offset": offset, "length": len(values)}
+        offset = _aligned(offset + values.nbytes)
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    data_start = _aligned(len(BINARY_MAGIC) + 8 + len(header_bytes))
+
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, 'wb') as f:
+            f.write(BINARY_MAGIC)
+            f.write(np.uint64(len(header_bytes)).astype('<u8').tobytes())
+            f.write(header_bytes)
+            for name, values in columns.items():
+                f.seek(data_start + header["columns"][name]["offset"])
+                f.write(values.tobytes())
+            f.truncate(data_start + offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    fsync_directory(os.path.dirname(path))
+
+
+class BinaryProject:
+    """A binary project opened for reading; equipment columns are memory-mapped on first use"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+                raise ValueError(f"{path} is not a binary project file")
+            header_length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+        if self.header.get("format_version") != BINARY_FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary project version in {path}")
+        self.data_start = _aligned(len(BINARY_MAGIC) + 8 + header_length)
+        self.strings: List[str] = self.header["strings"]
+        self._columns: Dict[str, np.ndarray] = {}
+
+    @property
+    def unit_count(self) -> int:
+        return self.header["unit_count"]
+
+    @property
+    def document(self) -> Dict:
+        """Project fields other than the equipment"""
+        return self.header["document"]
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only view of one column, backed by the file"""
+        array = self._columns.get(name)
+        if array is None:
+            spec = self.header["columns"][name]
+            if spec["length"] == 0:
+                array = np.zeros(0, dtype=spec["dtype"])
+            else:
+                array = np.memmap(self.path, dtype=spec["dtype"], mode='r',
+                                  offset=self.data_start + spec["offset"], shape=(spec["length"],))
+            self._columns[name] = array
+        return array
+
+    def labels(self, name: str) -> np.ndarray:
+        """String column decoded through the dictionary (absent or non-string values become None)"""
+        lookup = np.array(self.strings + [None, None], dtype=object)  # Codes -2 and -1 index the tail
+        return lookup[self.column(name)]
+
+    def fleet(self) -> EquipmentFleet:
+        """Vectorized fleet straight from the columns, without building an EquipmentModel per unit"""
+        return EquipmentFleet.from_columns(
+            ids=self.labels("id").tolist(),
+            strings=self.strings,
+            name_codes=self.column("name"),
+            category_codes=self.column("category"),
+            fuel_codes=self.column("fuel_type"),
+            power_rate_kw=self.column("power_rate_kw"),
+            operation_time_hours=self.column("operation_time_hours")
+        )
+
+    def exact_fleet(self) -> Optional[EquipmentFleet]:
+        """fleet(), if every unit has typed values in its columns (so it matches the fleet built from the models)"""
+        numbers_typed = all(np.isin(self.column(f"{column}.tag"), (TAG_FLOAT, TAG_INT)).all()
+                            for column in ("power_rate_kw", "operation_time_hours"))
+        strings_typed = all((self.column(column) >= 0).all() for column in ("id", "name", "category", "fuel_type"))
+        return self.fleet() if numbers_typed and strings_typed else None
+
+    def to_document(self) -> Dict:
+        """The project as the JSON document it was written from"""
+        if 'equipment' not in self.header["keys"]:
+            return dict(self.document)
+
+        count = self.unit_count
+        entries: List[Dict[str, Any]] = [{"equipment": {}} for _ in range(count)]
+        for column, path in NUMBER_FIELDS:
+            values, tags = self.column(column).tolist(), self.column(f"{column}.tag").tolist()
+            for index in range(count):
+                if tags[index] == TAG_FLOAT:
+                    _put(entries[index], path, values[index])
+                elif tags[index] == TAG_INT:
+                    _put(entries[index], path, int(values[index]))
+        for column, path in STRING_FIELDS:
+            codes = self.column(column).tolist()
+            for index in range(count):
+                if codes[index] >= 0:
+                    _put(entries[index], path, self.strings[codes[index]])
+
+        present = self.column("connections.present").tolist()
+        offsets = self.column("connections.offsets").tolist()
+        targets = self.column("connections.targets").tolist()
+        for index in range(count):
+            if present[index] == 1:
+                entries[index]["connections"] = [self.strings[code] for code in targets[offsets[index]:offsets[index + 1]]]
+
+        for index, values in self.header["extras"].items():
+            entry = entries[int(index)]
+            for key, value in values.items():
+                if key == "equipment":
+                    entry["equipment"].update(value)
+                else:
+                    entry[key] = value
+
+        # Schema keys in the usual order, then anything else
+        for entry in entries:
+            equipment = entry["equipment"]
+            entry["equipment"] = {**{key: equipment[key] for key in EQUIPMENT_KEYS if key in equipment}, **equipment}
+        fields = dict(self.document, equipment=[
+            {**{key: entry[key] for key in ENTRY_KEYS if key in entry}, **entry} for entry in entries
+        ])
+        return {key: fields[key] for key in self.header["keys"]}
+
+
+def json_to_binary(project_path: str, output_path: Optional[str] = None) -> str:
+    """Write the binary copy of a JSON project (journal included); returns its path"""
+    output_path = output_path or binary_path(project_path)
+    write_binary_project(output_path, load_project_document(project_path))
+    return output_path
+
+
+def current_binary_project(project_path: str) -> Optional[BinaryProject]:
+    """The project's binary copy, if one exists and holds what the JSON project (with its journal) holds now.
+
+    Any save after the export leaves the copy stale: the revision moves on and the
+    journal or project file gets newer. A stale or unreadable copy is ignored.
+    """
+    path = binary_path(project_path)
+    try:
+        binary_mtime = os.stat(path).st_mtime_ns
+        newest_json = max(os.stat(source).st_mtime_ns
+                          for source in (project_path, journal_path(project_path)) if os.path.exists(source))
+        if binary_mtime < newest_json:
+            return None
+        project = BinaryProject(path)
+    except (OSError, ValueError):
+        return None
+    summary = read_project_summary(project_path)
+    if not summary.is_valid or project.document.get('revision', 0) != summary.revision:
+        return None
+    return project
+
+
+def binary_to_json(path: str, output_path: str) -> str:
+    """Write a binary project back out as a header-first JSON project; returns its path"""
+    write_project(output_path, BinaryProject(path).to_document())
+    return output_path
@@ -0,0 +1,292 @@
+"""
+Append-only change journal per project, compacted into the project file atomically
+"""
+import copy
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .project_store import (
+    RevisionConflict, apply_journal, fsync_directory, journal_path, load_project_document, project_lock,
+    read_journal, unit_key, write_project
+)
+
+COMPACT_EVERY_RECORDS = 50
+COMPACT_MIN_BYTES = 64 * 1024  # Journals smaller than this are never compacted for size alone
+DERIVED_FIELDS = ("equipment_count", "revision")  # Maintained by the writer, never journaled as a change
+MERGE_SIDE_FIELDS = ("summary", "last_modified")  # Follow the layout; never reported as merge conflicts
+_MISSING = object()
+
+
+def _split_document(project_data: Dict) -> Tuple[Dict, Dict[str, Dict], List[str]]:
+    """(top-level fields, equipment entries by id, equipment order)"""
+    fields = {key: value for key, value in project_data.items()
+              if key != 'equipment' and key not in DERIVED_FIELDS}
+    units, order = {}, []
+    for entry in project_data.get('equipment', []):
+        units[unit_key(entry)] = entry
+        order.append(unit_key(entry))
+    return fields, units, order
+
+
+def diff_project(saved: Dict, current: Dict) -> Optional[Dict]:
+    """Journal record turning the saved document into the current one, or None if they match"""
+    saved_fields, saved_units, saved_order = _split_document(saved)
+    fields, units, order = _split_document(current)
+
+    record: Dict = {}
+    changed_fields = {key: value for key, value in fields.items()
+                      if key not in saved_fields or saved_fields[key] != value}
+    removed_fields = [key for key in saved_fields if key not in fields]
+    changed_units: Dict[str, Optional[Dict]] = {
+        equipment_id: entry for equipment_id, entry in units.items() if saved_units.get(equipment_id) != entry
+    }
+    changed_units.update({equipment_id: None for equipment_id in saved_units if equipment_id not in units})
+
+    if changed_fields:
+        record['set'] = changed_fields
+    if removed_fields:
+        record['unset'] = removed_fields
+    if changed_units:
+        record['units'] = changed_units
+    # Replay keeps survivors in place and appends new units; record the order only when that is not enough
+    replayed_order = [equipment_id for equipment_id in saved_order if equipment_id in units] + \
+        [equipment_id for equipment_id in order if equipment_id not in saved_units]
+    if order != replayed_order:
+        record['order'] = order
+    if not record:
+        return None
+
+    # Listing readers take the count from the journal until the next compaction
+    record.setdefault('set', {})['equipment_count'] = len(units)
+    return record
+
+
+def _merge_value(base, theirs, mine, path: str, conflicts: List[str]):
+    """Three-way merge of one value; dictionaries merge key by key, _MISSING means absent"""
+    if mine == base:
+        return theirs
+    if theirs == base or theirs == mine:
+        return mine
+    if isinstance(base, dict) and isinstance(theirs, dict) and isinstance(mine, dict):
+        merged = {}
+        for key in dict.fromkeys(list(mine) + list(theirs)):
+            value = _merge_value(base.get(key, _MISSING), theirs.get(key, _MISSING), mine.get(key, _MISSING),
+                                 f"{path}.{key}", conflicts)
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+    conflicts.append(path)
+    return mine
+
+
+def merge_projects(base: Dict, theirs: Dict, mine: Dict) -> Tuple[Dict, List[str]]:
+    """Combine our edits (base -> mine) with another writer's (base -> theirs).
+
+    Fields and equipment units (keyed by id) changed on one side only are taken
+    from that side; a unit changed on both sides merges field by field. Returns the
+    merged document and the paths both sides changed differently (empty on success).
+    """
+    conflicts: List[str] = []
+    base_fields, base_units, _ = _split_document(base)
+    their_fields, their_units, their_order = _split_document(theirs)
+    my_fields, my_units, my_order = _split_document(mine)
+
+    merged: Dict = {}
+    for key in dict.fromkeys(list(my_fields) + list(their_fields)):
+        if key in MERGE_SIDE_FIELDS:
+            continue
+        value = _merge_value(base_fields.get(key, _MISSING), their_fields.get(key, _MISSING),
+                             my_fields.get(key, _MISSING), key, conflicts)
+        if value is not _MISSING:
+            merged[key] = value
+
+    units: Dict[str, Dict] = {}
+    for equipment_id in dict.fromkeys(my_order + their_order):
+        # A unit deleted on one side and edited on the other is a conflict like any other value
+        entry = _merge_value(base_units.get(equipment_id, _MISSING), their_units.get(equipment_id, _MISSING),
+                             my_units.get(equipment_id, _MISSING), f"equipment {equipment_id}", conflicts)
+        if entry is not _MISSING:
+            units[equipment_id] = entry
+
+    # Our order, then units only they added, in their order
+    merged['equipment'] = [units[equipment_id] for equipment_id in my_order if equipment_id in units] + \
+        [units[equipment_id] for equipment_id in their_order if equipment_id in units and equipment_id not in my_units]
+
+    if 'last_modified' in mine or 'last_modified' in theirs:
+        merged['last_modified'] = max(mine.get('last_modified', ''), theirs.get('last_modified', ''))
+    # The saved summary describes one side's layout; keep it only if the merged layout is that layout
+    for side in (mine, theirs):
+        if 'summary' in side and merged['equipment'] == side.get('equipment', []):
+            merged['summary'] = side['summary']
+            break
+    return merged, conflicts
+
+
+class ProjectJournal:
+    """Saves a project as small fsynced delta records instead of rewriting the whole file.
+
+    Each save appends what changed since the last save. Every `compact_every`
+    records (or once the journal outgrows half the project file) the full document
+    is written to a temporary file and renamed over the project file, and the
+    journal starts over. A crash leaves either the old file or the new one, plus a
+    journal whose torn final line is ignored on load.
+
+    Every committed write bumps the document's `revision`. Writes hold the project's
+    file lock, so several processes can share a directory; a save made against an
+    older revision is three-way merged with what was written since, and raises
+    RevisionConflict when both sides changed the same thing.
+    """
+
+    def __init__(self, project_path: str, compact_every: int = COMPACT_EVERY_RECORDS):
+        self.project_path = project_path
+        self.journal_path = journal_path(project_path)
+        self.compact_every = compact_every
+        self.record_count = 0
+        self._saved: Optional[Dict] = None  # Document as last persisted
+        self._stamp: Optional[Tuple] = None  # File stamps right after our last write
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Tuple:
+        stamps = []
+        for path in (self.project_path, self.journal_path):
+            try:
+                stat = os.stat(path)
+                stamps.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _sync_from_disk(self):
+        """Reload the persisted document if it changed since our last write (or was never read)"""
+        if self._saved is not None and self._file_stamp() == self._stamp:
+            return
+        if os.path.exists(self.project_path):
+            self._saved = load_project_document(self.project_path)
+            self.record_count = len(read_journal(self.journal_path))
+        else:
+            self._saved = None
+            self.record_count = 0
+        self._stamp = self._file_stamp()
+
+    def load(self) -> Dict:
+        """Current project document (project file plus journal)"""
+        with self._lock, project_lock(self.project_path):
+            self._sync_from_disk()
+            if self._saved is None:
+                raise FileNotFoundError(self.project_path)
+            return copy.deepcopy(self._saved)
+
+    @property
+    def revision(self) -> int:
+        """Revision of the document as last read or written"""
+        return self._saved.get('revision', 0) if self._saved is not None else 0
+
+    def save(self, project_data: Dict, base: Optional[Dict] = None) -> Dict:
+        """Persist the document and return what is now on disk; only the changes are written.
+
+        `base` is the document the edits started from (as returned by the previous
+        save or load). When the project has moved past its revision, the edits are
+        merged into the newer document, which is returned instead of `project_data`.
+        Otherwise `project_data` is returned with its `revision` updated in place.
+        """
+        with self._lock, project_lock(self.project_path):
+            self._sync_from_disk()
+            if self._saved is None:
+                project_data['revision'] = 1
+                self._compact(project_data)
+                return project_data
+
+            revision = self.revision
+            if base is not None and base.get('revision', 0) != revision:
+                project_data, conflicts = merge_projects(base, self._saved, project_data)
+                if conflicts:
+                    raise RevisionConflict(self.project_path, revision, conflicts)
+            project_data['revision'] = revision
+            record = diff_project(self._saved, project_data)
+            if record is None:
+                return project_data
+            project_data['revision'] = record['set']['revision'] = revision + 1
+            self._append(record)
+            if self._should_compact():
+                self._compact(project_data)
+            else:
+                self._stamp = self._file_stamp()
+            return project_data
+
+    def update_fields(self, fields: Dict, base: Optional[Dict] = None) -> Optional[int]:
+        """Persist top-level fields without touching the rest of the saved document; returns the new revision.
+
+        With `base`, fields another writer changed since the base revision are not overwritten.
+        """
+        with self._lock, project_lock(self.project_path):
+            self._sync_from_disk()
+            if self._saved is None:
+                return None
+            revision = self.revision
+            if base is not None and base.get('revision', 0) != revision:
+                conflicts = [key for key, value in fields.items()
+                             if key not in MERGE_SIDE_FIELDS and
+                             self._saved.get(key) != base.get(key) and self._saved.get(key) != value]
+                if conflicts:
+                    raise RevisionConflict(self.project_path, revision, conflicts)
+            self._append({'set': dict(fields, revision=revision + 1)})
+            self._stamp = self._file_stamp()
+            return revision + 1
+
+    def compact(self):
+        """Fold the journal into the project file now"""
+        with self._lock, project_lock(self.project_path):
+            self._sync_from_disk()
+            if self._saved is not None:
+                self._compact(self._saved)
+
+    def _append(self, record: Dict):
+        """Write one record durably, then apply it to the saved copy"""
+        line = json.dumps(record, separators=(',', ':'))
+        created = not os.path.exists(self.journal_path)
+        with open(self.journal_path, 'a') as f:
+            f.write(line + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            fsync_directory(os.path.dirname(self.journal_path))
+        self.record_count += 1
+        # Decoded from the line so the saved copy never aliases the caller's objects
+        apply_journal(self._saved, [json.loads(line)])
+
+    def _should_compact(self) -> bool:
+        if self.record_count >= self.compact_every:
+            return True
+        try:
+            journal_bytes = os.path.getsize(self.journal_path)
+            project_bytes = os.path.getsize(self.project_path)
+        except OSError:
+            return False
+        return journal_bytes > max(COMPACT_MIN_BYTES, project_bytes // 2)
+
+    def _compact(self, project_data: Dict):
+        # The project file is replaced first; if we stop before the journal is removed,
+        # its records are at or below the new file's revision and skipped on replay
+        write_project(self.project_path, project_data)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+            fsync_directory(os.path.dirname(self.journal_path))
+        self.record_count = 0
+        self._saved = copy.deepcopy(project_data)
+        self._stamp = self._file_stamp()
+
+
+_journals: Dict[str, ProjectJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_project_journal(project_path: str) -> ProjectJournal:
+    """Process-wide journal for a project file"""
+    with _journals_lock:
+        journal = _journals.get(project_path)
+        if journal is None:
+            journal = _journals[project_path] = ProjectJournal(project_path)
+        return journal
+
@@ -0,0 +1,634 @@
+"""
+Project files on disk with an mtime-invalidated metadata index for fast listing
+"""
+import copy
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: project locks then only exclude threads of this process
+    fcntl = None
+
+PROJECTS_DIR = "projects"
+INDEX_FILENAME = ".index.json"  # Manifest of project metadata, kept next to the project files
+INDEX_FORMAT_VERSION = 3
+RESULTS_SUFFIX = "_results.json"  # Derived metrics stamped with the layout hash they were computed for
+SIDECAR_SUFFIXES = ("_report.json", "_history.json", RESULTS_SUFFIX)  # Files stored alongside projects that are not projects
+JOURNAL_SUFFIX = ".journal"  # Append-only changes not yet compacted into the project file
+LOCK_SUFFIX = ".lock"  # Held while one writer reads, checks and changes a project
+
+# Header-first layout: these keys are written before everything else and "equipment" is written last,
+# so a reader can stop before the equipment array. equipment_count closes the header.
+HEADER_FIELDS = ("name", "description", "facility_size_acres", "facility_size_meters", "created_date",
+                 "last_modified", "revision", "equipment_count")
+PAYLOAD_FIELDS = ("equipment",)
+# Summary fields projects can be listed by, with the value type each sorts as
+SORT_FIELDS = {"name": str, "description": str, "created_date": str, "last_modified": str,
+               "facility_size_acres": float, "equipment_count": int, "revision": int}
+HEADER_READ_CHUNK = 64 * 1024
+
+
+def project_slug(project_name: str) -> str:
+    """File stem used for a project and its sidecars"""
+    return project_name.replace(' ', '_').lower()
+
+
+def project_file(project_name: str, directory: str = PROJECTS_DIR) -> str:
+    return os.path.join(directory, f"{project_slug(project_name)}.json")
+
+
+def history_file(project_name: str, directory: str = PROJECTS_DIR) -> str:
+    """Undo history sidecar stored next to the project file"""
+    return os.path.join(directory, f"{project_slug(project_name)}_history.json")
+
+
+def results_path(project_path: str) -> str:
+    """Results sidecar kept next to a project file"""
+    return os.path.splitext(project_path)[0] + RESULTS_SUFFIX
+
+
+def results_file(project_name: str, directory: str = PROJECTS_DIR) -> str:
+    return results_path(project_file(project_name, directory))
+
+
+def journal_path(project_path: str) -> str:
+    """Change journal kept next to a project file"""
+    return os.path.splitext(project_path)[0] + JOURNAL_SUFFIX
+
+
+def journal_file(project_name: str, directory: str = PROJECTS_DIR) -> str:
+    return journal_path(project_file(project_name, directory))
+
+
+def lock_path(project_path: str) -> str:
+    return os.path.splitext(project_path)[0] + LOCK_SUFFIX
+
+
+def is_project_filename(filename: str) -> bool:
+    return (filename.endswith('.json') and not filename.startswith('.') and
+            not filename.endswith(SIDECAR_SUFFIXES))
+
+
+@dataclass
+class ProjectSummary:
+    """What the project list shows, plus the file stamp it was read from"""
+    filename: str
+    name: str
+    description: str = ""
+    facility_size_acres: Optional[float] = None
+    created_date: str = ""
+    last_modified: str = ""
+    equipment_count: int = 0
+    revision: int = 0
+    mtime_ns: int = 0
+    size: int = 0
+    journal_mtime_ns: int = 0
+    journal_size: int = 0
+    error: str = ""  # Set when the file could not be read as a project
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.error
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProjectSummary':
+        return cls(**data)
+
+
+def summarize_project(project_data: Dict, filename: str) -> ProjectSummary:
+    """Listing metadata for a parsed project document"""
+    return ProjectSummary(
+        filename=filename,
+        name=project_data['name'],
+        description=project_data.get('description', ''),
+        facility_size_acres=project_data.get('facility_size_acres'),
+        created_date=project_data.get('created_date', ''),
+        last_modified=project_data.get('last_modified', ''),
+        equipment_count=project_data.get('equipment_count', len(project_data.get('equipment', []))),
+        revision=project_data.get('revision', 0)
+    )
+
+
+def header_first(project_data: Dict) -> Dict:
+    """Copy of a project document ordered header, other sections, then the equipment payload"""
+    ordered = {key: project_data[key] for key in HEADER_FIELDS if key in project_data}
+    ordered['equipment_count'] = len(project_data.get('equipment', []))
+    for key, value in project_data.items():
+        if key not in ordered and key not in PAYLOAD_FIELDS:
+            ordered[key] = value
+    for key in PAYLOAD_FIELDS:
+        if key in project_data:
+            ordered[key] = project_data[key]
+    return ordered
+
+
+def fsync_directory(directory: str):
+    """Make a rename or newly created file in a directory durable"""
+    try:
+        fd = os.open(directory or ".", os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = None):
+    """Write to a temporary file, fsync it and rename it over the target in one step"""
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temporary_path, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+    fsync_directory(os.path.dirname(path))
+
+
+def write_project(path: str, project_data: Dict):
+    """Atomically write a full project document in the header-first layout"""
+    atomic_write_json(path, header_first(project_data), indent=2)
+
+
+class RevisionConflict(Exception):
+    """A project changed on disk since the caller read it, and the changes could not be combined"""
+
+    def __init__(self, path: str, revision: int, conflicts: Optional[List[str]] = None):
+        self.path = path
+        self.revision = revision
+        self.conflicts = conflicts or []
+        detail = f": conflicting edits to {', '.join(self.conflicts[:5])}" if self.conflicts else ""
+        if len(self.conflicts) > 5:
+            detail += f" and {len(self.conflicts) - 5} more"
+        super().__init__(f"{os.path.basename(path)} was changed by another session (revision {revision}){detail}")
+
+
+_process_locks: Dict[str, threading.Lock] = {}
+_process_locks_lock = threading.Lock()
+
+
+@contextmanager
+def project_lock(project_path: str) -> Iterator[None]:
+    """Exclusive lock on one project for a read-modify-write; other projects are not blocked.
+
+    An advisory lock file next to the project excludes other processes; lock files
+    are left in place, since removing one could let two writers hold "the" lock.
+    """
+    key = os.path.abspath(project_path)
+    with _process_locks_lock:
+        thread_lock = _process_locks.setdefault(key, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        with open(lock_path(key), 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def revision_base(project_data: Dict) -> Dict:
+    """Copy of a saved document to merge later edits against.
+
+    Top-level fields are copied; equipment entries are shared, since saves replace
+    entries rather than edit them in place.
+    """
+    base = {key: copy.deepcopy(value) for key, value in project_data.items() if key != 'equipment'}
+    if 'equipment' in project_data:
+        base['equipment'] = list(project_data['equipment'])
+    return base
+
+
+def unit_key(entry: Dict) -> str:
+    """Equipment id of a saved equipment entry"""
+    return entry['equipment']['id']
+
+
+def read_journal(path: str) -> List[Dict]:
+    """Records in a project journal, stopping at a torn final append"""
+    records = []
+    try:
+        f = open(path, 'r')
+    except FileNotFoundError:
+        return records
+    with f:
+        for line in f:
+            if not line.endswith('\n'):
+                break  # The process stopped mid-append; that record never committed
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+def is_stale_record(record: Dict, file_revision: int) -> bool:
+    """True for a record already folded into a project file at `file_revision`.
+
+    A compaction renames the new project file into place before removing the
+    journal, so a crash (or a reader) between the two sees records the file
+    already contains. Replaying them is not safe: an `order` record would drop
+    units added after it. Records written before revisions existed carry none and are kept.
+    """
+    revision = record.get('set', {}).get('revision')
+    return revision is not None and revision <= file_revision
+
+
+def apply_journal(project_data: Dict, records: List[Dict]) -> Dict:
+    """Replay journal records onto a project document (in place), skipping those it already contains"""
+    file_revision = project_data.get('revision', 0)
+    units: Optional[Dict[str, Dict]] = None
+    order: List[str] = []
+    for record in records:
+        if is_stale_record(record, file_revision):
+            continue
+        project_data.update(record.get('set', {}))
+        for key in record.get('unset', []):
+            project_data.pop(key, None)
+        if 'units' not in record and 'order' not in record:
+            continue
+        if units is None:
+            units = {}
+            for entry in project_data.get('equipment', []):
+                units[unit_key(entry)] = entry
+                order.append(unit_key(entry))
+        for equipment_id, entry in record.get('units', {}).items():
+            if entry is None:
+                units.pop(equipment_id, None)
+                continue
+            if equipment_id not in units:
+                order.append(equipment_id)
+            units[equipment_id] = entry
+        if 'order' in record:
+            order = list(record['order'])
+    if units is not None:
+        project_data['equipment'] = [units[equipment_id] for equipment_id in dict.fromkeys(order)
+                                     if equipment_id in units]
+    return project_data
+
+
+def load_project_document(path: str) -> Dict:
+    """A project's current document: the project file with its journal replayed"""
+    with open(path, 'r') as f:
+        project_data = json.load(f)
+    return apply_journal(project_data, read_journal(journal_path(path)))
+
+
+def create_project(path: str, project_data: Dict) -> Dict:
+    """Write a new project at revision 1; raises FileExistsError if another writer created it first"""
+    with project_lock(path):
+        if os.path.exists(path):
+            raise FileExistsError(path)
+        project_data = dict(project_data, revision=1)
+        write_project(path, project_data)
+        return project_data
+
+
+def delete_project_files(path: str, expected_revision: Optional[int] = None, sidecars: Tuple[str, ...] = ()) -> bool:
+    """Delete a project, its journal and sidecars; refuses (RevisionConflict) if it changed since `expected_revision`"""
+    with project_lock(path):
+        if not os.path.exists(path):
+            return False
+        if expected_revision is not None:
+            revision = read_project_summary(path).revision
+            if revision != expected_revision:
+                raise RevisionConflict(path, revision)
+        os.remove(path)
+        for sidecar in (journal_path(path),) + tuple(sidecars):
+            if os.path.exists(sidecar):
+                os.remove(sidecar)
+        fsync_directory(os.path.dirname(path))
+        return True
+
+
+_STRUCTURAL_CODES = np.zeros(128, dtype=bool)  # Quote, backslash, brackets, braces and comma
+_STRUCTURAL_CODES[[ord(char) for char in '"\\[]{},']] = True
+_NON_SPACE = re.compile(r'\S')
+_VALUE_TERMINATORS = ' \t\r\n,:]}'
+
+
+class _HeaderReader:
+    """Walks the top-level object of a JSON file chunk by chunk"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(HEADER_READ_CHUNK)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk  # Drop what has been consumed
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ("" at end of file), without consuming it"""
+        while True:
+            match = _NON_SPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' in project header")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete value (scalars and small sections)"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number cut off by the chunk boundary ("201" of "201.17") must continue in the next chunk
+            if (end < len(self.buffer) and self.buffer[end] in _VALUE_TERMINATORS) or not self._fill():
+                self.pos = end
+                return value
+
+    def skip(self) -> int:
+        """Step over one value without building it; returns the element count of an array.
+
+        Arrays and objects are scanned a chunk at a time with NumPy over the structural
+        characters only: quote parity marks what is inside strings, and a running
+        bracket depth finds where the value ends.
+        """
+        opening = self.peek()
+        if opening not in '[{':
+            self.value()
+            return 0
+        self.pos += 1
+        count = 0
+        if opening == '[' and self.peek() != ']':
+            count = 1
+        depth, in_string, escape_next = 1, False, False
+        while True:
+            codes = np.frombuffer(self.buffer[self.pos:].encode('utf-32-le'), dtype=np.uint32)
+            positions = np.flatnonzero(_STRUCTURAL_CODES[np.minimum(codes, 127)])
+            chars = codes[positions]
+
+            # Escapes only occur inside strings and are rare; resolve them in order
+            escaped = np.zeros(len(positions), dtype=bool)
+            if escape_next and len(positions) and positions[0] == 0:
+                escaped[0] = True
+            escape_next = False
+            for index in np.flatnonzero(chars == 92).tolist():
+                if escaped[index]:
+                    continue
+                following = positions[index] + 1
+                if following == len(codes):
+                    escape_next = True
+                elif index + 1 < len(positions) and positions[index + 1] == following:
+                    escaped[index + 1] = True
+
+            quotes = (chars == 34) & ~escaped
+            inside = (np.cumsum(quotes) % 2 == 1) != in_string
+            outside = ~inside & ~quotes
+            steps = (((chars == 91) | (chars == 123)) & outside).astype(np.int64) - \
+                (((chars == 93) | (chars == 125)) & outside)
+            depths = depth + np.cumsum(steps)
+
+            closed = np.flatnonzero(depths == 0)
+            stop = int(closed[0]) + 1 if len(closed) else len(positions)
+            if opening == '[':
+                count += int(np.count_nonzero((chars[:stop] == 44) & outside[:stop] & (depths[:stop] == 1)))
+            if len(closed):
+                self.pos += int(positions[closed[0]]) + 1
+                return count
+            if len(positions):
+                depth = int(depths[-1])
+                in_string = in_string != (np.count_nonzero(quotes) % 2 == 1)
+            self.pos = len(self.buffer)
+            if not self._fill():
+                raise ValueError("Unexpected end of project file")
+
+
+def read_project_header(path: str) -> Tuple[Dict, int]:
+    """Header fields of a project file and its equipment count, without building the equipment list.
+
+    Header-first files stop reading at the equipment array. Older files, whose header
+    keys may follow the equipment, have the array scanned over (and counted) instead.
+    """
+    header: Dict = {}
+    equipment_count = 0
+    with open(path, 'r') as f:
+        reader = _HeaderReader(f)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return header, 0
+        while True:
+            key = reader.value()
+            if not isinstance(key, str):
+                raise ValueError("Project file keys must be strings")
+            reader.expect(':')
+            if key in PAYLOAD_FIELDS:
+                if 'equipment_count' in header:
+                    break  # Header-first layout: everything needed came before the payload
+                count = reader.skip()
+                if key == 'equipment':
+                    equipment_count = count
+            elif key in HEADER_FIELDS:
+                header[key] = reader.value()
+            else:
+                reader.skip()
+            separator = reader.peek()
+            reader.pos += 1
+            if separator == '}':
+                break
+            if separator != ',':
+                raise ValueError("Malformed project file")
+    return header, header.get('equipment_count', equipment_count)
+
+
+def read_project_summary(path: str) -> ProjectSummary:
+    """Read one project file's listing metadata from its header"""
+    filename = os.path.basename(path)
+    try:
+        project_data, equipment_count = read_project_header(path)
+    except Exception as e:
+        return ProjectSummary(filename=filename, name="", error=f"Error loading project {filename}: {e}")
+    if not isinstance(project_data, dict) or 'name' not in project_data:
+        return ProjectSummary(filename=filename, name="", error=f"Skipping invalid project file: {filename}")
+    project_data.setdefault('equipment_count', equipment_count)
+    # Header fields changed by saves that have not been compacted yet
+    file_revision = project_data.get('revision', 0)
+    for record in read_journal(journal_path(path)):
+        if is_stale_record(record, file_revision):
+            continue
+        project_data.update({key: value for key, value in record.get('set', {}).items() if key in HEADER_FIELDS})
+    return summarize_project(project_data, filename)
+
+
+class ProjectIndex:
+    """Metadata for every project in a directory, answered without parsing project payloads.
+
+    refresh() costs one directory scan of stat calls; only projects whose file or
+    journal changed (mtime or size) since the manifest was written are read again. The manifest is written
+    back atomically, so other workers and later processes start warm.
+    """
+
+    def __init__(self, directory: str = PROJECTS_DIR):
+        self.directory = directory
+        self.summaries: Dict[str, ProjectSummary] = {}  # filename -> summary
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, INDEX_FILENAME)
+
+    def _load_manifest(self):
+        self._loaded = True
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("format_version") != INDEX_FORMAT_VERSION:
+            return
+        self.summaries = {entry['filename']: ProjectSummary.from_dict(entry) for entry in data.get("projects", [])}
+
+    def _write_manifest(self):
+        data = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "projects": [summary.to_dict() for summary in self.summaries.values()]
+        }
+        temporary_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temporary_path, self.index_path)
+        except OSError:
+            # The index is only a cache; listing still works from memory
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def refresh(self) -> bool:
+        """Re-read changed project files; returns True if the index changed"""
+        with self._lock:
+            if not self._loaded:
+                self._load_manifest()
+            if not os.path.isdir(self.directory):
+                changed = bool(self.summaries)
+                self.summaries = {}
+                return changed
+
+            project_stats, journal_stats = {}, {}
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(JOURNAL_SUFFIX):
+                        journal_stats[entry.name] = entry.stat()
+                    elif is_project_filename(entry.name) and entry.is_file():
+                        project_stats[entry.name] = (entry.path, entry.stat())
+
+            seen = set()
+            changed = False
+            for filename, (path, stat) in project_stats.items():
+                seen.add(filename)
+                journal_stat = journal_stats.get(os.path.basename(journal_path(filename)))
+                stamp = (stat.st_mtime_ns, stat.st_size,
+                         journal_stat.st_mtime_ns if journal_stat else 0, journal_stat.st_size if journal_stat else 0)
+                summary = self.summaries.get(filename)
+                if summary is not None and (summary.mtime_ns, summary.size,
+                                            summary.journal_mtime_ns, summary.journal_size) == stamp:
+                    continue
+                summary = read_project_summary(path)
+                summary.mtime_ns, summary.size, summary.journal_mtime_ns, summary.journal_size = stamp
+                self.summaries[filename] = summary
+                changed = True
+
+            for filename in [filename for filename in self.summaries if filename not in seen]:
+                del self.summaries[filename]
+                changed = True
+
+            if changed:
+                self._write_manifest()
+            return changed
+
+    def invalid_files(self) -> List[ProjectSummary]:
+        return [summary for summary in self.summaries.values() if not summary.is_valid]
+
+    def list_projects(self, search: str = "", sort_by: str = "last_modified",
+                      reverse: bool = True) -> List[ProjectSummary]:
+        """Valid projects matching a name/description search, sorted by a SORT_FIELDS field.
+
+        Projects without a usable value for the field (missing, or of another type in
+        a hand-edited file) come last in either direction.
+        """
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort projects by {sort_by!r}")
+        search = search.lower()
+        projects = [
+            summary for summary in self.summaries.values()
+            if summary.is_valid and (not search or search in summary.name.lower() or
+                                     search in (summary.description or "").lower())
+        ]
+        value_types = (int, float) if SORT_FIELDS[sort_by] in (int, float) else SORT_FIELDS[sort_by]
+
+        def sortable(summary: ProjectSummary) -> bool:
+            value = getattr(summary, sort_by)
+            return isinstance(value, value_types) and not isinstance(value, bool)
+
+        ranked = sorted((summary for summary in projects if sortable(summary)),
+                        key=lambda summary: getattr(summary, sort_by), reverse=reverse)
+        return ranked + [summary for summary in projects if not sortable(summary)]
+
+    def find(self, project_name: str) -> Optional[ProjectSummary]:
+        """Summary of a project by (case-insensitive) name"""
+        project_name = project_name.lower()
+        for summary in self.summaries.values():
+            if summary.is_valid and summary.name.lower() == project_name:
+                return summary
+        return None
+
+    def load_project(self, summary: ProjectSummary) -> Dict:
+        """Full project document for a listed project"""
+        return load_project_document(os.path.join(self.directory, summary.filename))
+
+
+_indexes: Dict[str, ProjectIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_project_index(directory: str = PROJECTS_DIR) -> ProjectIndex:
+    """Process-wide index for a projects directory, refreshed before it is returned"""
+    with _indexes_lock:
+        index = _indexes.get(directory)
+        if index is None:
+            index = _indexes[directory] = ProjectIndex(directory)
+    index.refresh()
+    return index
@@ -0,0 +1,86 @@
+"""
+Per-project results sidecar: derived facility metrics stamped with the layout hash and engine version
+"""
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .facility_metrics import RESULTS_ENGINE_VERSION, FacilityMetrics
+from .placed_equipment import CanvasManager
+from .project_store import atomic_write_json
+
+RESULTS_FORMAT_VERSION = 1
+
+# path -> (content hash, file mtime) of the sidecar this process last wrote or read, so an
+# up-to-date sidecar is neither re-read nor rewritten
+_known_results: Dict[str, Tuple[str, int]] = {}
+_known_results_lock = threading.Lock()
+
+
+def _remember(path: str, fingerprint: str):
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return
+    with _known_results_lock:
+        _known_results[path] = (fingerprint, mtime_ns)
+
+
+def _is_current(path: str, fingerprint: str) -> bool:
+    with _known_results_lock:
+        known = _known_results.get(path)
+    if known is None or known[0] != fingerprint:
+        return False
+    try:
+        return os.stat(path).st_mtime_ns == known[1]
+    except OSError:
+        return False
+
+
+def save_results(path: str, metrics: FacilityMetrics, unit_ids: List[str]):
+    """Write the results sidecar for one layout version (unit_ids in placement order)"""
+    data = {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "engine_version": RESULTS_ENGINE_VERSION,
+        "fingerprint": metrics.fingerprint,
+        "unit_ids": unit_ids,
+        "metrics": metrics.to_dict(),
+        # Annual intensities, for readers that do not rebuild FacilityMetrics
+        "intensities": {
+            "co2_tonnes_year": metrics.co2_tonnes_year,
+            "crude_tonnes_year": metrics.crude_tonnes_year,
+            "co2_per_crude_tonne": metrics.co2_per_crude_tonne,
+            "generation_kwh_year": metrics.generation_kwh_year,
+            "co2_per_kwh": metrics.co2_per_kwh
+        }
+    }
+    atomic_write_json(path, data)
+    _remember(path, metrics.fingerprint)
+
+
+def load_results(path: str, fingerprint: str) -> Optional[FacilityMetrics]:
+    """Stored metrics, if the sidecar was written for this layout hash by this engine version"""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (data.get("format_version") != RESULTS_FORMAT_VERSION or
+            data.get("engine_version") != RESULTS_ENGINE_VERSION or data.get("fingerprint") != fingerprint):
+        return None
+    try:
+        metrics = FacilityMetrics.from_dict(data["metrics"])
+    except (KeyError, TypeError):
+        return None
+    _remember(path, fingerprint)
+    return metrics
+
+
+def facility_results(canvas_manager: CanvasManager, path: str) -> FacilityMetrics:
+    """Metrics for the store's layout: kept in memory, else read from the sidecar when its stamps
+    match, else computed and written back to it"""
+    metrics = canvas_manager.get_facility_metrics(loader=lambda fingerprint: load_results(path, fingerprint))
+    if not _is_current(path, metrics.fingerprint):
+        save_results(path, metrics, [placed.equipment.id for placed in canvas_manager.placed_equipment])
+    return metrics
@@ -0,0 +1,125 @@
+"""
+Incrementally maintained facility totals and category/fuel rollups
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .equipment_model import EquipmentModel
+from .fleet import FleetMetrics
+
+
+@dataclass(frozen=True)
+class UnitMetrics:
+    """Daily metrics contributed by a single placed unit"""
+    name: str
+    category: str
+    fuel_type: str
+    fuel_consumption: float
+    co2_kg: float
+    power_kw: float
+    crude_bbl_day: float
+    generation_kwh_year: float  # power_kw x annual operating hours
+    has_combustion: bool
+
+    @classmethod
+    def from_equipment(cls, equipment: EquipmentModel) -> 'UnitMetrics':
+        fuel = equipment.calculate_fuel_consumption()
+        power = equipment.calculate_power_production()
+        return cls(
+            name=equipment.name,
+            category=equipment.category,
+            fuel_type=equipment.fuel_type,
+            fuel_consumption=fuel,
+            co2_kg=fuel * equipment.coefficients.co2_factor,
+            power_kw=power,
+            crude_bbl_day=equipment.calculate_crude_processing_capacity(),
+            generation_kwh_year=power * equipment.operation_time_hours,
+            has_combustion=equipment.has_combustion
+        )
+
+
+class RunningTotals:
+    """Facility totals updated in O(1) per add, remove or reconfiguration"""
+
+    def __init__(self):
+        self.units: Dict[str, UnitMetrics] = {}
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.total_fuel_consumption = 0.0
+        self.total_co2_kg = 0.0
+        self.total_power_kw = 0.0
+        self.total_crude_bbl_day = 0.0
+        self.total_generation_kwh_year = 0.0
+        self.combustion_count = 0
+        self.by_category: Dict[str, Dict] = {}
+        self.by_fuel_type: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.units)
+
+    def unit(self, equipment_id: str) -> Optional[UnitMetrics]:
+        """Metrics last recorded for a unit"""
+        return self.units.get(equipment_id)
+
+    def _apply(self, metrics: UnitMetrics, sign: int):
+        self.total_fuel_consumption += sign * metrics.fuel_consumption
+        self.total_co2_kg += sign * metrics.co2_kg
+        self.total_power_kw += sign * metrics.power_kw
+        self.total_crude_bbl_day += sign * metrics.crude_bbl_day
+        self.total_generation_kwh_year += sign * metrics.generation_kwh_year
+        self.combustion_count += sign * int(metrics.has_combustion)
+
+        for rollup, key in ((self.by_category, metrics.category), (self.by_fuel_type, metrics.fuel_type)):
+            entry = rollup.setdefault(key, {"count": 0, "co2_kg": 0.0})
+            entry["count"] += sign
+            entry["co2_kg"] += sign * metrics.co2_kg
+            if entry["count"] == 0:
+                del rollup[key]
+
+        # Snap accumulated rounding error back to exact zero once the facility is empty
+        if not self.units:
+            self._reset_totals()
+
+    def add(self, equipment: EquipmentModel, metrics: Optional[UnitMetrics] = None):
+        """Add a unit's contribution (replaces any previous contribution for the same id)"""
+        if equipment.id in self.units:
+            self.remove(equipment.id)
+        metrics = metrics or UnitMetrics.from_equipment(equipment)
+        self.units[equipment.id] = metrics
+        self._apply(metrics, 1)
+
+    def remove(self, equipment_id: str) -> bool:
+        """Subtract a unit's recorded contribution"""
+        metrics = self.units.pop(equipment_id, None)
+        if metrics is None:
+            return False
+        self._apply(metrics, -1)
+        return True
+
+    def update(self, equipment: EquipmentModel):
+        """Re-record a unit after its configuration changed"""
+        self.add(equipment)
+
+    def clear(self):
+        self.units = {}
+        self._reset_totals()
+
+    def rebuild(self, equipment_list: List[EquipmentModel], fleet_metrics: FleetMetrics):
+        """Recompute all contributions from one vectorized fleet pass"""
+        self.clear()
+        rows = fleet_metrics.row_index()
+        for equipment in equipment_list:
+            row = rows[equipment.id]
+            power = float(fleet_metrics.power_kw[row])
+            self.add(equipment, UnitMetrics(
+                name=equipment.name,
+                category=equipment.category,
+                fuel_type=equipment.fuel_type,
+                fuel_consumption=float(fleet_metrics.fuel_consumption[row]),
+                co2_kg=float(fleet_metrics.co2_kg[row]),
+                power_kw=power,
+                crude_bbl_day=float(fleet_metrics.crude_bbl_day[row]),
+                generation_kwh_year=power * equipment.operation_time_hours,
+                has_combustion=equipment.has_combustion
+            ))
@@ -0,0 +1,38 @@
+"""
+Helpers for emitting many line segments as a single Plotly trace
+"""
+from typing import List, Optional, Sequence, Tuple
+
+Point = Tuple[float, ...]
+
+
+def polyline_coordinates(segments: Sequence[Sequence[Point]]) -> Tuple[List, ...]:
+    """Flatten polylines into per-axis coordinate lists separated by None gaps.
+
+    Plotly breaks a line trace at None, so any number of disjoint polylines can be
+    drawn by one trace. Returns one list per coordinate axis of the input points.
+    """
+    if not segments:
+        return ([], [])
+    dimensions = len(segments[0][0])
+    axes: Tuple[List, ...] = tuple([] for _ in range(dimensions))
+    for index, segment in enumerate(segments):
+        if index:
+            for axis in axes:
+                axis.append(None)
+        for point in segment:
+            for axis, value in zip(axes, point):
+                axis.append(value)
+    return axes
+
+
+def grid_line_segments(width: float, height: float, spacing: float,
+                       z: Optional[float] = None) -> List[List[Point]]:
+    """Vertical then horizontal grid lines covering [0, width] x [0, height]"""
+    step = int(spacing)
+    segments: List[List[Point]] = []
+    for x in range(0, int(width) + 1, step):
+        segments.append([(x, 0), (x, height)] if z is None else [(x, 0, z), (x, height, z)])
+    for y in range(0, int(height) + 1, step):
+        segments.append([(0, y), (width, y)] if z is None else [(0, y, z), (width, y, z)])
+    return segments
@@ -0,0 +1,109 @@
+"""
+Uniform-grid spatial index for neighbour, overlap and hit-test queries on the canvas
+"""
+import math
+from typing import Dict, Generic, Iterator, List, Set, Tuple, TypeVar
+
+Bounds = Tuple[float, float, float, float]  # (min_x, min_y, max_x, max_y)
+Item = TypeVar("Item")
+
+
+def bounds_intersect(a: Bounds, b: Bounds) -> bool:
+    """Closed-interval intersection, matching PlacedEquipment.overlaps_with (touching counts)"""
+    return not (a[2] < b[0] or a[0] > b[2] or a[3] < b[1] or a[1] > b[3])
+
+
+class SpatialGrid(Generic[Item]):
+    """Buckets items by the grid cells their bounding boxes cover.
+
+    Queries only visit the cells around the query region, so their cost depends on
+    local density rather than the total number of items. Results come back in
+    insertion order so callers that used to scan a list keep first-match semantics.
+    """
+
+    def __init__(self, cell_size: float = 25.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[str]] = {}
+        self._entries: Dict[str, Tuple[Item, Bounds, int]] = {}  # key -> (item, bounds, insertion order)
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _cell_range(self, bounds: Bounds) -> Iterator[Tuple[int, int]]:
+        size = self.cell_size
+        min_cx, min_cy = math.floor(bounds[0] / size), math.floor(bounds[1] / size)
+        max_cx, max_cy = math.floor(bounds[2] / size), math.floor(bounds[3] / size)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                yield (cx, cy)
+
+    def insert(self, key: str, item: Item, bounds: Bounds):
+        """Add an item, or move it if the key is already indexed (keeps its original order)"""
+        order = self._sequence
+        if key in self._entries:
+            order = self._entries[key][2]
+            self._unlink(key)
+        else:
+            self._sequence += 1
+        self._entries[key] = (item, bounds, order)
+        for cell in self._cell_range(bounds):
+            self._cells.setdefault(cell, set()).add(key)
+
+    def update(self, key: str, item: Item, bounds: Bounds):
+        """Re-bucket an item after it moved or resized"""
+        self.insert(key, item, bounds)
+
+    def _unlink(self, key: str):
+        _, bounds, _ = self._entries[key]
+        for cell in self._cell_range(bounds):
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._cells[cell]
+
+    def remove(self, key: str) -> bool:
+        if key not in self._entries:
+            return False
+        self._unlink(key)
+        del self._entries[key]
+        return True
+
+    def clear(self):
+        self._cells = {}
+        self._entries = {}
+        self._sequence = 0
+
+    def _candidates(self, region: Bounds) -> Set[str]:
+        # Very large regions are cheaper to answer from the entry table than cell by cell
+        size = self.cell_size
+        cell_count = ((math.floor(region[2] / size) - math.floor(region[0] / size) + 1) *
+                      (math.floor(region[3] / size) - math.floor(region[1] / size) + 1))
+        if cell_count > len(self._cells):
+            return set(self._entries)
+        keys: Set[str] = set()
+        for cell in self._cell_range(region):
+            bucket = self._cells.get(cell)
+            if bucket:
+                keys.update(bucket)
+        return keys
+
+    def _ordered(self, keys) -> List[Item]:
+        entries = sorted((self._entries[key] for key in keys), key=lambda entry: entry[2])
+        return [entry[0] for entry in entries]
+
+    def query(self, region: Bounds) -> List[Item]:
+        """Items whose bounds intersect the region, in insertion order"""
+        keys = [key for key in self._candidates(region) if bounds_intersect(self._entries[key][1], region)]
+        return self._ordered(keys)
+
+    def within_distance(self, x: float, y: float, radius: float) -> List[Item]:
+        """Items whose bounding box comes within radius of (x, y), in insertion order.
+
+        A superset of items whose centre is within radius; callers apply their exact test.
+        """
+        return self.query((x - radius, y - radius, x + radius, y + radius))
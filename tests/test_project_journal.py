@@ -0,0 +1,46 @@
+"""
+Project journal replay across an interrupted compaction
+"""
+import shutil
+
+from src.models.project_journal import ProjectJournal
+from src.models.project_store import journal_path, load_project_document, read_project_summary
+
+
+def entry(equipment_id: str) -> dict:
+    return {'equipment': {'id': equipment_id, 'name': equipment_id}, 'x_position': 0, 'y_position': 0,
+            'rotation': 0, 'connections': []}
+
+
+def project(*equipment_ids: str) -> dict:
+    return {'name': 'Journal test', 'equipment': [entry(equipment_id) for equipment_id in equipment_ids]}
+
+
+def unit_ids(project_data: dict) -> list:
+    return [item['equipment']['id'] for item in project_data['equipment']]
+
+
+def test_stale_journal_left_by_interrupted_compaction_is_skipped(tmp_path):
+    path = str(tmp_path / "journal_test.json")
+    journal = ProjectJournal(path, compact_every=1000)
+    journal.save(project('A', 'B'))
+    journal.save(project('B', 'A'))  # Recorded with an explicit order
+    journal.save(project('B', 'A', 'C'))  # Appends C without an order
+    assert unit_ids(load_project_document(path)) == ['B', 'A', 'C']
+
+    # Stop between replacing the project file and removing the journal
+    leftover = str(tmp_path / "leftover.jsonl")
+    shutil.copyfile(journal_path(path), leftover)
+    journal.compact()
+    shutil.copyfile(leftover, journal_path(path))
+
+    assert unit_ids(load_project_document(path)) == ['B', 'A', 'C']
+    summary = read_project_summary(path)
+    assert summary.equipment_count == 3
+    assert summary.revision == 3
+
+    # Later saves append after the leftover records and still replay correctly
+    saved = ProjectJournal(path, compact_every=1000).save(project('B', 'A', 'C', 'D'))
+    assert saved['revision'] == 4
+    assert unit_ids(load_project_document(path)) == ['B', 'A', 'C', 'D']
+    assert read_project_summary(path).equipment_count == 4